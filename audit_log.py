@@ -0,0 +1,242 @@
+import atexit
+import contextvars
+import json
+import os
+import queue
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime, timezone
+
+import pandas as pd
+
+# ----------------------------------------
+# Audit Trail
+# ----------------------------------------
+
+# Every calculation and export appends one JSON line to the audit log: which
+# operation ran, a hash of the inputs it ran on, its duration split by stage
+# (compute, chart render, write, embed), the files and bytes it wrote and
+# whether its charts came from the render cache. Records are handed to a
+# background thread through a queue and written in batches, so the UI thread
+# never waits on the disk. The log is only ever appended to.
+#
+#   python audit_log.py [path]    print the per-operation summary of a log
+
+AUDIT_LOG_PATH = os.path.join(os.path.expanduser("~"), ".cost_benefit_analysis", "audit_log.jsonl")
+AUDIT_STAGES = ("compute", "chart render", "write", "embed")
+
+# Operation currently running on this thread, if any; stages and files are recorded against it
+_current = contextvars.ContextVar("audit_operation", default=None)
+
+
+class Operation:
+    """Timings, outputs and chart cache use of one calculation or export while it runs."""
+
+    def __init__(self, name, kind, input_hash):
+        self.name = name
+        self.kind = kind
+        self.input_hash = input_hash
+        self.stages = {}
+        self.files = []
+        self.bytes_written = 0
+        self.chart_renders = 0
+        self.chart_cache_hits = 0
+        self.status = "ok"
+        self.error = None
+        self.started = datetime.now(timezone.utc)
+        self._start = time.perf_counter()
+
+    @contextmanager
+    def stage(self, name):
+        """Time a block as a stage; repeated stages add up."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.stages[name] = self.stages.get(name, 0.0) + (time.perf_counter() - start) * 1000
+
+    def add_file(self, path):
+        """Count a file the operation wrote (its size is read once it is written)."""
+        self.files.append(path)
+        try:
+            self.bytes_written += os.path.getsize(path)
+        except OSError:
+            pass
+
+    def to_record(self):
+        if self.kind == "export" and self.status == "ok" and not self.files:
+            self.status = "no output"
+        charts = self.chart_renders + self.chart_cache_hits
+        return {
+            "time": self.started.isoformat(timespec="milliseconds"),
+            "operation": self.name,
+            "kind": self.kind,
+            "input_hash": self.input_hash,
+            "duration_ms": round((time.perf_counter() - self._start) * 1000, 3),
+            "stages_ms": {name: round(ms, 3) for name, ms in self.stages.items()},
+            "files": self.files,
+            "bytes_written": self.bytes_written,
+            "chart_cache_hit": None if not charts else self.chart_renders == 0,
+            "chart_renders": self.chart_renders,
+            "status": self.status,
+            "error": self.error
+        }
+
+
+# Helpers for code that may run inside an operation (they do nothing outside one)
+
+@contextmanager
+def stage(name):
+    operation = _current.get()
+    if operation is None:
+        yield
+    else:
+        with operation.stage(name):
+            yield
+
+
+def record_file(path):
+    operation = _current.get()
+    if operation is not None:
+        operation.add_file(path)
+
+
+def record_chart(cache_hit):
+    operation = _current.get()
+    if operation is not None:
+        if cache_hit:
+            operation.chart_cache_hits += 1
+        else:
+            operation.chart_renders += 1
+
+
+def record_error(message):
+    """Mark the current operation as failed when its error is reported in a dialog instead of raised."""
+    operation = _current.get()
+    if operation is not None:
+        operation.status = "error"
+        operation.error = message
+
+
+class AuditLog:
+    """Append-only JSON lines log written by a background thread in batches."""
+
+    def __init__(self, path=AUDIT_LOG_PATH, flush_interval=0.25, batch_size=1000):
+        self.path = path
+        self.flush_interval = flush_interval
+        self.batch_size = batch_size
+        self.write_errors = 0
+        self._queue = queue.SimpleQueue()
+        self._thread = None
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def operation(self, name, kind="calculation", input_hash=None):
+        """Run a block as one logged operation, identified by a hash of its inputs (the inputs are not stored)."""
+        operation = Operation(name, kind, input_hash)
+        token = _current.set(operation)
+        try:
+            yield operation
+        except Exception as e:
+            operation.status = "error"
+            operation.error = f"{type(e).__name__}: {e}"
+            raise
+        finally:
+            _current.reset(token)
+            self.log(operation.to_record())
+
+    def log(self, record):
+        """Queue a record for writing; never blocks on the disk."""
+        if self._thread is None:
+            with self._lock:
+                if self._thread is None:
+                    self._thread = threading.Thread(target=self._write_loop, name="audit-log-writer", daemon=True)
+                    self._thread.start()
+                    atexit.register(self.close)
+        self._queue.put(record)
+
+    def flush(self, timeout=5.0):
+        """Wait until every record queued so far is written; returns False on timeout."""
+        if self._thread is None:
+            return True
+        written = threading.Event()
+        self._queue.put(written)
+        return written.wait(timeout)
+
+    def close(self, timeout=5.0):
+        """Write the remaining records and stop the writer thread."""
+        if self._thread is not None and self._thread.is_alive():
+            self._queue.put(None)
+            self._thread.join(timeout)
+
+    def _write_loop(self):
+        running = True
+        while running:
+            batch = [self._queue.get()]
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+
+            records = [item for item in batch if isinstance(item, dict)]
+            if records:
+                try:
+                    os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+                    with open(self.path, "a", encoding="utf-8") as f:
+                        f.write("".join(json.dumps(record) + "\n" for record in records))
+                except OSError:
+                    self.write_errors += 1
+            waiting = False
+            for item in batch:
+                if item is None:
+                    running = False
+                elif isinstance(item, threading.Event):
+                    item.set()
+                    waiting = True
+            # Unless there is a backlog or a caller is waiting, let the next burst of records build up so they share one write
+            if running and not waiting and len(batch) < self.batch_size:
+                time.sleep(self.flush_interval)
+
+
+# ----------------------------------------
+# Reading the Log
+# ----------------------------------------
+
+def read_log(path=AUDIT_LOG_PATH):
+    """Return the log as a DataFrame with one row per operation and one ms column per stage."""
+    if not os.path.exists(path) or os.path.getsize(path) == 0:
+        return pd.DataFrame()
+    with open(path, encoding="utf-8") as f:
+        records = [json.loads(line) for line in f if line.strip()]
+    log = pd.json_normalize(records, sep=" ")
+    return log.rename(columns={f"stages_ms {name}": f"{name} (ms)" for name in AUDIT_STAGES})
+
+
+def summarize(log):
+    """Return count, errors, mean / p95 duration, mean stage times, bytes written and cache hit rate per operation."""
+    if log.empty:
+        return pd.DataFrame()
+    grouped = log.groupby(["kind", "operation"])
+    summary = pd.DataFrame({
+        "Runs": grouped.size(),
+        "Errors": grouped["status"].agg(lambda status: int((status == "error").sum())),
+        "No Output": grouped["status"].agg(lambda status: int((status == "no output").sum())),
+        "Mean (ms)": grouped["duration_ms"].mean(),
+        "P95 (ms)": grouped["duration_ms"].quantile(0.95)
+    })
+    for name in AUDIT_STAGES:
+        column = f"{name} (ms)"
+        if column in log:
+            # Runs without the stage (e.g. a cached chart) spent no time in it
+            summary[f"Mean {column}"] = log[column].fillna(0.0).groupby([log["kind"], log["operation"]]).mean()
+    summary["Mean Bytes Written"] = grouped["bytes_written"].mean()
+    summary["Chart Cache Hit Rate"] = grouped["chart_cache_hit"].agg(lambda hits: hits.dropna().astype(float).mean())
+    return summary.reset_index()
+
+
+if __name__ == "__main__":
+    summary = summarize(read_log(sys.argv[1] if len(sys.argv) > 1 else AUDIT_LOG_PATH))
+    print("The audit log is empty." if summary.empty else summary.to_string(index=False, float_format=lambda value: f"{value:,.2f}"))
@@ -0,0 +1,79 @@
+import numpy as np
+
+# ----------------------------------------
+# Batch Engine
+# ----------------------------------------
+
+# Vectorised versions of the calculators that evaluate many projects or
+# scenarios at once. Inputs are 1-D arrays with one entry per project (and a
+# projects x periods matrix for cash flows); results match the single-project
+# calculations in calculations.py.
+
+
+def npv_batch(discount_rates, initial_investments, cash_flows, periods_per_year=1, periods=None):
+    """Return total PV, NPV and present values for each project; rates are annual fractions, flows start in period 1.
+
+    periods_per_year is one value for every project or one per project, so
+    monthly, quarterly and annual projects can share a batch. periods numbers
+    the columns explicitly when they are not consecutive, e.g. the event
+    periods of a sparse schedule.
+    """
+    discount_rates = np.asarray(discount_rates, dtype=np.float64)
+    initial_investments = np.asarray(initial_investments, dtype=np.float64)
+    cash_flows = np.atleast_2d(np.asarray(cash_flows, dtype=np.float64))
+
+    periods = np.arange(1, cash_flows.shape[1] + 1) if periods is None else np.asarray(periods, dtype=np.float64)
+    years = periods / np.reshape(np.asarray(periods_per_year, dtype=np.float64), (-1, 1))
+    discount_factors = np.exp(-np.log1p(discount_rates)[:, None] * years)
+    present_values = cash_flows * discount_factors
+    total_pv = present_values.sum(axis=1)
+    return {
+        "total_pv": total_pv,
+        "npv": total_pv - initial_investments,
+        "present_values": present_values
+    }
+
+
+def payback_periods(initial_investments, cash_flows, periods_per_year=1):
+    """Return the fractional payback period of each project in years, as in the Payback tab.
+
+    NaN where nothing is invested or the investment is never recovered.
+    """
+    initial_investments = np.asarray(initial_investments, dtype=np.float64)
+    cash_flows = np.atleast_2d(np.asarray(cash_flows, dtype=np.float64))
+    rows = np.arange(cash_flows.shape[0])
+
+    cumulative = np.cumsum(cash_flows, axis=1)
+    cumulative -= initial_investments[:, None]
+    recovered = cumulative >= 0
+    first = recovered.argmax(axis=1)
+    found = recovered[rows, first] & (initial_investments > 0)
+
+    # Period of recovery minus one, plus the fraction of that period's flow still needed
+    previous = np.where(first > 0, cumulative[rows, np.maximum(first - 1, 0)], -initial_investments)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        periods = first + (-previous) / cash_flows[rows, first]
+    return np.where(found, periods / periods_per_year, np.nan)
+
+
+def payback_batch(initial_investments, annual_cash_flows, max_years=50, periods_per_year=1):
+    """Return payback periods (in years) and cumulative cash flows for constant annual benefits spread over each year."""
+    initial_investments = np.asarray(initial_investments, dtype=np.float64)
+    annual_cash_flows = np.asarray(annual_cash_flows, dtype=np.float64) / periods_per_year
+    cash_flows = np.repeat(annual_cash_flows[:, None], max_years * periods_per_year, axis=1)
+    return {
+        "payback_period": payback_periods(initial_investments, cash_flows, periods_per_year),
+        "cumulative_cash_flow": np.cumsum(cash_flows, axis=1) - initial_investments[:, None]
+    }
+
+
+def break_even_batch(fixed_costs, variable_costs, sales_prices):
+    """Return break-even units and revenue (rounded to 2 places, NaN where price <= variable cost)."""
+    fixed_costs = np.asarray(fixed_costs, dtype=np.float64)
+    margins = np.asarray(sales_prices, dtype=np.float64) - np.asarray(variable_costs, dtype=np.float64)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        units = np.where(margins > 0, np.round(fixed_costs / margins, 2), np.nan)
+    return {
+        "units": units,
+        "revenue": np.round(units * np.asarray(sales_prices, dtype=np.float64), 2)
+    }
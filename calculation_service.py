@@ -0,0 +1,375 @@
+import argparse
+import asyncio
+import json
+import os
+import time
+from collections import OrderedDict, deque
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+import numpy as np
+
+from calculations import CALCULATIONS, npv_analyses
+
+# ----------------------------------------
+# Local Calculation Service
+# ----------------------------------------
+
+# A small HTTP/JSON server (asyncio, standard library only) exposing the NPV,
+# payback and break-even calculations to other local tools:
+#
+#   POST /npv         {"discount_rate": 10, "initial_investment": 10000, "cash_flows": [3000, 3500]}
+#   POST /payback     {"initial_investment": 10000, "annual_cash_flow": 2500}
+#   POST /break-even  {"fixed_costs": 5000, "variable_cost": 20, "sales_price": 50}
+#   POST /xnpv        {"discount_rate": 9, "dates": ["2024-01-01", ...], "amounts": [-10000, ...]}
+#   POST /batch       [{"calculation": "npv", "inputs": {...}}, ...]
+#   GET  /metrics     request counts, cache hits, batch sizes, latency percentiles
+#
+# Requests arriving close together are collected into one batch and evaluated
+# in a worker process, identical inputs share one evaluation, and results are
+# kept in an LRU cache. The NPV requests of a batch are discounted together as
+# (period, amount) events, so sparse cash flows cost only their events.
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+
+
+def evaluate_batch(items):
+    """Evaluate [(calculation, inputs), ...] in a worker process, returning (ok, result or error message) pairs."""
+    npv_items = [index for index, (calculation, _) in enumerate(items) if calculation == "npv"]
+    outcomes = dict(zip(npv_items, npv_analyses(items[index][1] for index in npv_items)))
+
+    results = []
+    for index, (calculation, inputs) in enumerate(items):
+        # One bad item (including e.g. a MemoryError) must not take the rest of the batch with it
+        try:
+            result = outcomes[index] if index in outcomes else CALCULATIONS[calculation](**inputs)
+            if isinstance(result, Exception):
+                raise result
+            results.append((True, result))
+        except Exception as e:
+            results.append((False, str(e) or type(e).__name__))
+    return results
+
+
+class ServiceError(Exception):
+    """A request the service rejects, carrying the HTTP status to answer with."""
+
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+class CalculationService:
+    def __init__(self, workers=None, batch_size=64, batch_window=0.002, cache_size=4096):
+        # workers=0 evaluates batches in the event loop's default thread pool instead of worker processes
+        self.workers = os.cpu_count() if workers is None else workers
+        self.batch_size = batch_size
+        self.batch_window = batch_window
+        self.cache_size = cache_size
+
+        self._pool = None
+        self._server = None
+        self._cache = OrderedDict()
+        self._in_flight = {}
+        self._pending = []
+        self._flush_handle = None
+
+        # Metrics
+        self.started = time.perf_counter()
+        self.request_count = 0
+        self.error_count = 0
+        self.cache_hits = 0
+        self.batch_sizes = deque(maxlen=10000)
+        self.latencies = deque(maxlen=10000)
+
+    async def start(self, host=DEFAULT_HOST, port=DEFAULT_PORT):
+        """Start the worker pool and begin listening."""
+        if self.workers:
+            self._pool = ProcessPoolExecutor(max_workers=self.workers)
+        self._server = await asyncio.start_server(self._handle_connection, host, port)
+        return self._server.sockets[0].getsockname()[:2]
+
+    async def close(self):
+        """Stop listening and shut the worker pool down."""
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+        if self._pool is not None:
+            self._pool.shutdown(cancel_futures=True)
+
+    # ------------------------------------
+    # Batching and caching
+    # ------------------------------------
+
+    async def submit(self, calculation, inputs):
+        """Return the result for one calculation, using the cache or the next batch."""
+        if calculation not in CALCULATIONS:
+            raise ServiceError(404, f"Unknown calculation: {calculation}")
+        if not isinstance(inputs, dict):
+            raise ServiceError(400, "Inputs must be a JSON object.")
+
+        key = (calculation, json.dumps(inputs, sort_keys=True))
+        if key in self._cache:
+            self._cache.move_to_end(key)
+            self.cache_hits += 1
+            return self._cache[key]
+
+        # Share an evaluation already queued or running for the same inputs
+        future = self._in_flight.get(key)
+        if future is None:
+            future = asyncio.get_running_loop().create_future()
+            self._in_flight[key] = future
+            self._pending.append((key, calculation, inputs, future))
+            self._schedule_flush()
+
+        ok, result = await asyncio.shield(future)
+        if not ok:
+            raise ServiceError(400, result)
+        return result
+
+    def _schedule_flush(self):
+        loop = asyncio.get_running_loop()
+        if len(self._pending) >= self.batch_size:
+            self._flush()
+        elif self._flush_handle is None:
+            self._flush_handle = loop.call_later(self.batch_window, self._flush)
+
+    def _flush(self):
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        batch, self._pending = self._pending, []
+        if batch:
+            asyncio.get_running_loop().create_task(self._run_batch(batch))
+
+    async def _run_batch(self, batch):
+        self.batch_sizes.append(len(batch))
+        items = [(calculation, inputs) for _, calculation, inputs, _ in batch]
+        pool = self._pool
+        try:
+            results = await asyncio.get_running_loop().run_in_executor(pool, evaluate_batch, items)
+        except BrokenProcessPool as e:
+            # A worker process died; replace the pool (once, however many batches saw it break) so later batches run
+            if pool is self._pool:
+                pool.shutdown(wait=False, cancel_futures=True)
+                self._pool = ProcessPoolExecutor(max_workers=self.workers)
+            results = [(False, f"Calculation failed: {e}")] * len(batch)
+        except Exception as e:
+            results = [(False, f"Calculation failed: {e}")] * len(batch)
+
+        for (key, _, _, future), (ok, result) in zip(batch, results):
+            del self._in_flight[key]
+            if ok:
+                self._cache[key] = result
+                if len(self._cache) > self.cache_size:
+                    self._cache.popitem(last=False)
+            if not future.done():
+                future.set_result((ok, result))
+
+    # ------------------------------------
+    # Metrics
+    # ------------------------------------
+
+    def metrics(self):
+        """Return request, cache, batch and latency statistics since the service started."""
+        uptime = time.perf_counter() - self.started
+        latencies_ms = np.array(self.latencies, dtype=np.float64) * 1000
+        percentiles = np.percentile(latencies_ms, [50, 90, 99]).tolist() if latencies_ms.size else [None] * 3
+        return {
+            "uptime_s": uptime,
+            "requests": self.request_count,
+            "errors": self.error_count,
+            "throughput_rps": self.request_count / uptime if uptime else 0.0,
+            "cache_hits": self.cache_hits,
+            "cache_size": len(self._cache),
+            "batches": len(self.batch_sizes),
+            "mean_batch_size": float(np.mean(self.batch_sizes)) if self.batch_sizes else None,
+            "latency_ms": dict(zip(("p50", "p90", "p99"), percentiles))
+        }
+
+    # ------------------------------------
+    # HTTP handling
+    # ------------------------------------
+
+    async def _route(self, method, path, body):
+        if method == "GET" and path == "/metrics":
+            return self.metrics()
+        if method == "GET" and path == "/health":
+            return {"status": "ok"}
+        if method != "POST":
+            raise ServiceError(405, f"Method not allowed: {method}")
+
+        try:
+            payload = json.loads(body or b"null")
+        except ValueError:
+            raise ServiceError(400, "Request body must be valid JSON.")
+
+        if path == "/batch":
+            if not isinstance(payload, list):
+                raise ServiceError(400, "Batch body must be a JSON list.")
+            if not all(isinstance(item, dict) for item in payload):
+                raise ServiceError(400, "Every batch item must be a JSON object.")
+            outcomes = await asyncio.gather(
+                *(self.submit(item.get("calculation"), item.get("inputs")) for item in payload),
+                return_exceptions=True
+            )
+            return [{"error": str(o)} if isinstance(o, Exception) else {"result": o} for o in outcomes]
+        return await self.submit(path.lstrip("/"), payload)
+
+    async def _handle_connection(self, reader, writer):
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line.strip():
+                    break
+                start = time.perf_counter()
+                method, path, _ = request_line.decode("latin-1").split(" ", 2)
+
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b"\r\n", b"\n", b""):
+                        break
+                    name, _, value = line.decode("latin-1").partition(":")
+                    headers[name.strip().lower()] = value.strip()
+                body = await reader.readexactly(int(headers.get("content-length", 0)))
+
+                self.request_count += 1
+                try:
+                    status, response = 200, await self._route(method, path, body)
+                except ServiceError as e:
+                    self.error_count += 1
+                    status, response = e.status, {"error": str(e)}
+
+                keep_alive = headers.get("connection", "").lower() != "close"
+                payload = json.dumps(response).encode("utf-8")
+                writer.write(
+                    f"HTTP/1.1 {status} {'OK' if status == 200 else 'Error'}\r\n"
+                    f"Content-Type: application/json\r\n"
+                    f"Content-Length: {len(payload)}\r\n"
+                    f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n".encode("latin-1") + payload
+                )
+                await writer.drain()
+                self.latencies.append(time.perf_counter() - start)
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError, ValueError):
+            pass
+        finally:
+            writer.close()
+
+
+# ----------------------------------------
+# Local Client and Load Test
+# ----------------------------------------
+
+class ServiceClient:
+    """Keep-alive JSON client for the calculation service."""
+
+    def __init__(self, host=DEFAULT_HOST, port=DEFAULT_PORT):
+        self.host = host
+        self.port = port
+        self._reader = None
+        self._writer = None
+
+    async def request(self, method, path, payload=None):
+        """Send one request and return (status, decoded JSON body)."""
+        if self._writer is None:
+            self._reader, self._writer = await asyncio.open_connection(self.host, self.port)
+        body = b"" if payload is None else json.dumps(payload).encode("utf-8")
+        self._writer.write(
+            f"{method} {path} HTTP/1.1\r\nHost: {self.host}\r\n"
+            f"Content-Type: application/json\r\nContent-Length: {len(body)}\r\n\r\n".encode("latin-1") + body
+        )
+        await self._writer.drain()
+
+        status = int((await self._reader.readline()).split()[1])
+        headers = {}
+        while True:
+            line = await self._reader.readline()
+            if line in (b"\r\n", b""):
+                break
+            name, _, value = line.decode("latin-1").partition(":")
+            headers[name.strip().lower()] = value.strip()
+        return status, json.loads(await self._reader.readexactly(int(headers["content-length"])))
+
+    async def close(self):
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
+
+
+async def load_test(host=DEFAULT_HOST, port=DEFAULT_PORT, requests=1000, concurrency=32, distinct=100):
+    """Fire NPV requests from concurrent clients and return client-side latency and throughput."""
+    rng = np.random.default_rng(0)
+    payloads = [
+        {"discount_rate": float(rate), "initial_investment": 10000, "cash_flows": flows.round(2).tolist()}
+        for rate, flows in zip(rng.uniform(1, 15, distinct), rng.uniform(1000, 6000, (distinct, 30)))
+    ]
+    latencies = []
+
+    async def worker(worker_index):
+        client = ServiceClient(host, port)
+        try:
+            for i in range(worker_index, requests, concurrency):
+                start = time.perf_counter()
+                await client.request("POST", "/npv", payloads[i % distinct])
+                latencies.append(time.perf_counter() - start)
+        finally:
+            await client.close()
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker(i) for i in range(concurrency)))
+    elapsed = time.perf_counter() - start
+    latencies_ms = np.array(latencies) * 1000
+    return {
+        "requests": len(latencies),
+        "elapsed_s": elapsed,
+        "throughput_rps": len(latencies) / elapsed,
+        "latency_ms": dict(zip(("p50", "p90", "p99"), np.percentile(latencies_ms, [50, 90, 99]).tolist()))
+    }
+
+
+async def _serve(args):
+    service = CalculationService(workers=args.workers, batch_size=args.batch_size,
+                                 batch_window=args.batch_window_ms / 1000, cache_size=args.cache_size)
+    host, port = await service.start(args.host, args.port)
+    print(f"Calculation service listening on http://{host}:{port}")
+    try:
+        await asyncio.Event().wait()
+    finally:
+        await service.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Local NPV / payback / break-even calculation service.")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    serve = commands.add_parser("serve", help="Run the service.")
+    serve.add_argument("--host", default=DEFAULT_HOST)
+    serve.add_argument("--port", type=int, default=DEFAULT_PORT)
+    serve.add_argument("--workers", type=int, default=None, help="Worker processes (0 evaluates in threads).")
+    serve.add_argument("--batch-size", type=int, default=64)
+    serve.add_argument("--batch-window-ms", type=float, default=2.0)
+    serve.add_argument("--cache-size", type=int, default=4096)
+
+    load = commands.add_parser("load-test", help="Load-test a running service.")
+    load.add_argument("--host", default=DEFAULT_HOST)
+    load.add_argument("--port", type=int, default=DEFAULT_PORT)
+    load.add_argument("--requests", type=int, default=1000)
+    load.add_argument("--concurrency", type=int, default=32)
+    load.add_argument("--distinct", type=int, default=100, help="Distinct input sets (controls cache hit rate).")
+
+    args = parser.parse_args(argv)
+    if args.command == "serve":
+        try:
+            asyncio.run(_serve(args))
+        except KeyboardInterrupt:
+            pass
+    else:
+        print(json.dumps(asyncio.run(load_test(args.host, args.port, args.requests, args.concurrency, args.distinct)), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,189 @@
+import numpy as np
+
+from cash_flow_adjustments import AdjustmentPipeline, nominal_rate
+from cash_flow_schedule import PERIOD_NAMES, CashFlowSchedule, parse_cash_flows
+from dated_cash_flows import to_dates, xirr, xnpv
+from sparse_cash_flows import is_sparse_entry, parse_sparse_cash_flows, sparse_events, sparse_npv_batch
+
+# ----------------------------------------
+# Calculator Results Without the GUI
+# ----------------------------------------
+
+# These mirror the Payback Period, NPV Calculator and Break-Even Analysis tabs
+# and return plain dicts, so other tools (e.g. the calculation service) can use
+# them without creating any Tk widgets.
+
+
+def split_years_months(period):
+    """Split a fractional number of years into whole years and rounded months."""
+    years = int(period)
+    months = int(round((period - years) * 12))
+    return years, months
+
+
+def break_even_point(fixed_costs, variable_cost, sales_price):
+    """Return (units, revenue) at the break-even point, each rounded to 2 decimal places."""
+    if sales_price <= variable_cost:
+        raise ValueError("Sales Price per Unit must be greater than Variable Cost per Unit.")
+    breakeven_units = round(fixed_costs / (sales_price - variable_cost), 2)
+    breakeven_revenue = round(breakeven_units * sales_price, 2)
+    return breakeven_units, breakeven_revenue
+
+
+def _npv_events(cash_flows, periods=None):
+    """Return (periods or None, cash flows) of an NPV input's cash flows."""
+    if isinstance(cash_flows, str):
+        if is_sparse_entry(cash_flows):
+            return parse_sparse_cash_flows(cash_flows)
+        cash_flows = parse_cash_flows(cash_flows)
+    if periods is not None:
+        return sparse_events(periods, cash_flows)
+    return None, np.asarray(cash_flows, dtype=np.float64).ravel()
+
+
+def _npv_result(initial_investment, total_pv, npv, period_name, periods, cash_flows, discount_factors, present_values):
+    return {
+        "initial_investment": initial_investment,
+        "total_pv": total_pv,
+        "npv": npv,
+        "schedule": {
+            # "year", "quarter" or "month"
+            period_name.lower(): periods.astype(int).tolist(),
+            "cash_flow": cash_flows.tolist(),
+            "discount_factor": discount_factors.tolist(),
+            "present_value": present_values.tolist()
+        }
+    }
+
+
+def npv_analysis(discount_rate, initial_investment, cash_flows, adjustments=None, rate_basis="Nominal", periods_per_year=1,
+                 periods=None):
+    """Return NPV totals and schedule; discount_rate is an annual percentage, as entered in the NPV tab.
+
+    adjustments takes AdjustmentPipeline.configure settings (rates as fractions)
+    and is applied to the cash flows before discounting. cash_flows has
+    periods_per_year flows a year (12 for monthly), or is a string of
+    'period: amount' pairs for sparse flows; periods, if given, numbers a
+    list of sparse flows instead.
+    """
+    discount_rate = float(discount_rate) / 100
+    initial_investment = float(initial_investment)
+    periods, cash_flows = _npv_events(cash_flows, periods)
+
+    if adjustments:
+        adjustments = dict(adjustments, periods_per_year=periods_per_year)
+        pipeline = AdjustmentPipeline().configure(initial_investment, **adjustments)
+        if periods is None:
+            cash_flows = pipeline.adjusted(cash_flows)
+        elif pipeline.changes_cash_flows():
+            # Sparse flows are adjusted as events, however long the horizon
+            periods, cash_flows = pipeline.adjusted_events(periods, cash_flows)
+        if rate_basis == "Real":
+            discount_rate = nominal_rate(discount_rate, adjustments.get("inflation", 0.0))
+    schedule = CashFlowSchedule(cash_flows, discount_rate, initial_investment, periods_per_year=periods_per_year,
+                                periods=periods)
+    return _npv_result(schedule.initial_investment, schedule.total_pv, schedule.npv, schedule.period_name, schedule.periods,
+                       schedule.cash_flows, schedule.discount_factors, schedule.present_values)
+
+
+def _batch_inputs(discount_rate, initial_investment, cash_flows, adjustments=None, rate_basis="Nominal", periods_per_year=1,
+                  periods=None):
+    """Return (rate, investment, periods, cash flows, periods per year) of npv_analysis inputs without adjustments."""
+    periods, cash_flows = _npv_events(cash_flows, periods)
+    if periods is None:
+        periods = np.arange(1, cash_flows.size + 1)
+    return float(discount_rate) / 100, float(initial_investment), periods, cash_flows, int(periods_per_year)
+
+
+def npv_analyses(inputs):
+    """Return npv_analysis(**i) for every input dict i, discounting the events of all those without adjustments together.
+
+    An input dict that cannot be evaluated gets the exception it raised in
+    place of its result.
+    """
+    inputs = list(inputs)
+    results = [None] * len(inputs)
+    batch = []
+    for index, i in enumerate(inputs):
+        try:
+            if i.get("adjustments"):
+                results[index] = npv_analysis(**i)
+                continue
+            batch.append((index, *_batch_inputs(**i)))
+        except Exception as e:
+            results[index] = e
+    if not batch:
+        return results
+
+    indexes, rates, investments, periods, amounts, periods_per_year = zip(*batch)
+    try:
+        projects = np.repeat(np.arange(len(batch)), [flows.size for flows in amounts])
+        evaluated = sparse_npv_batch(rates, investments, projects, np.concatenate(periods), np.concatenate(amounts),
+                                     periods_per_year)
+    except Exception:
+        # e.g. a MemoryError: evaluate one at a time, so only the input sets that cannot be evaluated fail
+        for index in indexes:
+            try:
+                results[index] = npv_analysis(**inputs[index])
+            except Exception as e:
+                results[index] = e
+        return results
+
+    bounds = np.concatenate(([0], np.cumsum([flows.size for flows in amounts])))
+    for j, index in enumerate(indexes):
+        events = slice(bounds[j], bounds[j + 1])
+        results[index] = _npv_result(investments[j], float(evaluated["total_pv"][j]), float(evaluated["npv"][j]),
+                                     PERIOD_NAMES.get(periods_per_year[j], "Period"), periods[j], amounts[j],
+                                     evaluated["discount_factors"][events], evaluated["present_values"][events])
+    return results
+
+
+def payback_analysis(initial_investment, annual_cash_flow, max_years=50, periods_per_year=1):
+    """Return the payback period in years and the cumulative schedule.
+
+    The period is None if nothing is invested or it is not recovered within max_years.
+    """
+    schedule = CashFlowSchedule.until_payback(float(initial_investment), float(annual_cash_flow), int(max_years),
+                                              int(periods_per_year))
+    payback_period = schedule.payback_period()
+    years, months = split_years_months(payback_period) if payback_period is not None else (None, None)
+    return {
+        "payback_period": payback_period,
+        "years": years,
+        "months": months,
+        "schedule": {
+            # "year", "quarter" or "month"
+            schedule.period_name.lower(): schedule.periods.astype(int).tolist(),
+            "cash_flow": schedule.cash_flows.tolist(),
+            "cumulative_cash_flow": schedule.cumulative.tolist()
+        }
+    }
+
+
+def break_even_analysis(fixed_costs, variable_cost, sales_price):
+    """Return the break-even point in units and revenue."""
+    breakeven_units, breakeven_revenue = break_even_point(float(fixed_costs), float(variable_cost), float(sales_price))
+    return {"units": breakeven_units, "revenue": breakeven_revenue}
+
+
+def xnpv_analysis(discount_rate, dates, amounts, valuation_date=None, day_count="ACT/365F"):
+    """Return XNPV and XIRR of dated cash flows; discount_rate is a percentage."""
+    dates = to_dates(dates)
+    amounts = np.asarray(amounts, dtype=np.float64)
+    try:
+        irr = xirr(amounts, dates, valuation_date, day_count)
+    except ValueError:
+        irr = None
+    return {
+        "xnpv": xnpv(float(discount_rate) / 100, amounts, dates, valuation_date, day_count),
+        "xirr": irr
+    }
+
+
+# Calculation name -> function, as used by the calculation service
+CALCULATIONS = {
+    "npv": npv_analysis,
+    "payback": payback_analysis,
+    "break-even": break_even_analysis,
+    "xnpv": xnpv_analysis
+}
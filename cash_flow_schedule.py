@@ -0,0 +1,212 @@
+import numpy as np
+import pandas as pd
+
+# ----------------------------------------
+# Cash-Flow Schedule
+# ----------------------------------------
+
+# Column order of the backing array; each column is one contiguous float64 row
+SCHEDULE_COLUMNS = ("period", "cash_flow", "discount_factor", "present_value", "cumulative_cash_flow")
+
+# Periods per year of each granularity, and what a period is called
+PERIOD_GRANULARITIES = {"Annual": 1, "Quarterly": 4, "Monthly": 12}
+PERIOD_NAMES = {1: "Year", 4: "Quarter", 12: "Month"}
+
+
+def parse_cash_flows(text):
+    """Parse a comma-separated entry string into a float64 array."""
+    return np.array([float(cf.strip()) for cf in text.split(',')], dtype=np.float64)
+
+
+class CashFlowSchedule:
+    """Array-backed schedule of periods, cash flows, discount factors, present values and cumulative sums.
+
+    rate is annual whatever the granularity; period t is discounted over
+    t / periods_per_year years. periods, if given, numbers the cash flows
+    explicitly, so a sparse schedule holds only the periods with a cash flow.
+    """
+
+    __slots__ = ("data", "rate", "initial_investment", "periods_per_year")
+
+    def __init__(self, cash_flows, rate=0.0, initial_investment=0.0, start=1, periods_per_year=1, periods=None):
+        cash_flows = np.asarray(cash_flows, dtype=np.float64)
+        self.rate = float(rate)
+        self.initial_investment = float(initial_investment)
+        self.periods_per_year = int(periods_per_year)
+
+        # One (columns x periods) block keeps every column contiguous and lets pandas wrap it without copying
+        self.data = np.empty((len(SCHEDULE_COLUMNS), cash_flows.size), dtype=np.float64)
+        self.data[0] = np.arange(start, start + cash_flows.size) if periods is None else periods
+        self.data[1] = cash_flows
+        np.divide(self.data[0], -self.periods_per_year, out=self.data[2])
+        np.power(1 + self.rate, self.data[2], out=self.data[2])
+        np.multiply(self.data[1], self.data[2], out=self.data[3])
+        np.cumsum(self.data[1], out=self.data[4])
+        self.data[4] -= self.initial_investment
+
+    @classmethod
+    def from_array(cls, data, rate=0.0, initial_investment=0.0, periods_per_year=1):
+        """Wrap an existing (columns x periods) block, e.g. one memory-mapped from a project file, without copying."""
+        schedule = object.__new__(cls)
+        schedule.data = data
+        schedule.rate = float(rate)
+        schedule.initial_investment = float(initial_investment)
+        schedule.periods_per_year = int(periods_per_year)
+        return schedule
+
+    @classmethod
+    def from_entry(cls, text, rate=0.0, initial_investment=0.0, periods_per_year=1):
+        """Build a schedule from the comma-separated Cash Flows entry."""
+        return cls(parse_cash_flows(text), rate=rate, initial_investment=initial_investment, periods_per_year=periods_per_year)
+
+    @classmethod
+    def until_payback(cls, initial_investment, annual_cash_flow, max_years=50, periods_per_year=1):
+        """Build a constant-benefit schedule that stops in the period the investment is recovered.
+
+        The annual benefit is spread evenly over the periods of each year.
+        """
+        schedule = cls(np.full(max_years * periods_per_year, annual_cash_flow / periods_per_year),
+                       initial_investment=initial_investment, periods_per_year=periods_per_year)
+        if initial_investment <= 0:
+            return schedule.head(0)
+        recovered = np.flatnonzero(schedule.cumulative >= 0)
+        return schedule.head(recovered[0] + 1) if recovered.size else schedule
+
+    @classmethod
+    def per_unit(cls, fixed_costs, unit_contribution, max_units):
+        """Build a schedule indexed by units sold (0..max_units) whose cumulative column is profit at that volume."""
+        contributions = np.full(max_units + 1, unit_contribution, dtype=np.float64)
+        contributions[0] = 0.0
+        return cls(contributions, initial_investment=fixed_costs, start=0)
+
+    def head(self, n):
+        """Return a schedule viewing the first n periods of this one."""
+        return CashFlowSchedule.from_array(self.data[:, :n], self.rate, self.initial_investment, self.periods_per_year)
+
+    def __len__(self):
+        return self.data.shape[1]
+
+    @property
+    def periods(self):
+        return self.data[0]
+
+    @property
+    def years(self):
+        """Time of each period in years, as discounted."""
+        return self.data[0] / self.periods_per_year
+
+    @property
+    def period_name(self):
+        return PERIOD_NAMES.get(self.periods_per_year, "Period")
+
+    @property
+    def contiguous(self):
+        """Whether every period from the first to the last is held (False for a sparse schedule)."""
+        return len(self) == 0 or self.periods[-1] - self.periods[0] == len(self) - 1
+
+    @property
+    def cash_flows(self):
+        return self.data[1]
+
+    @property
+    def discount_factors(self):
+        return self.data[2]
+
+    @property
+    def present_values(self):
+        return self.data[3]
+
+    @property
+    def cumulative(self):
+        return self.data[4]
+
+    @property
+    def total_pv(self):
+        return float(self.present_values.sum())
+
+    @property
+    def npv(self):
+        return self.total_pv - self.initial_investment
+
+    def payback_period(self):
+        """Return the fractional payback period in years, or None if nothing is invested or it is never recovered."""
+        # Without an investment there is nothing to pay back, as in the batch and sparse engines
+        if self.initial_investment <= 0:
+            return None
+        recovered = np.flatnonzero(self.cumulative >= 0)
+        if recovered.size == 0:
+            return None
+        i = recovered[0]
+        previous_cumulative = self.cumulative[i - 1] if i > 0 else -self.initial_investment
+        if previous_cumulative >= 0:
+            return float(self.periods[i] - 1) / self.periods_per_year
+        return float(self.periods[i] - 1 + (-previous_cumulative) / self.cash_flows[i]) / self.periods_per_year
+
+    # Roll-ups summarise the schedule for display; calculations keep using the full resolution
+
+    def rolled_up(self, periods_per_year=1):
+        """Return a schedule totalling this one's periods into coarser ones, e.g. months into quarters or years.
+
+        Cash flows and present values are summed, the cumulative cash flow is
+        taken at the end of each period and the discount factor is the
+        effective one, PV / cash flow. Totals and NPV are unchanged.
+        """
+        if periods_per_year == self.periods_per_year:
+            return self
+        if periods_per_year <= 0 or self.periods_per_year % periods_per_year:
+            raise ValueError(f"Cannot roll {self.period_name.lower()}s up into {periods_per_year} periods a year.")
+        group = self.periods_per_year // periods_per_year
+        n = len(self)
+
+        if self.contiguous and (n == 0 or self.periods[0] == 1):
+            # Whole groups are summed as a (groups x group) reshape of each column; a final partial group is summed on its own
+            full = n - n % group
+            data = np.empty((len(SCHEDULE_COLUMNS), -(-n // group)), dtype=np.float64)
+            data[0] = (self.periods[::group] - 1) // group + 1
+            for column in (1, 3):
+                data[column, :full // group] = self.data[column, :full].reshape(-1, group).sum(axis=1)
+                if full < n:
+                    data[column, -1] = self.data[column, full:].sum()
+            ends = np.append(np.arange(group - 1, full, group), [n - 1] if full < n else [])
+        else:
+            # Sparse: sum the runs of periods falling in the same coarser period
+            groups = (self.periods - 1) // group
+            starts = np.flatnonzero(np.diff(groups, prepend=-1))
+            data = np.empty((len(SCHEDULE_COLUMNS), starts.size), dtype=np.float64)
+            data[0] = groups[starts] + 1
+            for column in (1, 3):
+                data[column] = np.add.reduceat(self.data[column], starts)
+            ends = np.append(starts[1:] - 1, n - 1)
+        data[4] = self.cumulative[ends.astype(np.int64)]
+
+        with np.errstate(divide="ignore", invalid="ignore"):
+            np.divide(data[3], data[1], out=data[2])
+        # Where a period has no net cash flow, show the discount factor at its end
+        ends_in_years = data[0] / periods_per_year
+        data[2] = np.where(np.isfinite(data[2]), data[2], np.power(1 + self.rate, -ends_in_years))
+        return CashFlowSchedule.from_array(data, self.rate, self.initial_investment, periods_per_year)
+
+    # Formatting happens only here, when rows are displayed or exported
+
+    def payback_rows(self):
+        """Yield (Year, Cash Flow, Cumulative Cash Flow, positive) rows formatted for display."""
+        for year, cf, cumulative in zip(self.periods.astype(int).tolist(), self.cash_flows.tolist(), self.cumulative.tolist()):
+            yield year, f"£{cf:,.2f}", f"£{cumulative:,.2f}", cumulative >= 0
+
+    def npv_rows(self):
+        """Yield (Year, Cash Flow, Discount Factor, Present Value) rows formatted for display."""
+        for year, cf, factor, pv in zip(self.periods.astype(int).tolist(), self.cash_flows.tolist(),
+                                        self.discount_factors.tolist(), self.present_values.tolist()):
+            yield year, f"£{cf:,.2f}", f"{factor:.4f}", f"£{pv:,.2f}"
+
+    def to_frame(self, columns=SCHEDULE_COLUMNS):
+        """Return the schedule as a DataFrame sharing memory with the backing array."""
+        return pd.DataFrame(self.data.T, columns=list(columns), copy=False)
+
+    def to_arrow(self, columns=SCHEDULE_COLUMNS):
+        """Return the schedule as a pyarrow Table built from zero-copy column buffers (requires pyarrow)."""
+        try:
+            import pyarrow as pa
+        except ImportError:
+            raise ImportError("Exporting to Arrow requires the 'pyarrow' library.")
+        return pa.table({name: pa.array(column) for name, column in zip(columns, self.data)})
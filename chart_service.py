@@ -0,0 +1,132 @@
+import hashlib
+from collections import OrderedDict
+from io import BytesIO
+
+import numpy as np
+from matplotlib.figure import Figure
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+
+from audit_log import record_chart, record_file, stage
+
+# ----------------------------------------
+# Chart Service
+# ----------------------------------------
+
+# Charts are described by a key (a digest of everything the chart depends on)
+# and a draw function taking a matplotlib Axes. The same draw function paints
+# the on-screen Tk canvas and, for exports, a pooled off-screen Agg figure at
+# export DPI, so saving a chart never re-renders or resizes what is on screen.
+# PNG bytes are cached per key, so exporting an unchanged chart again reuses
+# the last render.
+
+EXPORT_DPI = 150
+DEFAULT_FIGSIZE = (6, 4)
+
+
+def chart_key(*parts):
+    """Return a digest identifying a chart state from arrays, numbers and strings."""
+    digest = hashlib.blake2b(digest_size=16)
+    for part in parts:
+        if isinstance(part, np.ndarray):
+            digest.update(np.ascontiguousarray(part).tobytes())
+            digest.update(str(part.shape).encode())
+        else:
+            digest.update(repr(part).encode())
+        digest.update(b"|")
+    return digest.hexdigest()
+
+
+class ChartService:
+    def __init__(self, export_dpi=EXPORT_DPI, cache_size=32, pool_size=2):
+        self.export_dpi = export_dpi
+        self.cache_size = cache_size
+        self.pool_size = pool_size
+        self._png_cache = OrderedDict()
+        self._pool = {}
+        self._tk_canvas_class = None
+        # Key last drawn on each on-screen canvas
+        self._shown = {}
+        self.cache_hits = 0
+        self.renders = 0
+
+    def create_canvas(self, master, figsize=DEFAULT_FIGSIZE, dpi=100):
+        """Return (figure, canvas) for an on-screen chart; the Tk backend is set up on first use only."""
+        if self._tk_canvas_class is None:
+            import matplotlib
+            matplotlib.use("TkAgg")  # Use TkAgg backend for Tkinter
+            from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
+            self._tk_canvas_class = FigureCanvasTkAgg
+        figure = Figure(figsize=figsize, dpi=dpi)
+        return figure, self._tk_canvas_class(figure, master=master)
+
+    def show(self, canvas, key, draw):
+        """Redraw an on-screen chart, skipping the work if it already shows this key.
+
+        draw is called with every axes of the canvas's figure, cleared.
+        """
+        if self._shown.get(id(canvas)) == key:
+            record_chart(cache_hit=True)
+            return
+        with stage("chart render"):
+            axes = canvas.figure.axes
+            for ax in axes:
+                ax.clear()
+            draw(*axes)
+            canvas.draw_idle()
+        record_chart(cache_hit=False)
+        self._shown[id(canvas)] = key
+
+    def png(self, key, draw, figsize=DEFAULT_FIGSIZE, dpi=None):
+        """Return PNG bytes for a chart, rendering off-screen only if this state was not rendered before."""
+        dpi = dpi or self.export_dpi
+        cache_key = (key, tuple(figsize), dpi)
+        if cache_key in self._png_cache:
+            self._png_cache.move_to_end(cache_key)
+            self.cache_hits += 1
+            record_chart(cache_hit=True)
+            return self._png_cache[cache_key]
+
+        with stage("chart render"):
+            figure = self._acquire(figsize)
+            try:
+                draw(figure.add_subplot(111))
+                buffer = BytesIO()
+                figure.savefig(buffer, format="png", dpi=dpi)
+            finally:
+                self._release(figure)
+        self.renders += 1
+        record_chart(cache_hit=False)
+
+        data = buffer.getvalue()
+        self._png_cache[cache_key] = data
+        if len(self._png_cache) > self.cache_size:
+            self._png_cache.popitem(last=False)
+        return data
+
+    def save_png(self, file_path, key, draw, figsize=DEFAULT_FIGSIZE, dpi=None):
+        """Write a chart to a PNG file, reusing the cached render when possible."""
+        data = self.png(key, draw, figsize, dpi)
+        with stage("write"):
+            with open(file_path, "wb") as f:
+                f.write(data)
+        record_file(file_path)
+        return len(data)
+
+    def clear(self):
+        """Forget the cached PNG renders and what each canvas shows, so every chart is drawn afresh."""
+        self._png_cache.clear()
+        self._shown.clear()
+
+    def _acquire(self, figsize):
+        idle = self._pool.get(tuple(float(size) for size in figsize))
+        if idle:
+            return idle.pop()
+        figure = Figure(figsize=figsize)
+        FigureCanvasAgg(figure)
+        return figure
+
+    def _release(self, figure):
+        figure.clear()
+        idle = self._pool.setdefault(tuple(float(size) for size in figure.get_size_inches()), [])
+        if len(idle) < self.pool_size:
+            idle.append(figure)
@@ -1,17 +1,32 @@
 import tkinter as tk
 from tkinter import ttk
 from tkinter.scrolledtext import ScrolledText
-from tkinter import messagebox, filedialog
+from tkinter import messagebox, filedialog, simpledialog
 import pandas as pd
 import re
 import tkinter.font as tkFont
 import os
-
-# Import matplotlib modules for charting
-import matplotlib
-matplotlib.use("TkAgg")  # Use TkAgg backend for Tkinter
-from matplotlib.figure import Figure
-from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
+import functools
+import numpy as np
+
+from io import BytesIO
+
+from audit_log import AuditLog, read_log, record_error, record_file, stage, summarize
+from calculations import break_even_point, split_years_months
+from cash_flow_adjustments import DEPRECIATION_METHODS, AdjustmentPipeline, nominal_rate
+from cash_flow_schedule import PERIOD_GRANULARITIES, CashFlowSchedule, parse_cash_flows
+from goal_seek import goal_seek_scenarios, secant_solve, seek_break_even, seek_npv, seek_payback
+from dated_cash_flows import DAY_COUNT_CONVENTIONS, parse_dated_cash_flows, xirr, year_fractions
+from sensitivity import break_even_sensitivities, npv_sensitivities
+from project_file import PROJECT_FILE_EXTENSION, Workspace, in_memory, save_project
+from payback_simulation import simulate_payback
+from project_import import IMPORT_FILE_TYPES, import_projects
+from real_options import Abandon, Contract, Expand, value_real_options, value_schedule_options
+from scenarios import ScenarioSet
+from sparse_cash_flows import is_sparse_entry, parse_sparse_cash_flows, sparse_bcr_batch, stack_events
+
+# Charts are created and exported through the shared chart service, which also sets up the matplotlib backend
+from chart_service import ChartService, chart_key
 
 # ----------------------------------------
 # Scrollable Frame Class
@@ -40,50 +55,264 @@ class ScrollableFrame(ttk.Frame):
         canvas.pack(side="left", fill="both", expand=True)
         scrollbar.pack(side="right", fill="y")
 
+# Replace the text of an Entry widget
+def set_entry(entry, value):
+    entry.delete(0, tk.END)
+    entry.insert(0, value)
+
+# Roll a schedule up to the granularity chosen in a 'Show By' box, or keep its own if that is finer
+def schedule_view(schedule, show_by):
+    periods_per_year = PERIOD_GRANULARITIES[show_by]
+    if schedule.periods_per_year % periods_per_year:
+        return schedule
+    return schedule.rolled_up(periods_per_year)
+
+# Report an error in a dialog, marking the operation being audited (if any) as failed
+def show_error(title, message):
+    record_error(f"{title}: {message}")
+    messagebox.showerror(title, message)
+
 # ----------------------------------------
-# Main Application Window
+# Audit Trail
 # ----------------------------------------
 
-# Create the main application window
-root = tk.Tk()
-root.title('Cost-Benefit Analysis Toolkit')
-root.geometry('900x700')  # Increased window size to accommodate charts
+def tab_inputs(*apps):
+    """Return (name, text) of every entry, combo box and text box of the given tabs."""
+    inputs = []
+    for app in apps:
+        for name, widget in sorted(vars(app).items()):
+            if isinstance(widget, ttk.Entry):
+                inputs.append((name, widget.get()))
+            elif isinstance(widget, tk.Text):
+                inputs.append((name, widget.get("1.0", "end")))
+            elif name == "entries" and isinstance(widget, dict):
+                inputs.extend((key, entry.get()) for key, entry in sorted(widget.items()))
+    return inputs
+
+
+def audited(operation, kind="calculation", inputs=None):
+    """Log each call of a handler to the audit trail.
+
+    The inputs hash covers what inputs(*args) returns, by default the entries
+    of the handler's own tab.
+    """
+    def decorate(function):
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            parts = inputs(*args) if inputs is not None else tab_inputs(args[0])
+            with audit_log.operation(operation, kind, chart_key(*parts)):
+                return function(*args, **kwargs)
+        return wrapper
+    return decorate
+
+
+def scenario_inputs(scenario_app, calculator):
+    """Return the names and inputs of a calculator's scenarios as a flat list, arrays kept whole for hashing."""
+    scenario_set = scenario_app.scenario_sets[calculator]
+    return [part for name, inputs in scenario_set.scenarios.items() for part in (name, *inputs.values())]
 
-# Initialize ttk.Style and set the 'clam' theme
-style = ttk.Style()
-style.theme_use('clam')
+# ----------------------------------------
+# Live Recalculation
+# ----------------------------------------
 
-# Configure the 'TButton' style
-style.configure('TButton',
-                background='#d0e8f1',
-                foreground='black',
-                padding=6)
-style.map('TButton',
-          background=[('active', '#87CEFA')],
-          foreground=[('active', 'black')])
+class LiveRecalculator:
+    """Re-run a calculator shortly after the last edit to any of its entries.
+
+    Edits arriving within delay_ms of each other are coalesced into one run.
+    The callback updates its results straight away and may return a render
+    function (table and chart refresh); that is run when Tk is next idle, and
+    dropped if another edit has arrived in the meantime.
+    """
+
+    def __init__(self, widget, entries, callback, enabled, delay_ms=30):
+        self.widget = widget
+        self.callback = callback
+        self.enabled = enabled
+        self.delay_ms = delay_ms
+        self._job = None
+        self._generation = 0
+
+        for entry in entries:
+            # Keep the current text: attaching an empty variable would clear the entry
+            variable = tk.StringVar(self.widget, value=entry.get())
+            entry.configure(textvariable=variable)
+            entry.live_variable = variable
+            variable.trace_add("write", self.schedule)
+
+    def schedule(self, *args):
+        """Restart the debounce timer; any render still waiting for an earlier edit becomes stale."""
+        if not self.enabled.get():
+            return
+        self._generation += 1
+        if self._job is not None:
+            self.widget.after_cancel(self._job)
+        self._job = self.widget.after(self.delay_ms, self._run)
+
+    def _run(self):
+        self._job = None
+        generation = self._generation
+        render = self.callback()
+        if render is not None:
+            self.widget.after_idle(self._render, generation, render)
+
+    def _render(self, generation, render):
+        if generation == self._generation:
+            render()
 
-# Create a Scrollable Frame to hold the Notebook
-scrollable_container = ScrollableFrame(root)
-scrollable_container.pack(fill='both', expand=True)
+# ----------------------------------------
+# Canvas Table
+# ----------------------------------------
 
-# Create a Notebook widget to hold tabs within the scrollable frame
-notebook = ttk.Notebook(scrollable_container.scrollable_frame)
-notebook.pack(expand=1, fill='both')
+class FontMetrics:
+    """Text widths from per-character advances, each measured once per font."""
+
+    def __init__(self, font):
+        self.font = tkFont.Font(font=font)
+        self.linespace = self.font.metrics("linespace")
+        self._advances = {}
+
+    def measure(self, text):
+        advances = self._advances
+        width = 0
+        for char in str(text):
+            advance = advances.get(char)
+            if advance is None:
+                advance = advances[char] = self.font.measure(char)
+            width += advance
+        return width
+
+    def widest(self, texts):
+        """Return the width of the widest text, measuring only the texts long enough to be wider than the widest so far."""
+        texts = sorted(set(texts), key=len, reverse=True)
+        if not texts:
+            return 0
+        max_advance = max(self.measure(char) for char in set("".join(texts)) or " ")
+        widest = 0
+        for text in texts:
+            if len(text) * max_advance <= widest:
+                break
+            widest = max(widest, self.measure(text))
+        return widest
+
+
+class CanvasTable(ttk.Frame):
+    """Table drawn on a single canvas from rows of values.
+
+    Only the rows in view have canvas items, so thousands of rows cost no
+    more to show than a dozen. Rows are styled through tags, as in a
+    Treeview, and columns can have their own text colour.
+    """
+
+    def __init__(self, container, font=('Arial', 10), header_font=('Arial', 10, 'bold'), visible_rows=10,
+                 column_colors=None, padding=10):
+        super().__init__(container)
+        self.metrics = FontMetrics(font)
+        self.header_metrics = FontMetrics(header_font)
+        self.padding = padding
+        self.row_height = max(self.metrics.linespace, self.header_metrics.linespace) + padding // 2
+        self.column_colors = column_colors or {}
+        self.columns = ()
+        self.rows = []
+        self.row_tags = []
+        self.tags = {}
+        self.widths = []
+        self._drawn = None
+
+        # The header scrolls sideways with the body but stays put vertically
+        self.header = tk.Canvas(self, height=self.row_height + 1, background="#ffffff", highlightthickness=0)
+        self.body = tk.Canvas(self, height=visible_rows * self.row_height, background="#ffffff", highlightthickness=0)
+        self.vsb = ttk.Scrollbar(self, orient="vertical", command=self.body.yview)
+        hsb = ttk.Scrollbar(self, orient="horizontal", command=self.xview)
+        self.body.configure(yscrollcommand=self.on_yscroll, xscrollcommand=hsb.set, yscrollincrement=self.row_height)
+
+        self.header.grid(row=0, column=0, sticky='ew')
+        self.body.grid(row=1, column=0, sticky='nsew')
+        self.vsb.grid(row=1, column=1, sticky='ns')
+        hsb.grid(row=2, column=0, sticky='ew')
+        self.grid_columnconfigure(0, weight=1)
+        self.grid_rowconfigure(1, weight=1)
+
+        self.body.bind("<Configure>", lambda event: self.draw_visible())
+        self.body.bind("<MouseWheel>", lambda event: self.body.yview_scroll(-1 if event.delta > 0 else 1, "units"))
+        self.body.bind("<Button-4>", lambda event: self.body.yview_scroll(-1, "units"))
+        self.body.bind("<Button-5>", lambda event: self.body.yview_scroll(1, "units"))
+
+    def tag_configure(self, tag, background=None, foreground=None):
+        self.tags[tag] = {"background": background, "foreground": foreground}
+
+    def set_rows(self, columns, rows, tags=None):
+        """Show new rows; each row is a sequence of values, tags an optional tag per row."""
+        self.columns = tuple(columns)
+        self.rows = [tuple(map(str, row)) for row in rows]
+        self.row_tags = list(tags) if tags is not None else [None] * len(self.rows)
+
+        # Each column is as wide as its widest cell
+        cells = list(zip(*self.rows)) or [()] * len(self.columns)
+        self.widths = [
+            max(self.header_metrics.measure(column), self.metrics.widest(values)) + 2 * self.padding
+            for column, values in zip(self.columns, cells)
+        ]
+        total_width = sum(self.widths)
+        self.header.configure(scrollregion=(0, 0, total_width, self.row_height))
+        self.body.configure(scrollregion=(0, 0, total_width, len(self.rows) * self.row_height))
+        self.draw_header()
+        self._drawn = None
+        self.draw_visible()
+
+    def xview(self, *args):
+        self.header.xview(*args)
+        self.body.xview(*args)
+
+    def on_yscroll(self, first, last):
+        self.vsb.set(first, last)
+        self.draw_visible()
+
+    def draw_header(self):
+        self.header.delete("all")
+        x = 0
+        for column, width in zip(self.columns, self.widths):
+            self.header.create_rectangle(x, 0, x + width, self.row_height, fill="#e6e6e6", outline="black")
+            self.header.create_text(x + width / 2, self.row_height / 2, text=column, font=self.header_metrics.font)
+            x += width
+
+    def draw_visible(self):
+        """Create canvas items for the rows in view only, replacing those of the previous view."""
+        top = self.body.canvasy(0)
+        first = max(int(top // self.row_height), 0)
+        last = min(int((top + self.body.winfo_height()) // self.row_height) + 1, len(self.rows))
+        if self._drawn == (first, last, len(self.rows)):
+            return
+        self._drawn = (first, last, len(self.rows))
+
+        self.body.delete("all")
+        for index in range(first, last):
+            style = self.tags.get(self.row_tags[index], {})
+            background = style.get("background") or "#ffffff"
+            y = index * self.row_height
+            x = 0
+            for column_index, (value, width) in enumerate(zip(self.rows[index], self.widths)):
+                foreground = self.column_colors.get(column_index) or style.get("foreground") or "black"
+                self.body.create_rectangle(x, y, x + width, y + self.row_height, fill=background, outline="black")
+                self.body.create_text(x + self.padding, y + self.row_height / 2, text=value, anchor='w',
+                                      font=self.metrics.font, fill=foreground)
+                x += width
 
 # ----------------------------------------
-# First Tab: About CBA
+# Main Application Window
 # ----------------------------------------
 
-# Create a frame for the 'About CBA' tab
-about_cba_frame = ttk.Frame(notebook)
-notebook.add(about_cba_frame, text='About CBA')
+# Shared chart service: on-screen canvases, off-screen export renders and the PNG cache
+chart_service = ChartService()
+
+# Append-only log of every calculation and export, written in the background
+audit_log = AuditLog()
 
-# Create a ScrolledText widget for the content
-scrolled_text = ScrolledText(about_cba_frame, wrap='word', font=('Arial', 12))
-scrolled_text.pack(expand=1, fill='both')
+# ----------------------------------------
+# First Tab: About CBA
+# ----------------------------------------
 
-# Insert the formatted content
-content = '''
+# Content of the 'About CBA' tab
+ABOUT_CBA_CONTENT = '''
 1. **Define Scope:** Clarify procurement project goals, including evaluated products & desired outcomes.
 
 2. **Identify Costs:**
@@ -117,124 +346,96 @@ content = '''
 10. **Monitor Post-Decision:** Continuously track implementation & performance against anticipated benefits & costs to ensure alignment with goals.
 '''
 
-# Clear any existing content
-scrolled_text.delete('1.0', tk.END)
-
-# Insert the content
-scrolled_text.insert('1.0', content)
-
-# Apply formatting
-# Define font styles
-bold_font = ('Arial', 12, 'bold')
-normal_font = ('Arial', 12)
-
-# Tag configurations
-scrolled_text.tag_configure('bold', font=bold_font, foreground='dark blue')
-scrolled_text.tag_configure('normal', font=normal_font)
-scrolled_text.tag_configure('indent', lmargin1=25, lmargin2=25)
-scrolled_text.tag_configure('sub_indent', lmargin1=50, lmargin2=50)
-
-# Apply tags
-
-# Patterns for headings and subheadings
-heading_pattern = r'^(\d+\.\s\*\*)(.+?)(\*\*)(.*)'
-subheading_pattern = r'^(\s*-\s\*\*)(.+?)(\*\*)(.*)'
-
-lines = content.split('\n')
-current_index = 1.0
-
-for line in lines:
-    line = line.rstrip()
-    if line.strip() == '':
-        current_index += 1
-        continue
-
-    # Check for heading
-    heading_match = re.match(heading_pattern, line)
-    subheading_match = re.match(subheading_pattern, line)
-
-    if heading_match:
-        # Apply bold and color to heading
-        start_idx = f"{current_index} + {len(heading_match.group(1))} chars"
-        end_idx = f"{current_index} + {len(heading_match.group(1) + heading_match.group(2))} chars"
-        scrolled_text.tag_add('bold', start_idx, end_idx)
-        scrolled_text.tag_add('indent', f"{current_index}", f"{current_index} lineend")
-    elif subheading_match:
-        # Apply bold and color to subheading
-        start_idx = f"{current_index} + {len(subheading_match.group(1))} chars"
-        end_idx = f"{current_index} + {len(subheading_match.group(1) + subheading_match.group(2))} chars"
-        scrolled_text.tag_add('bold', start_idx, end_idx)
-        scrolled_text.tag_add('sub_indent', f"{current_index}", f"{current_index} lineend")
-    else:
-        # Normal text
-        scrolled_text.tag_add('normal', f"{current_index}", f"{current_index} lineend")
-        if line.startswith('   -'):
+def build_about_tab(parent):
+    """Fill the 'About CBA' tab with the formatted CBA steps and a Copy button."""
+    # Create a ScrolledText widget for the content
+    scrolled_text = ScrolledText(parent, wrap='word', font=('Arial', 12))
+    scrolled_text.pack(expand=1, fill='both')
+
+    # Clear any existing content
+    scrolled_text.delete('1.0', tk.END)
+
+    # Insert the content
+    scrolled_text.insert('1.0', ABOUT_CBA_CONTENT)
+
+    # Apply formatting
+    # Define font styles
+    bold_font = ('Arial', 12, 'bold')
+    normal_font = ('Arial', 12)
+
+    # Tag configurations
+    scrolled_text.tag_configure('bold', font=bold_font, foreground='dark blue')
+    scrolled_text.tag_configure('normal', font=normal_font)
+    scrolled_text.tag_configure('indent', lmargin1=25, lmargin2=25)
+    scrolled_text.tag_configure('sub_indent', lmargin1=50, lmargin2=50)
+
+    # Apply tags
+
+    # Patterns for headings and subheadings
+    heading_pattern = r'^(\d+\.\s\*\*)(.+?)(\*\*)(.*)'
+    subheading_pattern = r'^(\s*-\s\*\*)(.+?)(\*\*)(.*)'
+
+    lines = ABOUT_CBA_CONTENT.split('\n')
+    current_index = 1.0
+
+    for line in lines:
+        line = line.rstrip()
+        if line.strip() == '':
+            current_index += 1
+            continue
+
+        # Check for heading
+        heading_match = re.match(heading_pattern, line)
+        subheading_match = re.match(subheading_pattern, line)
+
+        if heading_match:
+            # Apply bold and color to heading
+            start_idx = f"{current_index} + {len(heading_match.group(1))} chars"
+            end_idx = f"{current_index} + {len(heading_match.group(1) + heading_match.group(2))} chars"
+            scrolled_text.tag_add('bold', start_idx, end_idx)
+            scrolled_text.tag_add('indent', f"{current_index}", f"{current_index} lineend")
+        elif subheading_match:
+            # Apply bold and color to subheading
+            start_idx = f"{current_index} + {len(subheading_match.group(1))} chars"
+            end_idx = f"{current_index} + {len(subheading_match.group(1) + subheading_match.group(2))} chars"
+            scrolled_text.tag_add('bold', start_idx, end_idx)
             scrolled_text.tag_add('sub_indent', f"{current_index}", f"{current_index} lineend")
         else:
-            scrolled_text.tag_add('indent', f"{current_index}", f"{current_index} lineend")
+            # Normal text
+            scrolled_text.tag_add('normal', f"{current_index}", f"{current_index} lineend")
+            if line.startswith('   -'):
+                scrolled_text.tag_add('sub_indent', f"{current_index}", f"{current_index} lineend")
+            else:
+                scrolled_text.tag_add('indent', f"{current_index}", f"{current_index} lineend")
 
-    current_index += 1
+        current_index += 1
 
-# Disable editing
-scrolled_text.config(state='disabled')
+    # Disable editing
+    scrolled_text.config(state='disabled')
 
-# Function to copy the content to clipboard
-def copy_to_clipboard():
-    try:
-        scrolled_text.config(state='normal')
-        content = scrolled_text.get('1.0', tk.END).strip()
-        scrolled_text.config(state='disabled')
-        root.clipboard_clear()
-        root.clipboard_append(content)
-        messagebox.showinfo("Copy Successful", "Content has been copied to the clipboard.")
-    except Exception as e:
-        messagebox.showerror("Error", f"An error occurred while copying to clipboard:\n{e}")
+    # Function to copy the content to clipboard
+    def copy_to_clipboard():
+        try:
+            scrolled_text.config(state='normal')
+            content = scrolled_text.get('1.0', tk.END).strip()
+            scrolled_text.config(state='disabled')
+            parent.clipboard_clear()
+            parent.clipboard_append(content)
+            messagebox.showinfo("Copy Successful", "Content has been copied to the clipboard.")
+        except Exception as e:
+            show_error("Error", f"An error occurred while copying to clipboard:\n{e}")
 
-# Add the 'Copy' button below the scrolled text
-copy_button_cba = ttk.Button(about_cba_frame, text="Copy", command=copy_to_clipboard)
-copy_button_cba.pack(pady=10)
+    # Add the 'Copy' button below the scrolled text
+    copy_button_cba = ttk.Button(parent, text="Copy", command=copy_to_clipboard)
+    copy_button_cba.pack(pady=10)
 
 # ----------------------------------------
 # Second Tab: BCR vs. Net Profit
 # ----------------------------------------
 
-# Add a new tab for 'BCR vs. Net Profit'
-bcr_vs_profit_frame = ttk.Frame(notebook)
-notebook.add(bcr_vs_profit_frame, text='BCR vs. Net Profit')
-
-# Add a heading above the table
-heading_label = ttk.Label(
-    bcr_vs_profit_frame,
-    text="Key Differences between BCR and Net Profit",
-    font=('Arial', 14, 'bold')
-)
-heading_label.pack(pady=10)
-
-# Create a frame for the scrollable table
-table_container = ttk.Frame(bcr_vs_profit_frame)
-table_container.pack(expand=1, fill='both', padx=10)
-
-# Create a canvas inside the frame
-table_canvas = tk.Canvas(table_container)
-table_canvas.pack(side=tk.LEFT, fill='both', expand=1)
-
-# Add scrollbars to the canvas
-vsb = ttk.Scrollbar(table_container, orient="vertical", command=table_canvas.yview)
-vsb.pack(side=tk.RIGHT, fill='y')
-
-hsb = ttk.Scrollbar(bcr_vs_profit_frame, orient="horizontal", command=table_canvas.xview)
-hsb.pack(side=tk.BOTTOM, fill='x')
-
-table_canvas.configure(yscrollcommand=vsb.set, xscrollcommand=hsb.set)
-
-# Create a frame inside the canvas
-table_frame = ttk.Frame(table_canvas)
-table_canvas.create_window((0, 0), window=table_frame, anchor='nw')
-
 # Define fonts
 header_font = ('Arial', 10, 'bold')
 cell_font = ('Arial', 10)
-metric_color_font = ('Arial', 10)
 metric_color = 'dark blue'
 
 # Define columns and data for the table
@@ -248,106 +449,120 @@ data = [
     ("Time Value of Money:", "Uses discounted present values", "Does not require discounting")
 ]
 
-# Calculate the maximum width for each column
-def get_max_col_width(data_list, font):
-    max_width = []
-    for col in zip(*data_list):
-        col_width = max([tkFont.Font(font=font).measure(str(item)) for item in col])
-        max_width.append(col_width)
-    return max_width
-
-col_max_widths = get_max_col_width([columns] + data, cell_font)
-total_width = sum(col_max_widths)
-
-# Create the header labels
-for col_index, col_name in enumerate(columns):
-    header_label = ttk.Label(
-        table_frame,
-        text=col_name,
-        font=header_font,
-        anchor='center',
-        borderwidth=1,
-        relief='solid'
-    )
-    header_label.grid(row=0, column=col_index, sticky='nsew')
-    # Set the column width
-    table_frame.grid_columnconfigure(col_index, minsize=col_max_widths[col_index] + 20)
-
-# List of Metrics to color
-metrics_to_color = ["Definition", "Formula", "Interpretation", "Focus", "Decision-Making", "Time Value of Money"]
-
-# Insert data into the table
-for row_index, row_data in enumerate(data, start=1):
-    for col_index, cell_value in enumerate(row_data):
-        # Determine if this cell is in the Metric column and needs to be colored
-        if col_index == 0 and cell_value.strip(':') in metrics_to_color:
-            label = ttk.Label(
-                table_frame,
-                text=cell_value,
-                font=metric_color_font,
-                foreground=metric_color,
-                anchor='w',
-                borderwidth=1,
-                relief='solid',
-                wraplength=col_max_widths[col_index] + 20
-            )
-        else:
-            label = ttk.Label(
-                table_frame,
-                text=cell_value,
-                font=cell_font,
-                anchor='w',
-                borderwidth=1,
-                relief='solid',
-                wraplength=col_max_widths[col_index] + 20
-            )
-        label.grid(row=row_index, column=col_index, sticky='nsew')
+# Define the BCRComparisonApp class
+class BCRComparisonApp:
+    def __init__(self, parent, app):
+        self.parent = parent
+        self.app = app
 
-    # Apply alternating row colors
-    bg_color = "#f0f0f0" if row_index % 2 == 0 else "#ffffff"
-    for col_index in range(len(columns)):
-        label = table_frame.grid_slaves(row=row_index, column=col_index)[0]
-        label.configure(background=bg_color)
+        # Add a heading above the table
+        ttk.Label(self.parent, text="Key Differences between BCR and Net Profit", font=('Arial', 14, 'bold')).pack(pady=10)
 
-# Adjust row weights
-for row_index in range(len(data) + 1):
-    table_frame.grid_rowconfigure(row_index, weight=1)
+        # Draw the table on one canvas, with the Metric column coloured and alternating row backgrounds
+        self.comparison_table = CanvasTable(self.parent, font=cell_font, header_font=header_font,
+                                            visible_rows=len(data), column_colors={0: metric_color})
+        self.comparison_table.pack(fill='x', padx=10)
+        self.comparison_table.tag_configure("even", background="#f0f0f0")
+        self.comparison_table.set_rows(columns, data, ["even" if row_index % 2 == 0 else "odd" for row_index in range(1, len(data) + 1)])
 
-# Update the scroll region when the size of the frame changes
-def on_frame_configure(event):
-    table_canvas.configure(scrollregion=table_canvas.bbox("all"))
+        # Add the 'Download' button below the table
+        ttk.Button(self.parent, text="Download", command=self.download_to_excel).pack(pady=10)
 
-table_frame.bind("<Configure>", on_frame_configure)
+        # Heading for the BCRs computed from the NPV scenarios
+        ttk.Label(self.parent, text="BCR and Net Profit of NPV Scenarios", font=('Arial', 14, 'bold')).pack(pady=10)
+        ttk.Label(self.parent, text="Uses the NPV scenarios on the Scenarios tab, including projects imported from the File menu.").pack()
 
-# Function to download the table data to Excel
-def download_to_excel_bcr():
-    try:
-        # Convert data to pandas DataFrame
-        df = pd.DataFrame(data, columns=columns)
-        # Save to Excel file at the specified path
-        desktop_path = os.path.join(os.path.expanduser("~"), "Desktop")
-        file_path = os.path.join(desktop_path, 'BCR_vs_Net_Profit.xlsx')
-        df.to_excel(file_path, index=False)
-        messagebox.showinfo("Download Successful", f"Table data has been exported to 'BCR_vs_Net_Profit.xlsx' on your Desktop.")
-    except Exception as e:
-        messagebox.showerror("Error", f"An error occurred while exporting to Excel:\n{e}")
+        # Calculate and Download Buttons
+        button_frame = ttk.Frame(self.parent)
+        button_frame.pack(pady=10)
+        ttk.Button(button_frame, text="Calculate BCRs", command=self.calculate_project_bcrs).grid(row=0, column=0, padx=10)
+        ttk.Button(button_frame, text="Download BCR Results", command=self.download_project_bcrs).grid(row=0, column=1, padx=10)
+
+        self.summary_label = ttk.Label(self.parent, text="", font=("Helvetica", 12))
+        self.summary_label.pack(pady=5)
+
+        # Scenario table, green where the BCR is at least 1 and red otherwise
+        self.project_table = CanvasTable(self.parent, font=cell_font, header_font=header_font, visible_rows=12)
+        self.project_table.pack(fill='both', expand=True, padx=10, pady=(0, 10))
+        self.project_table.tag_configure("viable", foreground="dark green")
+        self.project_table.tag_configure("not_viable", foreground="red")
+
+        # BCR results of the last calculation, used by the Excel export
+        self.results = None
+
+    @audited("bcr.download_comparison", "export")
+    def download_to_excel(self):
+        """Download the comparison table to an Excel file."""
+        try:
+            # Convert data to pandas DataFrame
+            df = pd.DataFrame(data, columns=columns)
+            # Save to Excel file at the specified path
+            desktop_path = os.path.join(os.path.expanduser("~"), "Desktop")
+            file_path = os.path.join(desktop_path, 'BCR_vs_Net_Profit.xlsx')
+            with stage("write"):
+                df.to_excel(file_path, index=False)
+            record_file(file_path)
+            messagebox.showinfo("Download Successful", f"Table data has been exported to 'BCR_vs_Net_Profit.xlsx' on your Desktop.")
+        except Exception as e:
+            show_error("Error", f"An error occurred while exporting to Excel:\n{e}")
+
+    @audited("bcr.calculate_projects", inputs=lambda self: scenario_inputs(self.app.scenario_app, "npv"))
+    def calculate_project_bcrs(self):
+        """Compute the BCR and net profit of every NPV scenario and show them in the project table."""
+        scenario_set = self.app.scenario_app.scenario_sets["npv"]
+        if not scenario_set.scenarios:
+            show_error("Error", "Please add NPV scenarios on the Scenarios tab or import projects from the File menu first.")
+            return
+
+        names = list(scenario_set.scenarios)
+        inputs = list(scenario_set.scenarios.values())
+        with stage("compute"):
+            projects, periods, amounts, periods_per_year = stack_events(inputs)
+            results = sparse_bcr_batch(np.array([i["discount_rate"] for i in inputs]) / 100, [i["initial_investment"] for i in inputs],
+                                       projects, periods, amounts, periods_per_year)
+        self.results = pd.DataFrame({
+            "Project": names,
+            "PV of Benefits (£)": results["pv_benefits"],
+            "PV of Costs (£)": results["pv_costs"],
+            "BCR": results["bcr"],
+            "Net Profit (£)": results["net_profit"]
+        })
+
+        viable = results["bcr"] >= 1
+        self.project_table.set_rows(
+            self.results.columns,
+            zip(names, (f"£{value:,.2f}" for value in results["pv_benefits"]), (f"£{value:,.2f}" for value in results["pv_costs"]),
+                (f"{value:.3f}" for value in results["bcr"]), (f"£{value:,.2f}" for value in results["net_profit"])),
+            ["viable" if ok else "not_viable" for ok in viable]
+        )
+        self.summary_label.config(text=f"{int(viable.sum()):,} of {len(names):,} scenarios have a BCR of at least 1")
+
+    @audited("bcr.download_projects", "export", inputs=lambda self: scenario_inputs(self.app.scenario_app, "npv"))
+    def download_project_bcrs(self):
+        """Download the BCR results of the NPV scenarios to an Excel file."""
+        try:
+            if self.results is None:
+                show_error("Error", "Please click 'Calculate BCRs' first.")
+                return
+            desktop_path = os.path.join(os.path.expanduser("~"), "Desktop")
+            file_path = os.path.join(desktop_path, 'BCR_of_Scenarios.xlsx')
+            with stage("write"):
+                self.results.to_excel(file_path, index=False)
+            record_file(file_path)
+            messagebox.showinfo("Download Successful", f"BCR results have been saved to {file_path}")
+        except Exception as e:
+            show_error("Error", f"An error occurred while exporting to Excel:\n{e}")
 
-# Add the 'Download' button below the table
-download_button_bcr = ttk.Button(bcr_vs_profit_frame, text="Download", command=download_to_excel_bcr)
-download_button_bcr.pack(pady=10)
 
 # ----------------------------------------
 # Third Tab: Payback Period Calculator
 # ----------------------------------------
 
-# Add a new tab for 'Payback Period Calculator'
-payback_period_frame = ttk.Frame(notebook)
-notebook.add(payback_period_frame, text='Payback Period')
-
 # Define the PaybackPeriodApp class adjusted for integration
 class PaybackPeriodApp:
-    def __init__(self, parent):
+    def __init__(self, parent, app):
         self.parent = parent
+        self.app = app
 
         # Title Label
         ttk.Label(self.parent, text="Payback Period Calculator", font=("Helvetica", 16)).pack(pady=10)
@@ -369,9 +584,24 @@ class PaybackPeriodApp:
         self.annual_cash_flow_entry.grid(row=1, column=1, padx=5, pady=5)
         self.annual_cash_flow_entry.insert(0, "2500")  # Default Data
 
+        # Granularity the schedule is calculated at, and the one the table and chart total it up to
+        ttk.Label(input_frame, text="Periods: ").grid(row=2, column=0, padx=5, pady=5)
+        self.periods_combo = ttk.Combobox(input_frame, values=list(PERIOD_GRANULARITIES), state="readonly", width=12)
+        self.periods_combo.grid(row=2, column=1, padx=5, pady=5)
+        self.periods_combo.set("Annual")
+
+        ttk.Label(input_frame, text="Show By: ").grid(row=3, column=0, padx=5, pady=5)
+        self.show_by_combo = ttk.Combobox(input_frame, values=list(PERIOD_GRANULARITIES), state="readonly", width=12)
+        self.show_by_combo.grid(row=3, column=1, padx=5, pady=5)
+        self.show_by_combo.set("Annual")
+        self.show_by_combo.bind("<<ComboboxSelected>>", lambda event: self.schedule is not None and self.show_schedule(self.schedule))
+
         # Update Button
         ttk.Button(self.parent, text="Update", command=self.update_table).pack(pady=10)
 
+        # Schedule built by the last update
+        self.schedule = None
+
         # Table Frame
         self.table_frame = ttk.Frame(self.parent)
         self.table_frame.pack(pady=10, padx=20)
@@ -406,14 +636,10 @@ class PaybackPeriodApp:
         self.chart_frame.pack(pady=10, padx=20, fill='both', expand=True)
 
         # Initialize matplotlib Figure and Canvas
-        self.figure = Figure(figsize=(6, 4), dpi=100)
-        self.ax = self.figure.add_subplot(111)
-        self.ax.set_title("Cumulative Cash Flow Over Time")
-        self.ax.set_xlabel("Year")
-        self.ax.set_ylabel("£")
-
-        self.canvas = FigureCanvasTkAgg(self.figure, master=self.chart_frame)
-        self.canvas.draw()
+        self.figure, self.canvas = chart_service.create_canvas(self.chart_frame)
+        self.figure.add_subplot(111)
+        self.chart = (chart_key("payback"), self.draw_axes)
+        chart_service.show(self.canvas, *self.chart)
         self.canvas.get_tk_widget().pack(fill='both', expand=True)
 
         # Download Buttons Frame for Chart
@@ -423,150 +649,318 @@ class PaybackPeriodApp:
         # Download Chart Button
         ttk.Button(download_buttons_frame, text="Download Chart", command=self.download_chart).grid(row=0, column=0, padx=10)
 
+        # Monte Carlo simulation of uncertain annual benefits
+        simulation_frame = ttk.LabelFrame(self.parent, text="Uncertain Benefits (Monte Carlo)")
+        simulation_frame.pack(pady=10, padx=20)
+
+        ttk.Label(simulation_frame, text="Annual Growth (%): ").grid(row=0, column=0, padx=5, pady=5, sticky='e')
+        self.growth_entry = ttk.Entry(simulation_frame, width=10)
+        self.growth_entry.grid(row=0, column=1, padx=5, pady=5)
+        self.growth_entry.insert(0, "0")  # Default Data
+
+        ttk.Label(simulation_frame, text="Volatility (%): ").grid(row=0, column=2, padx=5, pady=5, sticky='e')
+        self.volatility_entry = ttk.Entry(simulation_frame, width=10)
+        self.volatility_entry.grid(row=0, column=3, padx=5, pady=5)
+        self.volatility_entry.insert(0, "20")  # Default Data
+
+        ttk.Label(simulation_frame, text="Paths: ").grid(row=1, column=0, padx=5, pady=5, sticky='e')
+        self.paths_entry = ttk.Entry(simulation_frame, width=10)
+        self.paths_entry.grid(row=1, column=1, padx=5, pady=5)
+        self.paths_entry.insert(0, "100000")  # Default Data
+
+        ttk.Label(simulation_frame, text="Horizon (years): ").grid(row=1, column=2, padx=5, pady=5, sticky='e')
+        self.horizon_entry = ttk.Entry(simulation_frame, width=10)
+        self.horizon_entry.grid(row=1, column=3, padx=5, pady=5)
+        self.horizon_entry.insert(0, "50")  # Default Data
+
+        simulation_buttons_frame = ttk.Frame(simulation_frame)
+        simulation_buttons_frame.grid(row=2, column=0, columnspan=4, pady=5)
+        ttk.Button(simulation_buttons_frame, text="Simulate Payback Distribution", command=self.simulate_distribution).grid(row=0, column=0, padx=10)
+        ttk.Button(simulation_buttons_frame, text="Download Histogram", command=self.download_histogram).grid(row=0, column=1, padx=10)
+
+        # Simulation Result Label
+        self.simulation_label = ttk.Label(self.parent, text="", font=("Helvetica", 12))
+        self.simulation_label.pack(pady=5)
+
+        # Histogram Chart Frame
+        self.histogram_frame = ttk.Frame(self.parent)
+        self.histogram_frame.pack(pady=10, padx=20, fill='both', expand=True)
+
+        # Initialize matplotlib Figure and Canvas for the payback histogram
+        self.histogram_figure, self.histogram_canvas = chart_service.create_canvas(self.histogram_frame)
+        self.histogram_figure.add_subplot(111)
+        self.histogram_chart = (chart_key("payback-distribution"), self.draw_histogram_axes)
+        chart_service.show(self.histogram_canvas, *self.histogram_chart)
+        self.histogram_canvas.get_tk_widget().pack(fill='both', expand=True)
+
+        # Distribution from the last simulation
+        self.distribution = None
+
+        # Recalculate as the inputs are edited
+        self.live = LiveRecalculator(self.parent, [self.initial_investment_entry, self.annual_cash_flow_entry, self.periods_combo],
+                                     self.recalculate, self.app.live_recalculation)
+        self.live.schedule()
+
+    def build_schedule(self):
+        """Read the input boxes and build the payback schedule (raises ValueError on invalid input)."""
+        # Retrieve values from input boxes
+        self.initial_investment = float(self.initial_investment_entry.get())
+        self.annual_cash_flow = float(self.annual_cash_flow_entry.get())
+
+        # Build the schedule, allowing for a longer payback period if needed
+        max_years = 50  # Optional limit to prevent excessive calculation
+        periods_per_year = PERIOD_GRANULARITIES[self.periods_combo.get()]
+        return CashFlowSchedule.until_payback(self.initial_investment, self.annual_cash_flow, max_years, periods_per_year)
+
     def update_table(self):
         """Populate the table with cash flows and cumulative cash flows based on user input."""
         try:
-            # Retrieve values from input boxes
-            self.initial_investment = float(self.initial_investment_entry.get())
-            self.annual_cash_flow = float(self.annual_cash_flow_entry.get())
-
-            # Clear existing rows in the table
-            self.tree.delete(*self.tree.get_children())
-
-            # Populate table with new values, allowing for a longer payback period if needed
-            cumulative_cash_flow = -self.initial_investment  # Start with negative initial investment
-            year = 1
-            max_years = 50  # Optional limit to prevent excessive calculation
-
-            cash_flow_data = []
-
-            while cumulative_cash_flow < 0 and year <= max_years:
-                cumulative_cash_flow += self.annual_cash_flow
-                cash_flow_display = f"£{self.annual_cash_flow:,.2f}"
-                cumulative_display = f"£{cumulative_cash_flow:,.2f}"
-
-                # Insert row in table
-                row_id = self.tree.insert("", "end", values=(year, cash_flow_display, cumulative_display))
-
-                # Apply green font to positive cumulative cash flow values
-                if cumulative_cash_flow >= 0:
-                    self.tree.tag_configure("positive", foreground="green")
-                    self.tree.item(row_id, tags=("positive",))
-
-                # Collect data for chart
-                cash_flow_data.append((year, cumulative_cash_flow))
-
-                year += 1
-
-            # Store data for chart
-            self.cash_flow_data = cash_flow_data
+            self.show_schedule(self.build_schedule())
 
             # Clear the previous result
             self.result_label.config(text="")
 
-            # Plot the chart
-            self.plot_chart()
-
         except ValueError:
-            messagebox.showerror("Input Error", "Please enter valid numbers for Initial Investment and Annual Net Benefits.")
+            show_error("Input Error", "Please enter valid numbers for Initial Investment and Annual Net Benefits.")
 
+    def recalculate(self):
+        """Refresh the result after an edit, returning the table and chart refresh; incomplete input is ignored."""
+        try:
+            schedule = self.build_schedule()
+        except ValueError:
+            return None
+        self.schedule = schedule
+        self.show_result()
+        return lambda: self.show_schedule(schedule)
+
+    def show_schedule(self, schedule):
+        """Display a payback schedule in the table and chart, totalled up to the 'Show By' periods."""
+        self.schedule = schedule
+        view = schedule_view(schedule, self.show_by_combo.get())
+
+        # Clear existing rows in the table
+        self.tree.delete(*self.tree.get_children())
+        self.tree.heading("Year", text=view.period_name)
+
+        # Apply green font to positive cumulative cash flow values
+        self.tree.tag_configure("positive", foreground="green")
+        for year, cash_flow_display, cumulative_display, positive in view.payback_rows():
+            self.tree.insert("", "end", values=(year, cash_flow_display, cumulative_display),
+                             tags=("positive",) if positive else ())
+
+        # Plot the chart
+        self.plot_chart(view)
+
+    def get_inputs(self):
+        """Return the current entry values for saving in a project file."""
+        return {
+            "initial_investment": self.initial_investment_entry.get(),
+            "annual_cash_flow": self.annual_cash_flow_entry.get(),
+            "periods": self.periods_combo.get(),
+            "show_by": self.show_by_combo.get()
+        }
+
+    def load_project(self, inputs, schedule=None):
+        """Restore entry values and, if one was saved, the computed schedule."""
+        set_entry(self.initial_investment_entry, inputs.get("initial_investment", ""))
+        set_entry(self.annual_cash_flow_entry, inputs.get("annual_cash_flow", ""))
+        self.periods_combo.set(inputs.get("periods", "Annual"))
+        self.show_by_combo.set(inputs.get("show_by", "Annual"))
+        self.result_label.config(text="")
+        if schedule is not None:
+            self.show_schedule(schedule)
+
+    @audited("payback.calculate")
     def calculate_payback_period(self):
         """Calculate the Payback Period based on cumulative cash flows."""
+        # Rebuild from the current inputs, so 'Update' no longer has to be clicked first
         try:
-            cumulative_cash_flow = -self.initial_investment  # Start with negative initial investment
-            year = 1
-            max_years = 50  # Optional limit for payback period calculation
-
-            while cumulative_cash_flow < 0 and year <= max_years:
-                cumulative_cash_flow += self.annual_cash_flow
-                if cumulative_cash_flow >= 0:
-                    # Calculate the fractional year for the payback
-                    previous_cumulative_cash_flow = cumulative_cash_flow - self.annual_cash_flow
-                    remaining_cash_needed = -previous_cumulative_cash_flow
-                    fraction_of_year = remaining_cash_needed / self.annual_cash_flow
-                    payback_period_years = year - 1 + fraction_of_year
-                    payback_years = int(payback_period_years)
-                    payback_months = int(round((payback_period_years - payback_years) * 12))
-
-                    # Display the result
-                    self.result_label.config(
-                        text=f"Payback Period: {payback_years} years and {payback_months} months"
-                    )
-                    return
-
-                year += 1
-
+            self.show_schedule(self.build_schedule())
+        except ValueError:
+            show_error("Input Error", "Please enter valid numbers for Initial Investment and Annual Net Benefits.")
+            return
+
+        self.show_result()
+
+    def show_result(self):
+        """Display the payback period of the current schedule."""
+        payback_period_years = self.schedule.payback_period()
+        if self.schedule.initial_investment <= 0:
+            self.result_label.config(text="There is no initial investment to pay back.")
+            return
+        if payback_period_years is None:
             # If the cumulative cash flow never reaches the initial investment, show an error
             self.result_label.config(text="The project does not pay back within the specified period.")
+            return
 
-        except (AttributeError, TypeError):
-            messagebox.showerror("Error", "Please click 'Update' after entering values to initialize the table.")
+        payback_years, payback_months = split_years_months(payback_period_years)
 
-    def plot_chart(self):
+        # Display the result
+        self.result_label.config(
+            text=f"Payback Period: {payback_years} years and {payback_months} months"
+        )
+
+    def plot_chart(self, schedule):
         """Generate and display the Cumulative Cash Flow chart."""
         try:
-            # Extract data for plotting
-            years = [data[0] for data in self.cash_flow_data]
-            cumulative_cash_flows = [data[1] for data in self.cash_flow_data]
-
-            # Clear previous plot
-            self.ax.clear()
-
-            # Plot Cumulative Cash Flow
-            self.ax.plot(years, cumulative_cash_flows, marker='o', linestyle='-', color='blue', label='Cumulative Cash Flow (£)')
-
-            # Identify Break-Even Point
-            breakeven_year = None
-            breakeven_cash_flow = None
-            for i, cash_flow in enumerate(cumulative_cash_flows):
-                if cash_flow >= 0:
-                    breakeven_year = years[i]
-                    breakeven_cash_flow = cash_flow
-                    break
-
-            if breakeven_year is not None:
-                self.ax.plot(breakeven_year, breakeven_cash_flow, marker='o', color='green', label='Break-Even Point')
-                self.ax.annotate(f'BE Point\nYear {breakeven_year}\n£{breakeven_cash_flow:,.2f}',
-                                 xy=(breakeven_year, breakeven_cash_flow),
-                                 xytext=(breakeven_year + 2, breakeven_cash_flow + self.initial_investment * 0.1),
-                                 arrowprops=dict(facecolor='black', shrink=0.05),
-                                 fontsize=10,
-                                 horizontalalignment='left')
-
-            # Add labels and title
-            self.ax.set_title("Cumulative Cash Flow Over Time")
-            self.ax.set_xlabel("Year")
-            self.ax.set_ylabel("£")
-            self.ax.legend()
-            self.ax.grid(True)
-
-            # Update the canvas with the new plot
-            self.canvas.draw()
+            self.chart = self.chart_for(schedule)
+            chart_service.show(self.canvas, *self.chart)
 
         except Exception as e:
-            messagebox.showerror("Plot Error", f"An error occurred while plotting the chart:\n{e}")
+            show_error("Plot Error", f"An error occurred while plotting the chart:\n{e}")
+
+    def chart_for(self, schedule):
+        """Return the (key, draw function) pair describing the chart of a schedule."""
+        return (chart_key("payback", schedule.data, schedule.initial_investment, schedule.periods_per_year),
+                lambda ax: self.draw_chart(ax, schedule))
+
+    @staticmethod
+    def draw_axes(ax):
+        """Set the chart title and axis labels."""
+        ax.set_title("Cumulative Cash Flow Over Time")
+        ax.set_xlabel("Year")
+        ax.set_ylabel("£")
+
+    @staticmethod
+    def draw_chart(ax, schedule):
+        """Draw the Cumulative Cash Flow chart of a schedule onto ax."""
+        # Extract data for plotting
+        years = schedule.periods
+        cumulative_cash_flows = schedule.cumulative
+
+        # Plot Cumulative Cash Flow
+        ax.plot(years, cumulative_cash_flows, marker='o', linestyle='-', color='blue', label='Cumulative Cash Flow (£)')
+
+        # Identify Break-Even Point
+        recovered = np.flatnonzero(cumulative_cash_flows >= 0)
+        if recovered.size:
+            breakeven_year = int(years[recovered[0]])
+            breakeven_cash_flow = float(cumulative_cash_flows[recovered[0]])
+            ax.plot(breakeven_year, breakeven_cash_flow, marker='o', color='green', label='Break-Even Point')
+            ax.annotate(f'BE Point\n{schedule.period_name} {breakeven_year}\n£{breakeven_cash_flow:,.2f}',
+                        xy=(breakeven_year, breakeven_cash_flow),
+                        xytext=(breakeven_year + 2, breakeven_cash_flow + schedule.initial_investment * 0.1),
+                        arrowprops=dict(facecolor='black', shrink=0.05),
+                        fontsize=10,
+                        horizontalalignment='left')
+
+        # Add labels and title
+        PaybackPeriodApp.draw_axes(ax)
+        ax.set_xlabel(schedule.period_name)
+        ax.legend()
+        ax.grid(True)
+
+    @audited("payback.simulate")
+    def simulate_distribution(self):
+        """Simulate uncertain annual benefits and show the distribution of payback periods."""
+        try:
+            initial_investment = float(self.initial_investment_entry.get())
+            annual_cash_flow = float(self.annual_cash_flow_entry.get())
+            growth = float(self.growth_entry.get() or 0) / 100
+            volatility = float(self.volatility_entry.get() or 0) / 100
+            paths = int(float(self.paths_entry.get()))
+            horizon = int(float(self.horizon_entry.get()))
+
+            self.app.root.config(cursor="watch")
+            self.app.root.update_idletasks()
+            try:
+                with stage("compute"):
+                    self.distribution = simulate_payback(initial_investment, annual_cash_flow, growth, volatility, paths, horizon)
+            finally:
+                self.app.root.config(cursor="")
+        except ValueError as e:
+            show_error("Input Error", f"Please enter valid numbers for the payback and simulation inputs.\n\n{e}")
+            return
+
+        # Display P50 / P90 payback and the share of paths that pay back at all
+        percentiles = self.distribution.percentiles((50, 90))
+        described = []
+        for q, period in percentiles.items():
+            if np.isinf(period):
+                described.append(f"P{q}: not within {horizon} years")
+            else:
+                years, months = split_years_months(period)
+                described.append(f"P{q}: {years} years and {months} months")
+        self.simulation_label.config(
+            text=f"{'   '.join(described)}\n{self.distribution.recovered:.1%} of {paths:,} paths pay back within {horizon} years"
+        )
+
+        try:
+            distribution = self.distribution
+            self.histogram_chart = (chart_key("payback-distribution", distribution.periods),
+                                    lambda ax: self.draw_histogram(ax, distribution))
+            chart_service.show(self.histogram_canvas, *self.histogram_chart)
+        except Exception as e:
+            show_error("Plot Error", f"An error occurred while plotting the chart:\n{e}")
+
+    @staticmethod
+    def draw_histogram_axes(ax):
+        """Set the histogram title and axis labels."""
+        ax.set_title("Distribution of Payback Period")
+        ax.set_xlabel("Payback Period (years)")
+        ax.set_ylabel("Share of Paths")
+
+    @staticmethod
+    def draw_histogram(ax, distribution):
+        """Draw the histogram of simulated payback periods with P50 / P90 markers onto ax."""
+        counts, edges = distribution.histogram(bins=min(4 * distribution.max_years, 200))
+        ax.bar(edges[:-1], counts / distribution.paths, width=np.diff(edges), align='edge', color='skyblue', edgecolor='none')
+        for q, color in ((50, 'green'), (90, 'red')):
+            period = distribution.percentile(q)
+            if np.isfinite(period):
+                ax.axvline(period, color=color, linestyle='--', label=f'P{q}: {period:.2f} years')
+        PaybackPeriodApp.draw_histogram_axes(ax)
+        if ax.get_legend_handles_labels()[0]:
+            ax.legend()
+        ax.grid(True)
+
+    @audited("payback.download_histogram", "export")
+    def download_histogram(self):
+        """Download the payback distribution histogram as an image."""
+        try:
+            if self.distribution is None:
+                show_error("Error", "Please click 'Simulate Payback Distribution' first.")
+                return
+
+            # Open a file dialog to choose save location
+            file_path = filedialog.asksaveasfilename(
+                defaultextension=".png",
+                filetypes=[("PNG files", "*.png"), ("All files", "*.*")],
+                title="Save Histogram As"
+            )
+            if file_path:
+                chart_service.save_png(file_path, *self.histogram_chart)
+                messagebox.showinfo("Download Successful", f"Histogram has been saved to {file_path}")
+        except Exception as e:
+            show_error("Error", f"Failed to save histogram: {e}")
 
+    @audited("payback.download_excel", "export")
     def download_to_excel(self):
         """Download the table data to an Excel file."""
         try:
-            # Prepare data for the Excel file
+            # Prepare data for the Excel file, as shown in the table
             data = []
-            for row in self.tree.get_children():
-                values = self.tree.item(row)["values"]
-                data.append(values)
+            period_name = "Year"
+            if self.schedule is not None:
+                view = schedule_view(self.schedule, self.show_by_combo.get())
+                data = [row[:3] for row in view.payback_rows()]
+                period_name = view.period_name
 
             # Convert to DataFrame and save as Excel
             desktop_path = os.path.join(os.path.expanduser("~"), "Desktop")
             file_path = os.path.join(desktop_path, "payback_period_calculation.xlsx")
-            df = pd.DataFrame(data, columns=["Year", "Cash Flow", "Cumulative Cash Flow"])
-            df.to_excel(file_path, index=False)
+            df = pd.DataFrame(data, columns=[period_name, "Cash Flow", "Cumulative Cash Flow"])
+            with stage("write"):
+                df.to_excel(file_path, index=False)
+            record_file(file_path)
 
             # Confirmation message
             messagebox.showinfo("Download Complete", f"Table data has been saved to {file_path}")
 
         except Exception as e:
-            messagebox.showerror("Error", f"Failed to save Excel file: {e}")
+            show_error("Error", f"Failed to save Excel file: {e}")
 
+    @audited("payback.download_chart", "export")
     def download_chart(self):
         """Download the Payback Period chart as an image."""
         try:
@@ -577,26 +971,28 @@ class PaybackPeriodApp:
                 title="Save Chart As"
             )
             if file_path:
-                self.figure.savefig(file_path)
+                # Rendered off-screen at export DPI; the on-screen chart is left untouched
+                chart_service.save_png(file_path, *self.chart)
                 messagebox.showinfo("Download Successful", f"Chart has been saved to {file_path}")
         except Exception as e:
-            messagebox.showerror("Error", f"Failed to save chart: {e}")
+            show_error("Error", f"Failed to save chart: {e}")
 
-# Initialize the PaybackPeriodApp with the new frame
-payback_app = PaybackPeriodApp(payback_period_frame)
 
 # ----------------------------------------
 # Fourth Tab: NPV Calculator
 # ----------------------------------------
 
-# Add a new tab for 'NPV Calculator'
-npv_calculator_frame = ttk.Frame(notebook)
-notebook.add(npv_calculator_frame, text='NPV Calculator')
+# Column headings used when exporting an NPV schedule
+NPV_EXPORT_COLUMNS = ("Year", "Cash Flow (£)", "Discount Factor", "Present Value (£)", "Cumulative Cash Flow (£)")
+
+# Above this many periods the NPV chart draws lines instead of a pair of bars per period
+MAX_CHART_BARS = 200
 
 # Define the NPV Calculator Class
 class NPVCalculatorApp:
-    def __init__(self, parent):
+    def __init__(self, parent, app):
         self.parent = parent
+        self.app = app
 
         # Title Label
         ttk.Label(self.parent, text="Net Present Value (NPV) Calculator", font=("Helvetica", 16)).pack(pady=10)
@@ -626,6 +1022,63 @@ class NPVCalculatorApp:
         self.cash_flows_entry.grid(row=2, column=1, padx=5, pady=5)
         self.cash_flows_entry.insert(0, "3000, 3500, 4000, 4500, 5000")  # Default Data
 
+        # Instruction Label next to Cash Flows
+        ttk.Label(input_frame, text="Or 'period: amount' pairs for a few flows over a long horizon.").grid(row=2, column=2, padx=5, pady=5, sticky='w')
+
+        # Granularity of the entered cash flows, and the one the table and chart total them up to
+        ttk.Label(input_frame, text="Cash Flow Periods: ").grid(row=3, column=0, padx=5, pady=5, sticky='e')
+        self.periods_combo = ttk.Combobox(input_frame, values=list(PERIOD_GRANULARITIES), state="readonly", width=12)
+        self.periods_combo.grid(row=3, column=1, padx=5, pady=5, sticky='w')
+        self.periods_combo.set("Annual")
+
+        ttk.Label(input_frame, text="Show By: ").grid(row=4, column=0, padx=5, pady=5, sticky='e')
+        self.show_by_combo = ttk.Combobox(input_frame, values=list(PERIOD_GRANULARITIES), state="readonly", width=12)
+        self.show_by_combo.grid(row=4, column=1, padx=5, pady=5, sticky='w')
+        self.show_by_combo.set("Annual")
+        self.show_by_combo.bind("<<ComboboxSelected>>", lambda event: self.schedule is not None and self.show_table(self.schedule))
+
+        # Adjustments Frame: inflation, tax, depreciation and working capital applied before discounting
+        adjustments_frame = ttk.LabelFrame(self.parent, text="Adjustments (optional)")
+        adjustments_frame.pack(pady=10, padx=20)
+
+        ttk.Label(adjustments_frame, text="Discount Rate Basis: ").grid(row=0, column=0, padx=5, pady=5, sticky='e')
+        self.rate_basis_combo = ttk.Combobox(adjustments_frame, values=("Nominal", "Real"), state="readonly", width=12)
+        self.rate_basis_combo.grid(row=0, column=1, padx=5, pady=5)
+        self.rate_basis_combo.set("Nominal")
+
+        ttk.Label(adjustments_frame, text="Inflation (%): ").grid(row=0, column=2, padx=5, pady=5, sticky='e')
+        self.inflation_entry = ttk.Entry(adjustments_frame, width=10)
+        self.inflation_entry.grid(row=0, column=3, padx=5, pady=5)
+        self.inflation_entry.insert(0, "0")  # Default Data
+
+        ttk.Label(adjustments_frame, text="Tax Rate (%): ").grid(row=1, column=0, padx=5, pady=5, sticky='e')
+        self.tax_rate_entry = ttk.Entry(adjustments_frame, width=10)
+        self.tax_rate_entry.grid(row=1, column=1, padx=5, pady=5)
+        self.tax_rate_entry.insert(0, "0")  # Default Data
+
+        ttk.Label(adjustments_frame, text="Working Capital (% of cash flow): ").grid(row=1, column=2, padx=5, pady=5, sticky='e')
+        self.working_capital_entry = ttk.Entry(adjustments_frame, width=10)
+        self.working_capital_entry.grid(row=1, column=3, padx=5, pady=5)
+        self.working_capital_entry.insert(0, "0")  # Default Data
+
+        ttk.Label(adjustments_frame, text="Depreciation: ").grid(row=2, column=0, padx=5, pady=5, sticky='e')
+        self.depreciation_combo = ttk.Combobox(adjustments_frame, values=DEPRECIATION_METHODS, state="readonly", width=16)
+        self.depreciation_combo.grid(row=2, column=1, padx=5, pady=5)
+        self.depreciation_combo.set(DEPRECIATION_METHODS[0])
+
+        ttk.Label(adjustments_frame, text="Useful Life (years): ").grid(row=2, column=2, padx=5, pady=5, sticky='e')
+        self.useful_life_entry = ttk.Entry(adjustments_frame, width=10)
+        self.useful_life_entry.grid(row=2, column=3, padx=5, pady=5)
+        self.useful_life_entry.insert(0, "5")  # Default Data
+
+        ttk.Label(adjustments_frame, text="Salvage Value (£): ").grid(row=3, column=2, padx=5, pady=5, sticky='e')
+        self.salvage_value_entry = ttk.Entry(adjustments_frame, width=10)
+        self.salvage_value_entry.grid(row=3, column=3, padx=5, pady=5)
+        self.salvage_value_entry.insert(0, "0")  # Default Data
+
+        # Pipeline keeps each stage's output, so editing one assumption only recomputes from that stage on
+        self.pipeline = AdjustmentPipeline()
+
         # Calculate Button
         ttk.Button(self.parent, text="Calculate NPV", command=self.calculate_npv).pack(pady=10)
 
@@ -646,22 +1099,9 @@ class NPVCalculatorApp:
         self.npv_table_frame = ttk.Frame(self.parent)
         self.npv_table_frame.pack(pady=10, padx=20, fill='both', expand=True)
 
-        # Set up Treeview (Table) with Scrollbar
-        self.tree = ttk.Treeview(self.npv_table_frame, columns=("Year", "Cash Flow (£)", "Discount Factor", "Present Value (£)"), show="headings")
-        self.tree.heading("Year", text="Year")
-        self.tree.heading("Cash Flow (£)", text="Cash Flow (£)")
-        self.tree.heading("Discount Factor", text="Discount Factor")
-        self.tree.heading("Present Value (£)", text="Present Value (£)")
-        self.tree.column("Year", anchor="center", width=50)
-        self.tree.column("Cash Flow (£)", anchor="center", width=120)
-        self.tree.column("Discount Factor", anchor="center", width=120)
-        self.tree.column("Present Value (£)", anchor="center", width=150)
-
-        # Add vertical scrollbar
-        scrollbar = ttk.Scrollbar(self.npv_table_frame, orient="vertical", command=self.tree.yview)
-        self.tree.configure(yscroll=scrollbar.set)
-        self.tree.grid(row=0, column=0)
-        scrollbar.grid(row=0, column=1, sticky="ns")
+        # Draw the table on one canvas, so a schedule of thousands of periods only creates the rows in view
+        self.schedule_table = CanvasTable(self.npv_table_frame, visible_rows=10)
+        self.schedule_table.pack(fill='both', expand=True)
 
         # Download Buttons Frame
         download_buttons_frame = ttk.Frame(self.parent)
@@ -678,176 +1118,269 @@ class NPVCalculatorApp:
         self.chart_frame.pack(pady=10, padx=20, fill='both', expand=True)
 
         # Initialize matplotlib Figure and Canvas
-        self.figure = Figure(figsize=(6, 4), dpi=100)
-        self.ax = self.figure.add_subplot(111)
-        self.ax.set_title("NPV Analysis")
-        self.ax.set_xlabel("Year")
-        self.ax.set_ylabel("£")
-
-        self.canvas = FigureCanvasTkAgg(self.figure, master=self.chart_frame)
-        self.canvas.draw()
+        self.figure, self.canvas = chart_service.create_canvas(self.chart_frame)
+        self.figure.add_subplot(111)
+        self.chart = (chart_key("npv"), self.draw_axes)
+        chart_service.show(self.canvas, *self.chart)
         self.canvas.get_tk_widget().pack(fill='both', expand=True)
 
+        # Schedule built by the last calculation
+        self.schedule = None
+
+        # Recalculate as the inputs are edited
+        self.live = LiveRecalculator(self.parent, [self.discount_rate_entry, self.initial_investment_entry, self.cash_flows_entry,
+                                                   self.periods_combo, self.rate_basis_combo, self.inflation_entry, self.tax_rate_entry,
+                                                   self.working_capital_entry, self.depreciation_combo,
+                                                   self.useful_life_entry, self.salvage_value_entry],
+                                     self.recalculate, self.app.live_recalculation)
+        self.live.schedule()
+
+    def build_schedule(self, initial_investment=None, cash_flow_scale=1.0):
+        """Read the input boxes and build the NPV schedule (raises ValueError on invalid input).
+
+        initial_investment and cash_flow_scale override the entered investment
+        and scale the entered cash flows, for goal seek. Cash flows entered as
+        'period: amount' pairs give a sparse schedule holding only those periods.
+        """
+        discount_rate = float(self.discount_rate_entry.get()) / 100
+        if initial_investment is None:
+            initial_investment = float(self.initial_investment_entry.get())
+        text = self.cash_flows_entry.get()
+        periods = None
+        if is_sparse_entry(text):
+            periods, cash_flows = parse_sparse_cash_flows(text)
+        else:
+            cash_flows = parse_cash_flows(text)
+        cash_flows = cash_flows * cash_flow_scale
+        periods_per_year = PERIOD_GRANULARITIES[self.periods_combo.get()]
+
+        # Blank adjustment boxes count as zero
+        inflation = float(self.inflation_entry.get() or 0) / 100
+        self.pipeline.configure(
+            initial_investment=initial_investment,
+            inflation=inflation,
+            tax_rate=float(self.tax_rate_entry.get() or 0) / 100,
+            depreciation_method=self.depreciation_combo.get(),
+            useful_life=int(float(self.useful_life_entry.get() or 0)),
+            salvage_value=float(self.salvage_value_entry.get() or 0),
+            working_capital=float(self.working_capital_entry.get() or 0) / 100,
+            periods_per_year=periods_per_year
+        )
+        if self.rate_basis_combo.get() == "Real":
+            discount_rate = nominal_rate(discount_rate, inflation)
+        if periods is None:
+            cash_flows = self.pipeline.adjusted(cash_flows)
+        elif self.pipeline.changes_cash_flows():
+            # Sparse flows are adjusted as events, however long the horizon
+            periods, cash_flows = self.pipeline.adjusted_events(periods, cash_flows)
+        return CashFlowSchedule(cash_flows, discount_rate, initial_investment, periods_per_year=periods_per_year,
+                                periods=periods)
+
+    @audited("npv.calculate")
     def calculate_npv(self):
         """Calculate the Net Present Value based on user input and populate the table and chart."""
         try:
-            discount_rate = float(self.discount_rate_entry.get()) / 100
-            initial_investment = float(self.initial_investment_entry.get())
-            cash_flows = [float(cf.strip()) for cf in self.cash_flows_entry.get().split(',')]
-
-            npv = 0
-            cash_flow_list = []
-            total_pv_benefits = 0  # Initialize Total PV of Benefits
-
-            for i, cf in enumerate(cash_flows, start=1):
-                discount_factor = 1 / ((1 + discount_rate) ** i)
-                present_value = cf * discount_factor
-                npv += present_value
-                total_pv_benefits += present_value
-                cash_flow_list.append({
-                    "Year": i,
-                    "Cash Flow (£)": f"£{cf:,.2f}",
-                    "Discount Factor": f"{discount_factor:.4f}",
-                    "Present Value (£)": f"£{present_value:,.2f}"
-                })
-
-            # Subtract Initial Investment
-            npv -= initial_investment
-
-            # Clear existing rows in the table
-            for item in self.tree.get_children():
-                self.tree.delete(item)
-
-            # Insert new rows into the table
-            for row in cash_flow_list:
-                self.tree.insert("", "end", values=(
-                    row["Year"],
-                    row["Cash Flow (£)"],
-                    row["Discount Factor"],
-                    row["Present Value (£)"]
-                ))
-
-            # Display the results in labels
-            self.total_pv_label.config(text=f"Total PV of Benefits: £{total_pv_benefits:,.2f}")
-            self.initial_investment_label.config(text=f"Initial Investment (£): £{initial_investment:,.2f}")
-            self.npv_label.config(text=f"NPV (£): £{npv:,.2f}")
-
-            # Plot the NPV Analysis Chart
-            self.plot_chart(cash_flow_list)
+            self.show_schedule(self.build_schedule())
 
         except ValueError:
-            messagebox.showerror("Input Error", "Please enter valid numerical values.")
+            show_error("Input Error", "Please enter valid numerical values.")
 
-    def plot_chart(self, cash_flow_list):
+    def recalculate(self):
+        """Refresh the result labels after an edit, returning the table and chart refresh; incomplete input is ignored."""
+        try:
+            schedule = self.build_schedule()
+        except ValueError:
+            return None
+        self.schedule = schedule
+        self.show_results(schedule)
+        return lambda: self.show_table(schedule)
+
+    def show_schedule(self, schedule):
+        """Display an NPV schedule in the table, result labels and chart."""
+        self.schedule = schedule
+        self.show_results(schedule)
+        self.show_table(schedule)
+
+    def show_results(self, schedule):
+        """Display the totals of an NPV schedule in the result labels."""
+        self.total_pv_label.config(text=f"Total PV of Benefits: £{schedule.total_pv:,.2f}")
+        self.initial_investment_label.config(text=f"Initial Investment (£): £{schedule.initial_investment:,.2f}")
+        self.npv_label.config(text=f"NPV (£): £{schedule.npv:,.2f}")
+
+    def show_table(self, schedule):
+        """Display an NPV schedule in the table and chart, totalled up to the 'Show By' periods."""
+        view = schedule_view(schedule, self.show_by_combo.get())
+
+        # Show the rows in the table
+        self.schedule_table.set_rows((view.period_name,) + NPV_EXPORT_COLUMNS[1:4], view.npv_rows())
+
+        # Plot the NPV Analysis Chart
+        self.plot_chart(view)
+
+    def get_inputs(self):
+        """Return the current entry values for saving in a project file."""
+        return {
+            "discount_rate": self.discount_rate_entry.get(),
+            "initial_investment": self.initial_investment_entry.get(),
+            "cash_flows": self.cash_flows_entry.get(),
+            "periods": self.periods_combo.get(),
+            "show_by": self.show_by_combo.get(),
+            "rate_basis": self.rate_basis_combo.get(),
+            "inflation": self.inflation_entry.get(),
+            "tax_rate": self.tax_rate_entry.get(),
+            "working_capital": self.working_capital_entry.get(),
+            "depreciation_method": self.depreciation_combo.get(),
+            "useful_life": self.useful_life_entry.get(),
+            "salvage_value": self.salvage_value_entry.get()
+        }
+
+    def load_project(self, inputs, schedule=None):
+        """Restore entry values and, if one was saved, the computed schedule."""
+        set_entry(self.discount_rate_entry, inputs.get("discount_rate", ""))
+        set_entry(self.initial_investment_entry, inputs.get("initial_investment", ""))
+        set_entry(self.cash_flows_entry, inputs.get("cash_flows", ""))
+        self.periods_combo.set(inputs.get("periods", "Annual"))
+        self.show_by_combo.set(inputs.get("show_by", "Annual"))
+        self.rate_basis_combo.set(inputs.get("rate_basis", "Nominal"))
+        set_entry(self.inflation_entry, inputs.get("inflation", "0"))
+        set_entry(self.tax_rate_entry, inputs.get("tax_rate", "0"))
+        set_entry(self.working_capital_entry, inputs.get("working_capital", "0"))
+        self.depreciation_combo.set(inputs.get("depreciation_method", DEPRECIATION_METHODS[0]))
+        set_entry(self.useful_life_entry, inputs.get("useful_life", "5"))
+        set_entry(self.salvage_value_entry, inputs.get("salvage_value", "0"))
+        if schedule is not None:
+            self.show_schedule(schedule)
+
+    def plot_chart(self, schedule):
         """Generate and display the NPV Analysis chart."""
         try:
-            # Extract data for plotting
-            years = [item["Year"] for item in cash_flow_list]
-            cash_flows = [float(item["Cash Flow (£)"].replace('£', '').replace(',', '')) for item in cash_flow_list]
-            present_values = [float(item["Present Value (£)"].replace('£', '').replace(',', '')) for item in cash_flow_list]
-
-            # Clear previous plot
-            self.ax.clear()
-
-            # Plot Cash Flows and Present Values
-            bar_width = 0.35
-            index = range(len(years))
-
-            self.ax.bar(index, cash_flows, bar_width, label='Cash Flow (£)', color='skyblue')
-            self.ax.bar([i + bar_width for i in index], present_values, bar_width, label='Present Value (£)', color='salmon')
-
-            # Add labels and title
-            self.ax.set_title("NPV Analysis")
-            self.ax.set_xlabel("Year")
-            self.ax.set_ylabel("£")
-            self.ax.set_xticks([i + bar_width / 2 for i in index])
-            self.ax.set_xticklabels(years)
-            self.ax.legend()
-            self.ax.grid(axis='y')
-
-            # Annotate bars with values
-            for i in index:
-                self.ax.text(i, cash_flows[i] + max(cash_flows)*0.01, f"£{cash_flows[i]:,.2f}", ha='center', va='bottom', fontsize=8)
-                self.ax.text(i + bar_width, present_values[i] + max(present_values)*0.01, f"£{present_values[i]:,.2f}", ha='center', va='bottom', fontsize=8)
-
-            # Update the canvas with the new plot
-            self.canvas.draw()
+            self.chart = self.chart_for(schedule)
+            chart_service.show(self.canvas, *self.chart)
 
         except Exception as e:
-            messagebox.showerror("Plot Error", f"An error occurred while plotting the chart:\n{e}")
-
+            show_error("Plot Error", f"An error occurred while plotting the chart:\n{e}")
+
+    def chart_for(self, schedule):
+        """Return the (key, draw function) pair describing the chart of a schedule."""
+        return (chart_key("npv", schedule.data, schedule.rate, schedule.initial_investment, schedule.periods_per_year),
+                lambda ax: self.draw_chart(ax, schedule))
+
+    @staticmethod
+    def draw_axes(ax):
+        """Set the chart title and axis labels."""
+        ax.set_title("NPV Analysis")
+        ax.set_xlabel("Year")
+        ax.set_ylabel("£")
+
+    @staticmethod
+    def draw_chart(ax, schedule):
+        """Draw the NPV Analysis chart of a schedule onto ax."""
+        # Extract data for plotting
+        years = schedule.periods.astype(int).tolist()
+        cash_flows = schedule.cash_flows
+        present_values = schedule.present_values
+
+        # Thousands of bars take seconds to draw and cannot be told apart, so long schedules are drawn as two lines
+        if len(years) > MAX_CHART_BARS:
+            ax.plot(years, cash_flows, label='Cash Flow (£)', color='skyblue')
+            ax.plot(years, present_values, label='Present Value (£)', color='salmon')
+            NPVCalculatorApp.draw_axes(ax)
+            ax.set_xlabel(schedule.period_name)
+            ax.legend()
+            ax.grid(axis='y')
+            return
+
+        # Plot Cash Flows and Present Values
+        bar_width = 0.35
+        index = range(len(years))
+
+        ax.bar(index, cash_flows, bar_width, label='Cash Flow (£)', color='skyblue')
+        ax.bar([i + bar_width for i in index], present_values, bar_width, label='Present Value (£)', color='salmon')
+
+        # Add labels and title
+        NPVCalculatorApp.draw_axes(ax)
+        ax.set_xlabel(schedule.period_name)
+        # Label at most a couple of dozen periods; beyond that the labels overlap ('Show By' totals them up)
+        step = max(1, -(-len(years) // 24))
+        ax.set_xticks([i + bar_width / 2 for i in index][::step])
+        ax.set_xticklabels(years[::step])
+        ax.legend()
+        ax.grid(axis='y')
+
+        # Annotate bars with values
+        if step > 1:
+            return
+        for i in index:
+            ax.text(i, cash_flows[i] + max(cash_flows)*0.01, f"£{cash_flows[i]:,.2f}", ha='center', va='bottom', fontsize=8)
+            ax.text(i + bar_width, present_values[i] + max(present_values)*0.01, f"£{present_values[i]:,.2f}", ha='center', va='bottom', fontsize=8)
+
+    @audited("npv.download_excel", "export")
     def download_npv(self):
         """Download the NPV calculation details to an Excel file."""
         try:
-            discount_rate = float(self.discount_rate_entry.get()) / 100
-            initial_investment = float(self.initial_investment_entry.get())
-            cash_flows = [float(cf.strip()) for cf in self.cash_flows_entry.get().split(',')]
-
-            npv = 0
-            cash_flow_list = []
-            total_pv_benefits = 0  # Initialize Total PV of Benefits
-
-            for i, cf in enumerate(cash_flows, start=1):
-                discount_factor = 1 / ((1 + discount_rate) ** i)
-                present_value = cf * discount_factor
-                npv += present_value
-                total_pv_benefits += present_value
-                cash_flow_list.append({
-                    "Year": i,
-                    "Cash Flow (£)": cf,
-                    "Discount Factor": discount_factor,
-                    "Present Value (£)": present_value
+            with stage("compute"):
+                schedule = self.build_schedule()
+
+                # Create DataFrame at full resolution, plus the totals shown in the table if they are coarser
+                df_cash_flows = schedule.to_frame(NPV_EXPORT_COLUMNS).iloc[:, :4].astype({"Year": int})
+                df_cash_flows = df_cash_flows.rename(columns={"Year": schedule.period_name})
+                show_by = self.show_by_combo.get()
+                view = schedule_view(schedule, show_by)
+                df_totals = None
+                if view is not schedule:
+                    df_totals = view.to_frame(NPV_EXPORT_COLUMNS).iloc[:, :4].astype({"Year": int})
+                    df_totals = df_totals.rename(columns={"Year": view.period_name})
+                df_summary = pd.DataFrame({
+                    "Initial Investment (£)": [schedule.initial_investment],
+                    "Total PV of Benefits (£)": [schedule.total_pv],
+                    "NPV (£)": [schedule.npv]
                 })
 
-            # Subtract Initial Investment
-            npv -= initial_investment
-
-            # Create DataFrame
-            df_cash_flows = pd.DataFrame(cash_flow_list)
-            df_summary = pd.DataFrame({
-                "Initial Investment (£)": [initial_investment],
-                "Total PV of Benefits (£)": [total_pv_benefits],
-                "NPV (£)": [npv]
-            })
-
             # Save to Excel with multiple sheets
             desktop_path = os.path.join(os.path.expanduser("~"), "Desktop")
             file_path = os.path.join(desktop_path, "NPV_Calculation.xlsx")
-            with pd.ExcelWriter(file_path) as writer:
+            with stage("write"), pd.ExcelWriter(file_path) as writer:
                 df_cash_flows.to_excel(writer, sheet_name='Cash Flows', index=False)
+                if df_totals is not None:
+                    df_totals.to_excel(writer, sheet_name=f'{show_by} Totals', index=False)
                 df_summary.to_excel(writer, sheet_name='Summary', index=False)
 
-            # Save the chart as an image and embed it into the Excel file
+            # Render the chart off-screen (reusing the last render if unchanged) and embed it into the Excel file
+            chart = self.chart_for(view)
+            chart_png = chart_service.png(*chart)
             chart_path = os.path.join(desktop_path, "npv_chart.png")
-            self.figure.savefig(chart_path)
 
             # Append the chart image to the Excel file (requires openpyxl and Pillow)
             try:
                 from openpyxl import load_workbook
                 from openpyxl.drawing.image import Image as OpenpyxlImage
 
-                wb = load_workbook(file_path)
-                ws = wb.create_sheet(title='NPV Chart')
-                img = OpenpyxlImage(chart_path)
-                ws.add_image(img, 'A1')
-                wb.save(file_path)
-                # Remove the standalone chart image
-                os.remove(chart_path)
+                with stage("embed"):
+                    wb = load_workbook(file_path)
+                    ws = wb.create_sheet(title='NPV Chart')
+                    img = OpenpyxlImage(BytesIO(chart_png))
+                    ws.add_image(img, 'A1')
+                    wb.save(file_path)
             except ImportError:
+                chart_service.save_png(chart_path, *chart)
                 messagebox.showwarning("Optional Feature Missing",
                                        "To embed the chart into Excel, please install 'openpyxl' and 'Pillow' libraries.\n\nThe chart has been saved separately as 'npv_chart.png' on your Desktop.")
             except Exception as e:
+                chart_service.save_png(chart_path, *chart)
                 messagebox.showwarning("Chart Embedding Failed",
                                        f"An error occurred while embedding the chart into Excel:\n{e}\n\nThe chart has been saved separately as 'npv_chart.png' on your Desktop.")
 
+            record_file(file_path)
+
             # Confirmation message
             messagebox.showinfo("Download Complete", f"NPV calculation has been saved to {file_path}")
 
         except ValueError:
-            messagebox.showerror("Input Error", "Please enter valid numerical values.")
+            show_error("Input Error", "Please enter valid numerical values.")
         except Exception as e:
-            messagebox.showerror("Error", f"Failed to save Excel file: {e}")
+            show_error("Error", f"Failed to save Excel file: {e}")
 
+    @audited("npv.download_chart", "export")
     def download_chart(self):
         """Download the NPV chart as an image."""
         try:
@@ -858,26 +1391,22 @@ class NPVCalculatorApp:
                 title="Save Chart As"
             )
             if file_path:
-                self.figure.savefig(file_path)
+                # Rendered off-screen at export DPI; the on-screen chart is left untouched
+                chart_service.save_png(file_path, *self.chart)
                 messagebox.showinfo("Download Successful", f"Chart has been saved to {file_path}")
         except Exception as e:
-            messagebox.showerror("Error", f"Failed to save chart: {e}")
+            show_error("Error", f"Failed to save chart: {e}")
 
-# Initialize the NPVCalculatorApp with the new frame
-npv_app = NPVCalculatorApp(npv_calculator_frame)
 
 # ----------------------------------------
 # Fifth Tab: Break-Even Analysis Tool
 # ----------------------------------------
 
-# Add a new tab for 'Break-Even Analysis'
-break_even_frame = ttk.Frame(notebook)
-notebook.add(break_even_frame, text='Break-Even Analysis')
-
 # Define the BreakEvenAnalysisApp class
 class BreakEvenAnalysisApp:
-    def __init__(self, parent):
+    def __init__(self, parent, app):
         self.parent = parent
+        self.app = app
 
         # Title Label
         ttk.Label(self.parent, text="Break-Even Analysis Tool", font=("Helvetica", 16)).pack(pady=10)
@@ -929,14 +1458,10 @@ class BreakEvenAnalysisApp:
         self.chart_frame.pack(pady=10, padx=20, fill='both', expand=True)
 
         # Initialize matplotlib Figure and Canvas
-        self.figure = Figure(figsize=(6, 4), dpi=100)
-        self.ax = self.figure.add_subplot(111)
-        self.ax.set_title("Break-Even Analysis")
-        self.ax.set_xlabel("Units Sold")
-        self.ax.set_ylabel("£")
-
-        self.canvas = FigureCanvasTkAgg(self.figure, master=self.chart_frame)
-        self.canvas.draw()
+        self.figure, self.canvas = chart_service.create_canvas(self.chart_frame)
+        self.figure.add_subplot(111)
+        self.chart = (chart_key("break-even"), self.draw_axes)
+        chart_service.show(self.canvas, *self.chart)
         self.canvas.get_tk_widget().pack(fill='both', expand=True)
 
         # Download Buttons Frame for Chart
@@ -949,64 +1474,118 @@ class BreakEvenAnalysisApp:
         # Download Chart Button
         ttk.Button(download_buttons_frame, text="Download Chart", command=self.download_chart).grid(row=0, column=1, padx=10)
 
+        # Recalculate as the inputs are edited
+        self.live = LiveRecalculator(self.parent, [self.fixed_costs_entry, self.variable_cost_entry, self.sales_price_entry],
+                                     self.recalculate, self.app.live_recalculation)
+        self.live.schedule()
+
+    def read_inputs(self):
+        """Return (fixed costs, variable cost, sales price) from the input boxes (raises ValueError on invalid input)."""
+        fixed_costs = float(self.fixed_costs_entry.get())
+        variable_cost = float(self.variable_cost_entry.get())
+        sales_price = float(self.sales_price_entry.get())
+        return fixed_costs, variable_cost, sales_price
+
+    @audited("break_even.calculate")
     def calculate_break_even(self):
         """Calculate the Break-Even Point based on user input and generate a chart."""
         try:
-            fixed_costs = float(self.fixed_costs_entry.get())
-            variable_cost = float(self.variable_cost_entry.get())
-            sales_price = float(self.sales_price_entry.get())
+            fixed_costs, variable_cost, sales_price = self.read_inputs()
 
             if sales_price <= variable_cost:
-                messagebox.showerror("Input Error", "Sales Price per Unit must be greater than Variable Cost per Unit.")
+                show_error("Input Error", "Sales Price per Unit must be greater than Variable Cost per Unit.")
                 return
 
-            # Calculate Break-Even Point in Units
-            breakeven_units = fixed_costs / (sales_price - variable_cost)
-            breakeven_units = round(breakeven_units, 2)
-
-            # Calculate Break-Even Point in Revenue
-            breakeven_revenue = breakeven_units * sales_price
-            breakeven_revenue = round(breakeven_revenue, 2)
-
-            # Display the results
-            self.breakeven_units_label.config(text=f"Break-Even Point: {breakeven_units} units")
-            self.breakeven_revenue_label.config(text=f"Break-Even Revenue: £{breakeven_revenue:,.2f}")
-
-            # Generate data for chart
-            max_units = int(breakeven_units * 1.5)  # Extend to 150% of break-even units for better visualization
-            units = list(range(0, max_units + 1))
-            total_costs = [fixed_costs + (variable_cost * u) for u in units]
-            total_revenues = [sales_price * u for u in units]
-
-            # Clear previous plot
-            self.ax.clear()
-
-            # Plot Total Costs and Total Revenues
-            self.ax.plot(units, total_costs, label='Total Costs (£)', color='red', linewidth=2)
-            self.ax.plot(units, total_revenues, label='Total Revenues (£)', color='green', linewidth=2)
-
-            # Plot Break-Even Point
-            self.ax.plot(breakeven_units, breakeven_revenue, 'bo', label='Break-Even Point')
-            self.ax.annotate(f'BE Point\n({breakeven_units}, £{breakeven_revenue:,.2f})',
-                             xy=(breakeven_units, breakeven_revenue),
-                             xytext=(breakeven_units + max_units * 0.05, breakeven_revenue),
-                             arrowprops=dict(facecolor='black', shrink=0.05),
-                             fontsize=10,
-                             horizontalalignment='left')
-
-            # Add labels and title
-            self.ax.set_title("Break-Even Analysis")
-            self.ax.set_xlabel("Units Sold")
-            self.ax.set_ylabel("£")
-            self.ax.legend()
-            self.ax.grid(True)
-
-            # Update the canvas with the new plot
-            self.canvas.draw()
+            self.show_results(fixed_costs, variable_cost, sales_price)()
 
         except ValueError:
-            messagebox.showerror("Input Error", "Please enter valid numerical values.")
+            show_error("Input Error", "Please enter valid numerical values.")
 
+    def recalculate(self):
+        """Refresh the result labels after an edit, returning the chart refresh; incomplete input is ignored."""
+        try:
+            return self.show_results(*self.read_inputs())
+        except ValueError:
+            return None
+
+    def show_results(self, fixed_costs, variable_cost, sales_price):
+        """Display the break-even point in the result labels and return a function that plots it."""
+        # Calculate Break-Even Point in Units and Revenue
+        breakeven_units, breakeven_revenue = break_even_point(fixed_costs, variable_cost, sales_price)
+
+        # Display the results
+        self.breakeven_units_label.config(text=f"Break-Even Point: {breakeven_units} units")
+        self.breakeven_revenue_label.config(text=f"Break-Even Revenue: £{breakeven_revenue:,.2f}")
+
+        return lambda: self.plot_chart(fixed_costs, variable_cost, sales_price)
+
+    def plot_chart(self, fixed_costs, variable_cost, sales_price):
+        """Generate and display the Break-Even Analysis chart."""
+        try:
+            self.chart = self.chart_for(fixed_costs, variable_cost, sales_price)
+            chart_service.show(self.canvas, *self.chart)
+
+        except Exception as e:
+            show_error("Plot Error", f"An error occurred while plotting the chart:\n{e}")
+
+    def chart_for(self, fixed_costs, variable_cost, sales_price):
+        """Return the (key, draw function) pair describing the chart for these inputs."""
+        return (chart_key("break-even", fixed_costs, variable_cost, sales_price),
+                lambda ax: self.draw_chart(ax, fixed_costs, variable_cost, sales_price))
+
+    @staticmethod
+    def draw_axes(ax):
+        """Set the chart title and axis labels."""
+        ax.set_title("Break-Even Analysis")
+        ax.set_xlabel("Units Sold")
+        ax.set_ylabel("£")
+
+    @staticmethod
+    def draw_chart(ax, fixed_costs, variable_cost, sales_price):
+        """Draw the Break-Even Analysis chart onto ax."""
+        breakeven_units, breakeven_revenue = break_even_point(fixed_costs, variable_cost, sales_price)
+
+        # Generate data for chart
+        max_units = int(breakeven_units * 1.5)  # Extend to 150% of break-even units for better visualization
+        schedule = CashFlowSchedule.per_unit(fixed_costs, sales_price - variable_cost, max_units)
+        units = schedule.periods
+        total_revenues = sales_price * units
+        total_costs = total_revenues - schedule.cumulative  # Cumulative column holds profit at each volume
+
+        # Plot Total Costs and Total Revenues
+        ax.plot(units, total_costs, label='Total Costs (£)', color='red', linewidth=2)
+        ax.plot(units, total_revenues, label='Total Revenues (£)', color='green', linewidth=2)
+
+        # Plot Break-Even Point
+        ax.plot(breakeven_units, breakeven_revenue, 'bo', label='Break-Even Point')
+        ax.annotate(f'BE Point\n({breakeven_units}, £{breakeven_revenue:,.2f})',
+                    xy=(breakeven_units, breakeven_revenue),
+                    xytext=(breakeven_units + max_units * 0.05, breakeven_revenue),
+                    arrowprops=dict(facecolor='black', shrink=0.05),
+                    fontsize=10,
+                    horizontalalignment='left')
+
+        # Add labels and title
+        BreakEvenAnalysisApp.draw_axes(ax)
+        ax.legend()
+        ax.grid(True)
+
+    def get_inputs(self):
+        """Return the current entry values for saving in a project file."""
+        return {
+            "fixed_costs": self.fixed_costs_entry.get(),
+            "variable_cost": self.variable_cost_entry.get(),
+            "sales_price": self.sales_price_entry.get()
+        }
+
+    def load_project(self, inputs, schedule=None):
+        """Restore entry values and recalculate; break-even results are cheap to rebuild from the inputs."""
+        set_entry(self.fixed_costs_entry, inputs.get("fixed_costs", ""))
+        set_entry(self.variable_cost_entry, inputs.get("variable_cost", ""))
+        set_entry(self.sales_price_entry, inputs.get("sales_price", ""))
+        self.calculate_break_even()
+
+    @audited("break_even.download_excel", "export")
     def download_break_even(self):
         """Download the Break-Even Analysis to an Excel file."""
         try:
@@ -1015,16 +1594,12 @@ class BreakEvenAnalysisApp:
             sales_price = float(self.sales_price_entry.get())
 
             if sales_price <= variable_cost:
-                messagebox.showerror("Input Error", "Sales Price per Unit must be greater than Variable Cost per Unit.")
+                show_error("Input Error", "Sales Price per Unit must be greater than Variable Cost per Unit.")
                 return
 
-            # Calculate Break-Even Point in Units
-            breakeven_units = fixed_costs / (sales_price - variable_cost)
-            breakeven_units = round(breakeven_units, 2)
-
-            # Calculate Break-Even Point in Revenue
-            breakeven_revenue = breakeven_units * sales_price
-            breakeven_revenue = round(breakeven_revenue, 2)
+            # Calculate Break-Even Point in Units and Revenue
+            with stage("compute"):
+                breakeven_units, breakeven_revenue = break_even_point(fixed_costs, variable_cost, sales_price)
 
             # Prepare data for Excel
             data = {
@@ -1038,39 +1613,45 @@ class BreakEvenAnalysisApp:
             df = pd.DataFrame(data)
             desktop_path = os.path.join(os.path.expanduser("~"), "Desktop")
             file_path = os.path.join(desktop_path, "break_even_analysis.xlsx")
-            df.to_excel(file_path, index=False)
+            with stage("write"):
+                df.to_excel(file_path, index=False)
 
-            # Save the chart as an image and embed it into the Excel file
+            # Render the chart off-screen (reusing the last render if unchanged) and embed it into the Excel file
+            chart = self.chart_for(fixed_costs, variable_cost, sales_price)
+            chart_png = chart_service.png(*chart)
             chart_path = os.path.join(desktop_path, "break_even_chart.png")
-            self.figure.savefig(chart_path)
 
             # Append the chart image to the Excel file (requires openpyxl and Pillow)
             try:
                 from openpyxl import load_workbook
                 from openpyxl.drawing.image import Image as OpenpyxlImage
 
-                wb = load_workbook(file_path)
-                ws = wb.create_sheet(title='Break-Even Chart')
-                img = OpenpyxlImage(chart_path)
-                ws.add_image(img, 'A1')
-                wb.save(file_path)
-                # Remove the standalone chart image
-                os.remove(chart_path)
+                with stage("embed"):
+                    wb = load_workbook(file_path)
+                    ws = wb.create_sheet(title='Break-Even Chart')
+                    img = OpenpyxlImage(BytesIO(chart_png))
+                    ws.add_image(img, 'A1')
+                    wb.save(file_path)
             except ImportError:
+                chart_service.save_png(chart_path, *chart)
                 messagebox.showwarning("Optional Feature Missing",
                                        "To embed the chart into Excel, please install 'openpyxl' and 'Pillow' libraries.\n\nThe chart has been saved separately as 'break_even_chart.png' on your Desktop.")
             except Exception as e:
+                chart_service.save_png(chart_path, *chart)
                 messagebox.showwarning("Chart Embedding Failed",
                                        f"An error occurred while embedding the chart into Excel:\n{e}\n\nThe chart has been saved separately as 'break_even_chart.png' on your Desktop.")
 
+            record_file(file_path)
+
             # Confirmation message
             messagebox.showinfo("Download Complete", f"Break-Even Analysis has been saved to {file_path}")
 
         except ValueError:
-            messagebox.showerror("Input Error", "Please enter valid numerical values.")
+            show_error("Input Error", "Please enter valid numerical values.")
         except Exception as e:
-            messagebox.showerror("Error", f"Failed to save Excel file: {e}")
+            show_error("Error", f"Failed to save Excel file: {e}")
 
+    @audited("break_even.download_chart", "export")
     def download_chart(self):
         """Download the Break-Even chart as an image."""
         try:
@@ -1081,16 +1662,1295 @@ class BreakEvenAnalysisApp:
                 title="Save Chart As"
             )
             if file_path:
-                self.figure.savefig(file_path)
+                # Rendered off-screen at export DPI; the on-screen chart is left untouched
+                chart_service.save_png(file_path, *self.chart)
                 messagebox.showinfo("Download Successful", f"Chart has been saved to {file_path}")
         except Exception as e:
-            messagebox.showerror("Error", f"Failed to save chart: {e}")
+            show_error("Error", f"Failed to save chart: {e}")
+
+
+# ----------------------------------------
+# Sixth Tab: Dated Cash Flows (XNPV / XIRR)
+# ----------------------------------------
+
+# Define the DatedCashFlowsApp class
+class DatedCashFlowsApp:
+    # Only the first rows are shown in the table; every row is still discounted and exported
+    max_table_rows = 500
+    # Beyond this many cash flows the chart totals them over as many equal spans of time
+    max_chart_points = 500
+
+    def __init__(self, parent, app):
+        self.parent = parent
+        self.app = app
+
+        # Title Label
+        ttk.Label(self.parent, text="Dated Cash Flows (XNPV / XIRR)", font=("Helvetica", 16)).pack(pady=10)
+
+        # Inputs Frame
+        input_frame = ttk.Frame(self.parent)
+        input_frame.pack(pady=10)
+
+        # Discount Rate Input
+        ttk.Label(input_frame, text="Discount Rate (%): ").grid(row=0, column=0, padx=5, pady=5, sticky='e')
+        self.discount_rate_entry = ttk.Entry(input_frame, width=15)
+        self.discount_rate_entry.grid(row=0, column=1, padx=5, pady=5, sticky='w')
+        self.discount_rate_entry.insert(0, "10")  # Default Data
+
+        # Valuation Date Input
+        ttk.Label(input_frame, text="Valuation Date (YYYY-MM-DD): ").grid(row=1, column=0, padx=5, pady=5, sticky='e')
+        self.valuation_date_entry = ttk.Entry(input_frame, width=15)
+        self.valuation_date_entry.grid(row=1, column=1, padx=5, pady=5, sticky='w')
+
+        # Instruction Label next to Valuation Date
+        ttk.Label(input_frame, text="(Leave blank to use the first cash flow date)").grid(row=1, column=2, padx=5, pady=5, sticky='w')
+
+        # Day-Count Convention Input
+        ttk.Label(input_frame, text="Day Count: ").grid(row=2, column=0, padx=5, pady=5, sticky='e')
+        self.day_count_combo = ttk.Combobox(input_frame, values=DAY_COUNT_CONVENTIONS, state="readonly", width=12)
+        self.day_count_combo.grid(row=2, column=1, padx=5, pady=5, sticky='w')
+        self.day_count_combo.set(DAY_COUNT_CONVENTIONS[0])
+
+        # Dated Cash Flows Input
+        ttk.Label(input_frame, text="Cash Flows (£) (one 'date, amount' per line): ").grid(row=3, column=0, padx=5, pady=5, sticky='ne')
+        self.cash_flows_text = ScrolledText(input_frame, width=30, height=8, font=('Arial', 10))
+        self.cash_flows_text.grid(row=3, column=1, columnspan=2, padx=5, pady=5, sticky='w')
+        self.cash_flows_text.insert('1.0', "2024-01-01, -10000\n2024-03-15, 2750\n2024-10-30, 4250\n2025-02-15, 3250\n2025-06-01, 2750")  # Default Data
+
+        # Calculate Button
+        ttk.Button(self.parent, text="Calculate XNPV", command=self.calculate_xnpv).pack(pady=10)
+
+        # Results Labels Frame
+        self.results_frame = ttk.Frame(self.parent)
+        self.results_frame.pack(pady=10)
+
+        self.xnpv_label = ttk.Label(self.results_frame, text="", font=("Helvetica", 12))
+        self.xnpv_label.pack(pady=5)
+
+        self.xirr_label = ttk.Label(self.results_frame, text="", font=("Helvetica", 12))
+        self.xirr_label.pack(pady=5)
+
+        self.rows_label = ttk.Label(self.results_frame, text="")
+        self.rows_label.pack(pady=5)
+
+        # Table Frame for Detailed Breakdown
+        self.table_frame = ttk.Frame(self.parent)
+        self.table_frame.pack(pady=10, padx=20, fill='both', expand=True)
+
+        # Set up Treeview (Table) with Scrollbar
+        columns = ("Date", "Cash Flow (£)", "Year Fraction", "Discount Factor", "Present Value (£)")
+        self.tree = ttk.Treeview(self.table_frame, columns=columns, show="headings")
+        for column in columns:
+            self.tree.heading(column, text=column)
+            self.tree.column(column, anchor="center", width=110)
+
+        # Add vertical scrollbar
+        scrollbar = ttk.Scrollbar(self.table_frame, orient="vertical", command=self.tree.yview)
+        self.tree.configure(yscroll=scrollbar.set)
+        self.tree.grid(row=0, column=0)
+        scrollbar.grid(row=0, column=1, sticky="ns")
+
+        # Download Buttons Frame
+        download_buttons_frame = ttk.Frame(self.parent)
+        download_buttons_frame.pack(pady=10)
+
+        # Download Calculation to Excel
+        ttk.Button(download_buttons_frame, text="Download XNPV Calculation", command=self.download_xnpv).grid(row=0, column=0, padx=10)
+
+        # Chart Frame
+        self.chart_frame = ttk.Frame(self.parent)
+        self.chart_frame.pack(pady=10, padx=20, fill='both', expand=True)
+
+        # Initialize matplotlib Figure and Canvas
+        self.figure, self.canvas = chart_service.create_canvas(self.chart_frame)
+        self.ax = self.figure.add_subplot(111)
+        self.ax.set_title("Dated Cash Flows")
+        self.ax.set_xlabel("Date")
+        self.ax.set_ylabel("£")
+        self.canvas.draw_idle()
+        self.canvas.get_tk_widget().pack(fill='both', expand=True)
+
+    def build_frame(self):
+        """Discount the entered cash flows and return them as a DataFrame (raises ValueError on invalid input)."""
+        discount_rate = float(self.discount_rate_entry.get()) / 100
+        dates, amounts = parse_dated_cash_flows(self.cash_flows_text.get('1.0', tk.END))
+        valuation_date = self.valuation_date_entry.get().strip() or None
+        fractions = year_fractions(dates, valuation_date, self.day_count_combo.get())
+        discount_factors = np.exp(-fractions * np.log1p(discount_rate))
+        return pd.DataFrame({
+            "Date": dates,
+            "Cash Flow (£)": amounts,
+            "Year Fraction": fractions,
+            "Discount Factor": discount_factors,
+            "Present Value (£)": amounts * discount_factors
+        })
+
+    @audited("dated_cash_flows.calculate")
+    def calculate_xnpv(self):
+        """Calculate XNPV and XIRR for the dated cash flows and populate the table and chart."""
+        try:
+            df = self.build_frame()
+        except ValueError as e:
+            show_error("Input Error", f"Please enter valid rates, dates (YYYY-MM-DD) and amounts.\n\n{e}")
+            return
+
+        # Display the results in labels
+        self.xnpv_label.config(text=f"XNPV (£): £{df['Present Value (£)'].sum():,.2f}")
+        try:
+            irr = xirr(df["Cash Flow (£)"].to_numpy(), df["Date"].to_numpy().astype("datetime64[D]"),
+                       self.valuation_date_entry.get().strip() or None, self.day_count_combo.get())
+            self.xirr_label.config(text=f"XIRR: {irr * 100:,.2f}%")
+        except ValueError as e:
+            self.xirr_label.config(text=f"XIRR: n/a ({e})")
+
+        # Insert the first rows into the table
+        self.tree.delete(*self.tree.get_children())
+        shown = df.head(self.max_table_rows)
+        for date, cf, fraction, factor, pv in zip(shown["Date"].dt.strftime("%Y-%m-%d"), shown["Cash Flow (£)"],
+                                                  shown["Year Fraction"], shown["Discount Factor"], shown["Present Value (£)"]):
+            self.tree.insert("", "end", values=(date, f"£{cf:,.2f}", f"{fraction:.4f}", f"{factor:.4f}", f"£{pv:,.2f}"))
+        self.rows_label.config(text=f"Showing {len(shown):,} of {len(df):,} cash flows" if len(df) > len(shown) else "")
+
+        self.plot_chart(df)
+
+    def plot_chart(self, df):
+        """Generate and display the dated cash flow chart."""
+        try:
+            dates = df["Date"].to_numpy().astype("datetime64[D]")
+            cash_flows, present_values = df["Cash Flow (£)"].to_numpy(), df["Present Value (£)"].to_numpy()
+            key = chart_key("dated-cash-flows", dates.astype(np.int64), cash_flows, present_values)
+            chart_service.show(self.canvas, key, lambda ax: self.draw_chart(ax, dates, cash_flows, present_values))
+        except Exception as e:
+            show_error("Plot Error", f"An error occurred while plotting the chart:\n{e}")
+
+    @classmethod
+    def draw_chart(cls, ax, dates, cash_flows, present_values):
+        # A line and marker per cash flow takes seconds to draw for hundreds of thousands of them
+        title = "Dated Cash Flows"
+        if dates.size > cls.max_chart_points:
+            days = dates.astype(np.int64)
+            edges = np.linspace(days.min(), days.max() + 1, cls.max_chart_points + 1)
+            cash_flows = np.histogram(days, edges, weights=cash_flows)[0]
+            present_values = np.histogram(days, edges, weights=present_values)[0]
+            dates = ((edges[:-1] + edges[1:]) / 2).astype(np.int64).astype("datetime64[D]")
+            title += f" (totalled over {cls.max_chart_points} equal spans)"
+
+        # Plot Cash Flows and Present Values against their dates
+        ax.vlines(dates, 0, cash_flows, color='skyblue', linewidth=4, label='Cash Flow (£)')
+        ax.plot(dates, present_values, 'o', color='salmon', label='Present Value (£)')
+        ax.axhline(0, color='black', linewidth=0.8)
+
+        # Add labels and title
+        ax.set_title(title)
+        ax.set_xlabel("Date")
+        ax.set_ylabel("£")
+        ax.legend(loc="upper right")
+        ax.grid(axis='y')
+        ax.figure.autofmt_xdate()
+
+    def get_inputs(self):
+        """Return the current entry values for saving in a project file."""
+        return {
+            "discount_rate": self.discount_rate_entry.get(),
+            "valuation_date": self.valuation_date_entry.get(),
+            "day_count": self.day_count_combo.get(),
+            "cash_flows": self.cash_flows_text.get('1.0', 'end-1c')
+        }
+
+    def load_project(self, inputs, schedule=None):
+        """Restore entry values; dated results are recalculated on request."""
+        set_entry(self.discount_rate_entry, inputs.get("discount_rate", ""))
+        set_entry(self.valuation_date_entry, inputs.get("valuation_date", ""))
+        self.day_count_combo.set(inputs.get("day_count", DAY_COUNT_CONVENTIONS[0]))
+        self.cash_flows_text.delete('1.0', tk.END)
+        self.cash_flows_text.insert('1.0', inputs.get("cash_flows", ""))
+
+    @audited("dated_cash_flows.download_excel", "export")
+    def download_xnpv(self):
+        """Download the XNPV calculation details to an Excel file."""
+        try:
+            with stage("compute"):
+                df = self.build_frame()
+            df_summary = pd.DataFrame({
+                "Valuation Date": [self.valuation_date_entry.get().strip() or str(df["Date"].min().date())],
+                "Day Count": [self.day_count_combo.get()],
+                "XNPV (£)": [df["Present Value (£)"].sum()]
+            })
+
+            # Save to Excel with multiple sheets
+            desktop_path = os.path.join(os.path.expanduser("~"), "Desktop")
+            file_path = os.path.join(desktop_path, "XNPV_Calculation.xlsx")
+            with stage("write"), pd.ExcelWriter(file_path) as writer:
+                df.to_excel(writer, sheet_name='Cash Flows', index=False)
+                df_summary.to_excel(writer, sheet_name='Summary', index=False)
+            record_file(file_path)
+
+            # Confirmation message
+            messagebox.showinfo("Download Complete", f"XNPV calculation has been saved to {file_path}")
+
+        except ValueError:
+            show_error("Input Error", "Please enter valid rates, dates (YYYY-MM-DD) and amounts.")
+        except Exception as e:
+            show_error("Error", f"Failed to save Excel file: {e}")
+
+
+# ----------------------------------------
+# Seventh Tab: Sensitivity Analysis
+# ----------------------------------------
+
+# Define the SensitivityAnalysisApp class
+class SensitivityAnalysisApp:
+    metrics = ("NPV", "Break-Even Units")
+
+    def __init__(self, parent, app):
+        self.parent = parent
+        self.app = app
+
+        # Title Label
+        ttk.Label(self.parent, text="Sensitivity Analysis (Tornado & Spider)", font=("Helvetica", 16)).pack(pady=10)
+
+        # Instruction Label
+        ttk.Label(self.parent, text="Uses the inputs currently entered on the NPV Calculator and Break-Even Analysis tabs.").pack()
+
+        # Inputs Frame
+        input_frame = ttk.Frame(self.parent)
+        input_frame.pack(pady=10)
+
+        ttk.Label(input_frame, text="Metric: ").grid(row=0, column=0, padx=5, pady=5, sticky='e')
+        self.metric_combo = ttk.Combobox(input_frame, values=self.metrics, state="readonly", width=16)
+        self.metric_combo.grid(row=0, column=1, padx=5, pady=5)
+        self.metric_combo.set(self.metrics[0])
+
+        ttk.Label(input_frame, text="Swing (± %): ").grid(row=1, column=0, padx=5, pady=5, sticky='e')
+        self.swing_entry = ttk.Entry(input_frame, width=15)
+        self.swing_entry.grid(row=1, column=1, padx=5, pady=5)
+        self.swing_entry.insert(0, "10")  # Default Data
+
+        ttk.Label(input_frame, text="Inputs Shown in Charts: ").grid(row=2, column=0, padx=5, pady=5, sticky='e')
+        self.top_entry = ttk.Entry(input_frame, width=15)
+        self.top_entry.grid(row=2, column=1, padx=5, pady=5)
+        self.top_entry.insert(0, "10")  # Default Data
+
+        # Calculate and Download Buttons
+        button_frame = ttk.Frame(self.parent)
+        button_frame.pack(pady=10)
+        ttk.Button(button_frame, text="Run Sensitivity", command=self.run_sensitivity).grid(row=0, column=0, padx=10)
+        ttk.Button(button_frame, text="Download to Excel", command=self.download_to_excel).grid(row=0, column=1, padx=10)
+
+        # Base Result Label
+        self.base_label = ttk.Label(self.parent, text="", font=("Helvetica", 12))
+        self.base_label.pack(pady=5)
+
+        # Table Frame
+        self.table_frame = ttk.Frame(self.parent)
+        self.table_frame.pack(pady=10, padx=20)
+
+        # Set up Treeview (Table) with Scrollbar
+        columns = ("Input", "Base Value", "Low", "High", "Swing")
+        self.tree = ttk.Treeview(self.table_frame, columns=columns, show="headings", height=8)
+        for column in columns:
+            self.tree.heading(column, text=column)
+            self.tree.column(column, anchor="center", width=130)
+
+        scrollbar = ttk.Scrollbar(self.table_frame, orient="vertical", command=self.tree.yview)
+        self.tree.configure(yscroll=scrollbar.set)
+        self.tree.grid(row=0, column=0)
+        scrollbar.grid(row=0, column=1, sticky="ns")
+
+        # Chart Frame
+        self.chart_frame = ttk.Frame(self.parent)
+        self.chart_frame.pack(pady=10, padx=20, fill='both', expand=True)
+
+        # Initialize matplotlib Figure and Canvas with the tornado and spider charts side by side
+        self.figure, self.canvas = chart_service.create_canvas(self.chart_frame, figsize=(9, 4))
+        self.tornado_ax = self.figure.add_subplot(121)
+        self.spider_ax = self.figure.add_subplot(122)
+        self.tornado_ax.set_title("Tornado")
+        self.spider_ax.set_title("Spider")
+        self.canvas.draw_idle()
+        self.canvas.get_tk_widget().pack(fill='both', expand=True)
+
+        # Result of the last run, used by the Excel export
+        self.table = None
+
+    def compute(self):
+        """Return the sensitivities of the selected metric to every input (raises ValueError on invalid input)."""
+        if self.metric_combo.get() == "NPV":
+            return npv_sensitivities(self.app.npv_app.build_schedule())
+        return break_even_sensitivities(*self.app.break_even_app.read_inputs())
+
+    @audited("sensitivity.run", inputs=lambda self: tab_inputs(self, self.app.npv_app, self.app.break_even_app))
+    def run_sensitivity(self):
+        """Compute swings for every input and draw the tornado and spider charts."""
+        try:
+            swing = float(self.swing_entry.get()) / 100
+            top = int(self.top_entry.get())
+            with stage("compute"):
+                sensitivities = self.compute()
+        except ValueError as e:
+            show_error("Input Error", f"Please enter valid numerical values here and on the {self.metric_combo.get()} inputs.\n\n{e}")
+            return
+
+        names, low, high = sensitivities.tornado(swing)
+        base_values = dict(zip(sensitivities.names, sensitivities.values.tolist()))
+        self.table = pd.DataFrame({
+            "Input": names,
+            "Base Value": [base_values[name] for name in names],
+            "Low": low,
+            "High": high,
+            "Swing": np.abs(high - low)
+        })
+
+        # Display the base result and every input, largest swing first
+        self.base_label.config(text=f"Base {sensitivities.metric}: {sensitivities.base:,.2f}  (inputs moved ± {swing * 100:g}%)")
+        self.tree.delete(*self.tree.get_children())
+        for name, base, low_value, high_value, swing_value in self.table.itertuples(index=False):
+            self.tree.insert("", "end", values=(name, f"{base:,.4f}", f"{low_value:,.2f}", f"{high_value:,.2f}", f"{swing_value:,.2f}"))
+
+        self.plot_charts(sensitivities, swing, top)
+
+    def plot_charts(self, sensitivities, swing, top):
+        """Generate and display the tornado and spider charts for the top inputs."""
+        try:
+            key = chart_key("sensitivity", sensitivities.metric, sensitivities.base, sensitivities.names,
+                            sensitivities.values, sensitivities.gradient, sensitivities.curvature, swing, top)
+            chart_service.show(self.canvas, key,
+                               lambda tornado_ax, spider_ax: self.draw_charts(tornado_ax, spider_ax, sensitivities, swing, top))
+        except Exception as e:
+            show_error("Plot Error", f"An error occurred while plotting the chart:\n{e}")
+
+    @staticmethod
+    def draw_charts(tornado_ax, spider_ax, sensitivities, swing, top):
+        names, low, high = sensitivities.tornado(swing, top)
+        base = sensitivities.base
+
+        # Tornado: bars from the base value to the low / high results, largest swing at the top
+        positions = np.arange(len(names))[::-1]
+        tornado_ax.barh(positions, low - base, left=base, color='salmon', label=f'-{swing * 100:g}%')
+        tornado_ax.barh(positions, high - base, left=base, color='skyblue', label=f'+{swing * 100:g}%')
+        tornado_ax.axvline(base, color='black', linewidth=0.8)
+        tornado_ax.set_yticks(positions)
+        tornado_ax.set_yticklabels(names, fontsize=8)
+        tornado_ax.set_title("Tornado")
+        tornado_ax.set_xlabel(sensitivities.metric)
+        tornado_ax.legend(fontsize=8)
+
+        # Spider: metric as each input moves across twice the swing range
+        changes = np.linspace(-2 * swing, 2 * swing, 9)
+        index = {name: i for i, name in enumerate(sensitivities.names)}
+        curves = sensitivities.spider(changes)
+        for name in names:
+            spider_ax.plot(changes * 100, curves[index[name]], marker='.', label=name)
+        spider_ax.set_title("Spider")
+        spider_ax.set_xlabel("Change in Input (%)")
+        spider_ax.set_ylabel(sensitivities.metric)
+        spider_ax.legend(fontsize=7)
+        spider_ax.grid(True)
+
+        tornado_ax.figure.tight_layout()
+
+    @audited("sensitivity.download_excel", "export", inputs=lambda self: tab_inputs(self, self.app.npv_app, self.app.break_even_app))
+    def download_to_excel(self):
+        """Download the sensitivity table to an Excel file."""
+        try:
+            if self.table is None:
+                show_error("Error", "Please click 'Run Sensitivity' first.")
+                return
+
+            desktop_path = os.path.join(os.path.expanduser("~"), "Desktop")
+            file_path = os.path.join(desktop_path, "sensitivity_analysis.xlsx")
+            with stage("write"):
+                self.table.to_excel(file_path, index=False)
+            record_file(file_path)
+
+            # Confirmation message
+            messagebox.showinfo("Download Complete", f"Sensitivity analysis has been saved to {file_path}")
+
+        except Exception as e:
+            show_error("Error", f"Failed to save Excel file: {e}")
 
-# Initialize the BreakEvenAnalysisApp with the new frame
-break_even_app = BreakEvenAnalysisApp(break_even_frame)
+
+# ----------------------------------------
+# Eighth Tab: Scenario Comparison
+# ----------------------------------------
+
+# Define the ScenarioComparisonApp class
+class ScenarioComparisonApp:
+    # Calculator shown in the combo box and its key in the scenario sets
+    calculators = {"NPV": "npv", "Payback Period": "payback", "Break-Even": "break-even"}
+
+    def __init__(self, parent, app):
+        self.parent = parent
+        self.app = app
+
+        # One scenario set per calculator, kept while switching between them
+        self.scenario_sets = {key: ScenarioSet(key) for key in self.calculators.values()}
+
+        # Title Label
+        ttk.Label(self.parent, text="Scenario Comparison", font=("Helvetica", 16)).pack(pady=10)
+
+        # Instruction Label
+        ttk.Label(self.parent, text="Saves the inputs currently entered on the selected calculator's tab as a named scenario.").pack()
+
+        # Inputs Frame
+        input_frame = ttk.Frame(self.parent)
+        input_frame.pack(pady=10)
+
+        ttk.Label(input_frame, text="Calculator: ").grid(row=0, column=0, padx=5, pady=5, sticky='e')
+        self.calculator_combo = ttk.Combobox(input_frame, values=list(self.calculators), state="readonly", width=16)
+        self.calculator_combo.grid(row=0, column=1, padx=5, pady=5)
+        self.calculator_combo.set("NPV")
+        self.calculator_combo.bind("<<ComboboxSelected>>", lambda event: self.refresh())
+
+        ttk.Label(input_frame, text="Scenario Name: ").grid(row=1, column=0, padx=5, pady=5, sticky='e')
+        self.name_entry = ttk.Entry(input_frame, width=19)
+        self.name_entry.grid(row=1, column=1, padx=5, pady=5)
+        self.name_entry.insert(0, "Base")  # Default Data
+
+        # Scenario Buttons
+        button_frame = ttk.Frame(self.parent)
+        button_frame.pack(pady=10)
+        ttk.Button(button_frame, text="Add Current Inputs", command=self.add_scenario).grid(row=0, column=0, padx=10)
+        ttk.Button(button_frame, text="Remove Selected", command=self.remove_selected).grid(row=0, column=1, padx=10)
+        ttk.Button(button_frame, text="Set Selected as Base", command=self.set_base).grid(row=0, column=2, padx=10)
+        ttk.Button(button_frame, text="Download to Excel", command=self.download_to_excel).grid(row=0, column=3, padx=10)
+
+        # Status Label
+        self.status_label = ttk.Label(self.parent, text="", font=("Helvetica", 12))
+        self.status_label.pack(pady=5)
+
+        # Table Frame
+        self.table_frame = ttk.Frame(self.parent)
+        self.table_frame.pack(pady=10, padx=20)
+
+        # Set up Treeview (Table) with Scrollbar; columns are set per calculator in refresh()
+        self.tree = ttk.Treeview(self.table_frame, show="headings", height=8)
+        scrollbar = ttk.Scrollbar(self.table_frame, orient="vertical", command=self.tree.yview)
+        self.tree.configure(yscroll=scrollbar.set)
+        self.tree.grid(row=0, column=0)
+        scrollbar.grid(row=0, column=1, sticky="ns")
+
+        # Chart Frame
+        self.chart_frame = ttk.Frame(self.parent)
+        self.chart_frame.pack(pady=10, padx=20, fill='both', expand=True)
+
+        # Initialize matplotlib Figure and Canvas for the overlay chart
+        self.figure, self.canvas = chart_service.create_canvas(self.chart_frame)
+        self.ax = self.figure.add_subplot(111)
+        self.ax.set_title("Scenario Overlay")
+        self.canvas.draw_idle()
+        self.canvas.get_tk_widget().pack(fill='both', expand=True)
+
+        # Comparison table of the calculator last shown, used by the Excel export
+        self.table = None
+
+    def current_set(self):
+        return self.scenario_sets[self.calculators[self.calculator_combo.get()]]
+
+    def capture_inputs(self, calculator):
+        """Return the inputs currently entered on a calculator's tab (raises ValueError on invalid input)."""
+        if calculator == "npv":
+            # Cash flows are stored after the NPV tab's adjustments, with the rate it discounts at and at their own
+            # granularity, so the scenario's NPV holds at any other rate too; sparse flows keep their periods
+            schedule = self.app.npv_app.build_schedule()
+            from_first = schedule.contiguous and (len(schedule) == 0 or schedule.periods[0] == 1)
+            return {
+                "discount_rate": schedule.rate * 100,
+                "initial_investment": schedule.initial_investment,
+                "cash_flows": schedule.cash_flows.copy(),
+                "periods": None if from_first else schedule.periods.astype(np.int64),
+                "periods_per_year": schedule.periods_per_year
+            }
+        if calculator == "payback":
+            return {
+                "initial_investment": float(self.app.payback_app.initial_investment_entry.get()),
+                "annual_cash_flow": float(self.app.payback_app.annual_cash_flow_entry.get())
+            }
+        fixed_costs, variable_cost, sales_price = self.app.break_even_app.read_inputs()
+        return {"fixed_costs": fixed_costs, "variable_cost": variable_cost, "sales_price": sales_price}
+
+    @audited("scenarios.add", inputs=lambda self: tab_inputs(self, self.app.npv_app, self.app.payback_app, self.app.break_even_app))
+    def add_scenario(self):
+        """Store the selected calculator's current inputs under the scenario name, replacing any of that name."""
+        name = self.name_entry.get().strip()
+        if not name:
+            show_error("Input Error", "Please enter a scenario name.")
+            return
+
+        scenario_set = self.current_set()
+        try:
+            scenario_set.add(name, self.capture_inputs(scenario_set.calculator))
+        except ValueError as e:
+            show_error("Input Error", f"Please enter valid numerical values on the {self.calculator_combo.get()} tab.\n\n{e}")
+            return
+
+        self.refresh()
+        set_entry(self.name_entry, f"Scenario {len(scenario_set.scenarios) + 1}")
+
+    def add_scenarios(self, calculator, scenarios):
+        """Add (name, inputs) pairs to a calculator's set in one go and show that calculator."""
+        scenario_set = self.scenario_sets[calculator]
+        for name, inputs in scenarios:
+            scenario_set.add(name, inputs)
+        self.calculator_combo.set(next(label for label, key in self.calculators.items() if key == calculator))
+        self.refresh()
+
+    def selected_names(self):
+        return [self.tree.item(item, "values")[0] for item in self.tree.selection()]
+
+    def remove_selected(self):
+        """Remove the scenarios selected in the table."""
+        scenario_set = self.current_set()
+        for name in self.selected_names():
+            scenario_set.remove(name)
+        self.refresh()
+
+    def set_base(self):
+        """Compare every scenario against the one selected in the table."""
+        names = self.selected_names()
+        if len(names) != 1:
+            show_error("Error", "Please select one scenario in the table.")
+            return
+        self.current_set().set_base(names[0])
+        self.refresh()
+
+    def refresh(self):
+        """Evaluate any new scenarios and redraw the comparison table and overlay chart."""
+        scenario_set = self.current_set()
+        self.table = scenario_set.diff_table()
+
+        # Rebuild the table columns for this calculator's metrics
+        columns = ["Scenario"] + list(self.table.columns)
+        self.tree.delete(*self.tree.get_children())
+        self.tree.configure(columns=columns)
+        for column in columns:
+            self.tree.heading(column, text=column)
+            self.tree.column(column, anchor="center", width=170)
+
+        self.tree.tag_configure("base", font=("Helvetica", 10, "bold"))
+        for name, *values in self.table.itertuples():
+            self.tree.insert("", "end", values=[name] + ["-" if np.isnan(value) else f"{value:,.2f}" for value in values],
+                             tags=("base",) if name == scenario_set.base else ())
+
+        self.status_label.config(
+            text=f"{len(scenario_set.scenarios)} scenario(s), base: {scenario_set.base or '-'}"
+                 f"  (last update evaluated {scenario_set.last_evaluated})"
+        )
+        self.plot_chart(scenario_set)
+
+    def plot_chart(self, scenario_set):
+        """Overlay every scenario of the set on one chart."""
+        try:
+            key = chart_key("scenarios", scenario_set.calculator, id(scenario_set), scenario_set.version)
+            chart_service.show(self.canvas, key, lambda ax: self.draw_chart(ax, scenario_set))
+        except Exception as e:
+            show_error("Plot Error", f"An error occurred while plotting the chart:\n{e}")
+
+    @staticmethod
+    def draw_chart(ax, scenario_set):
+        results = scenario_set.evaluate()
+        for name, result in results.items():
+            style = {"color": "black", "linewidth": 2.5} if name == scenario_set.base else {"linewidth": 1}
+            if scenario_set.calculator == "break-even":
+                # Profit is linear in units, so each line only needs its two end points
+                inputs = scenario_set.scenarios[name]
+                units = np.array([0.0, 2 * result["Break-Even Units"]]) if result["Break-Even Units"] > 0 else np.array([0.0, 1.0])
+                profit = (inputs["sales_price"] - inputs["variable_cost"]) * units - inputs["fixed_costs"]
+                ax.plot(units, profit, label=name, **style)
+            else:
+                ax.plot(result["series_years"], result["series"], label=name, **style)
+
+        ax.axhline(0, color='grey', linewidth=0.8)
+        ax.set_title("Scenario Overlay")
+        if scenario_set.calculator == "break-even":
+            ax.set_xlabel('Units Sold')
+            ax.set_ylabel('Profit (£)')
+        else:
+            ax.set_xlabel('Year')
+            ax.set_ylabel('Cumulative Discounted Cash Flow (£)' if scenario_set.calculator == "npv" else 'Cumulative Cash Flow (£)')
+        # A legend stops being readable beyond a handful of scenarios
+        if 0 < len(results) <= 10:
+            ax.legend(fontsize=8)
+        ax.grid(True)
+
+    @audited("scenarios.download_excel", "export", inputs=lambda self: scenario_inputs(self, self.current_set().calculator))
+    def download_to_excel(self):
+        """Download the scenario comparison table to an Excel file."""
+        try:
+            if self.table is None or self.table.empty:
+                show_error("Error", "Please add at least one scenario first.")
+                return
+
+            desktop_path = os.path.join(os.path.expanduser("~"), "Desktop")
+            file_path = os.path.join(desktop_path, f"scenarios_{self.current_set().calculator}.xlsx")
+            with stage("write"):
+                self.table.to_excel(file_path)
+            record_file(file_path)
+
+            # Confirmation message
+            messagebox.showinfo("Download Complete", f"Scenario comparison has been saved to {file_path}")
+
+        except Exception as e:
+            show_error("Error", f"Failed to save Excel file: {e}")
+
+
+# ----------------------------------------
+# Ninth Tab: Real Options
+# ----------------------------------------
+
+# Define the RealOptionsApp class
+class RealOptionsApp:
+    # Volatilities (%) of the option value chart, valued as one batch
+    chart_volatilities = np.arange(5, 105, 5)
+
+    def __init__(self, parent, app):
+        self.parent = parent
+        self.app = app
+
+        # Title Label
+        ttk.Label(self.parent, text="Real Options (Binomial Lattice)", font=("Helvetica", 16)).pack(pady=10)
+
+        # Instruction Label
+        ttk.Label(self.parent, text="Values the options to expand, contract, abandon or defer the project entered on the NPV Calculator tab.\n"
+                                    "Leave an option's boxes blank to leave it out.", justify="center").pack()
+
+        # Inputs Frame
+        input_frame = ttk.Frame(self.parent)
+        input_frame.pack(pady=10)
+
+        self.entries = {}
+        fields = [
+            ("volatility", "Volatility of Project Value (%): ", "30"),
+            ("horizon", "Option Horizon (years): ", "5"),
+            ("steps", "Lattice Steps: ", "500"),
+            ("payout", "Payout Rate (% of value per year): ", "20"),
+            ("expand_factor", "Expand by (%): ", "30"),
+            ("expand_cost", "Cost of Expanding (£): ", "3000"),
+            ("contract_factor", "Contract by (%): ", "30"),
+            ("contract_savings", "Savings from Contracting (£): ", "2500"),
+            ("salvage", "Salvage Value if Abandoned (£): ", "6000"),
+            ("defer_years", "Defer Investment up to (years): ", "1")
+        ]
+        for i, (key, label, default) in enumerate(fields):
+            ttk.Label(input_frame, text=label).grid(row=i % 5, column=2 * (i // 5), padx=5, pady=5, sticky='e')
+            entry = ttk.Entry(input_frame, width=12)
+            entry.grid(row=i % 5, column=2 * (i // 5) + 1, padx=5, pady=5)
+            entry.insert(0, default)  # Default Data
+            self.entries[key] = entry
+
+        # Calculate and Download Buttons
+        button_frame = ttk.Frame(self.parent)
+        button_frame.pack(pady=10)
+        ttk.Button(button_frame, text="Value Options", command=self.value_options).grid(row=0, column=0, padx=10)
+        ttk.Button(button_frame, text="Download to Excel", command=self.download_to_excel).grid(row=0, column=1, padx=10)
+
+        # Result Label
+        self.result_label = ttk.Label(self.parent, text="", font=("Helvetica", 12))
+        self.result_label.pack(pady=5)
+
+        # Table Frame
+        self.table_frame = ttk.Frame(self.parent)
+        self.table_frame.pack(pady=10, padx=20)
+
+        # Set up Treeview (Table) with the value of each option on its own and of all of them together
+        columns = ("Options", "Expanded NPV (£)", "Option Value (£)")
+        self.tree = ttk.Treeview(self.table_frame, columns=columns, show="headings", height=7)
+        for column in columns:
+            self.tree.heading(column, text=column)
+            self.tree.column(column, anchor="center", width=170)
+        self.tree.grid(row=0, column=0)
+
+        # Chart Frame
+        self.chart_frame = ttk.Frame(self.parent)
+        self.chart_frame.pack(pady=10, padx=20, fill='both', expand=True)
+
+        # Initialize matplotlib Figure and Canvas for the option value chart
+        self.figure, self.canvas = chart_service.create_canvas(self.chart_frame)
+        self.ax = self.figure.add_subplot(111)
+        self.ax.set_title("Option Value by Volatility")
+        self.canvas.draw_idle()
+        self.canvas.get_tk_widget().pack(fill='both', expand=True)
+
+        # Result of the last valuation, used by the Excel export
+        self.table = None
+
+    def read_inputs(self):
+        """Return (lattice settings, options, defer years) from the input boxes (raises ValueError on invalid input)."""
+        values = {key: entry.get().strip() for key, entry in self.entries.items()}
+        settings = {
+            "volatility": float(values["volatility"]) / 100,
+            "years": float(values["horizon"]),
+            "steps": int(values["steps"]),
+            "payout_rate": float(values["payout"]) / 100
+        }
+        if settings["steps"] < 1 or settings["steps"] > 20000:
+            raise ValueError("Lattice Steps must be between 1 and 20,000.")
+
+        # Blank boxes leave the option out
+        options = []
+        if values["expand_factor"] and values["expand_cost"]:
+            options.append(Expand(1 + float(values["expand_factor"]) / 100, float(values["expand_cost"])))
+        if values["contract_factor"] and values["contract_savings"]:
+            options.append(Contract(1 - float(values["contract_factor"]) / 100, float(values["contract_savings"])))
+        if values["salvage"]:
+            options.append(Abandon(float(values["salvage"])))
+        defer_years = float(values["defer_years"] or 0)
+        return settings, options, defer_years
+
+    @audited("real_options.value", inputs=lambda self: tab_inputs(self, self.app.npv_app))
+    def value_options(self):
+        """Value each option on its own and all of them together, and chart the option value against volatility."""
+        try:
+            schedule = self.app.npv_app.build_schedule()
+            settings, options, defer_years = self.read_inputs()
+            with stage("compute"):
+                results = value_schedule_options(schedule, options=options, defer_years=defer_years, **settings)
+        except ValueError as e:
+            show_error("Input Error", f"Please enter valid numerical values here and on the NPV Calculator tab.\n\n{e}")
+            return
+
+        # Each option on its own, then the deferral, then everything together
+        rows = [("None (Static NPV)", results["static_npv"], 0.0)]
+        alone = [(option.name, [option], 0.0) for option in options]
+        if defer_years > 0:
+            alone.append(("Defer", [], defer_years))
+        if len(alone) > 1:
+            with stage("compute"):
+                for name, option_set, years in alone:
+                    result = value_schedule_options(schedule, options=option_set, defer_years=years, **settings)
+                    rows.append((name, result["expanded_npv"], result["option_value"]))
+        rows.append(("All Options", results["expanded_npv"], results["option_value"]))
+        self.table = pd.DataFrame(rows, columns=["Options", "Expanded NPV (£)", "Option Value (£)"])
+
+        self.tree.delete(*self.tree.get_children())
+        for name, expanded_npv, option_value in rows:
+            self.tree.insert("", "end", values=(name, f"£{expanded_npv:,.2f}", f"£{option_value:,.2f}"))
+        self.result_label.config(text=f"Expanded NPV (£): £{results['expanded_npv']:,.2f}  "
+                                      f"(static £{results['static_npv']:,.2f} + options £{results['option_value']:,.2f})")
+
+        self.plot_chart(schedule, settings, options, defer_years)
+
+    def plot_chart(self, schedule, settings, options, defer_years):
+        """Chart the value of all the options together across volatilities."""
+        try:
+            key = chart_key("real-options", schedule.data, schedule.rate, schedule.initial_investment,
+                            sorted(settings.items()), [(option.name, vars(option)) for option in options], defer_years)
+            chart_service.show(self.canvas, key, lambda ax: self.draw_chart(ax, schedule, settings, options, defer_years))
+        except Exception as e:
+            show_error("Plot Error", f"An error occurred while plotting the chart:\n{e}")
+
+    @classmethod
+    def draw_chart(cls, ax, schedule, settings, options, defer_years):
+        # One batch: the same project at every volatility
+        volatilities = cls.chart_volatilities / 100
+        results = value_real_options(np.full(volatilities.size, schedule.total_pv), schedule.initial_investment, volatilities,
+                                     schedule.rate, settings["years"], options, defer_years, settings["payout_rate"],
+                                     settings["steps"])
+        ax.plot(cls.chart_volatilities, results["option_value"], marker='o', label='Option Value')
+        ax.plot(cls.chart_volatilities, results["expanded_npv"], marker='.', label='Expanded NPV')
+        ax.axhline(results["static_npv"][0], color='grey', linestyle='--', label='Static NPV')
+        ax.axvline(settings["volatility"] * 100, color='black', linewidth=0.8)
+        ax.set_title("Option Value by Volatility")
+        ax.set_xlabel('Volatility of Project Value (%)')
+        ax.set_ylabel('Value (£)')
+        ax.legend(fontsize=8)
+        ax.grid(True)
+
+    @audited("real_options.download_excel", "export", inputs=lambda self: tab_inputs(self, self.app.npv_app))
+    def download_to_excel(self):
+        """Download the real options table to an Excel file."""
+        try:
+            if self.table is None:
+                show_error("Error", "Please click 'Value Options' first.")
+                return
+
+            desktop_path = os.path.join(os.path.expanduser("~"), "Desktop")
+            file_path = os.path.join(desktop_path, "real_options.xlsx")
+            with stage("write"):
+                self.table.to_excel(file_path, index=False)
+            record_file(file_path)
+
+            # Confirmation message
+            messagebox.showinfo("Download Complete", f"Real options valuation has been saved to {file_path}")
+
+        except Exception as e:
+            show_error("Error", f"Failed to save Excel file: {e}")
+
+
+# ----------------------------------------
+# Tenth Tab: Goal Seek
+# ----------------------------------------
+
+# Define the GoalSeekApp class
+class GoalSeekApp:
+    # Calculator shown in the combo box and its key in the scenario sets
+    calculators = {"NPV": "npv", "Payback Period": "payback", "Break-Even": "break-even"}
+
+    # Inputs that can be solved for, as shown and as named in the scenario inputs
+    solve_for_inputs = {
+        "npv": {"Discount Rate (%)": "discount_rate", "Initial Investment (£)": "initial_investment",
+                "Cash Flow Scale (×)": "cash_flow_scale"},
+        "payback": {"Annual Net Benefits (£)": "annual_cash_flow", "Initial Investment (£)": "initial_investment"},
+        "break-even": {"Sales Price per Unit (£)": "sales_price", "Variable Cost per Unit (£)": "variable_cost",
+                       "Fixed Costs (£)": "fixed_costs"}
+    }
+
+    # Target metric, its units and the default target of each calculator
+    targets = {"npv": ("NPV", "£", "0"), "payback": ("Payback Period", "years", "3"),
+               "break-even": ("Break-Even Point", "units", "1000")}
+
+    def __init__(self, parent, app):
+        self.parent = parent
+        self.app = app
+
+        # Title Label
+        ttk.Label(self.parent, text="Goal Seek", font=("Helvetica", 16)).pack(pady=10)
+
+        # Instruction Label
+        ttk.Label(self.parent, text="Finds the value of one input that makes the selected calculator hit a target, "
+                                    "for the inputs on its tab or for every saved scenario.").pack()
+
+        # Inputs Frame
+        input_frame = ttk.Frame(self.parent)
+        input_frame.pack(pady=10)
+
+        ttk.Label(input_frame, text="Calculator: ").grid(row=0, column=0, padx=5, pady=5, sticky='e')
+        self.calculator_combo = ttk.Combobox(input_frame, values=list(self.calculators), state="readonly", width=22)
+        self.calculator_combo.grid(row=0, column=1, padx=5, pady=5)
+        self.calculator_combo.bind("<<ComboboxSelected>>", lambda event: self.select_calculator())
+
+        ttk.Label(input_frame, text="Solve For: ").grid(row=1, column=0, padx=5, pady=5, sticky='e')
+        self.solve_for_combo = ttk.Combobox(input_frame, state="readonly", width=22)
+        self.solve_for_combo.grid(row=1, column=1, padx=5, pady=5)
+
+        self.target_label = ttk.Label(input_frame, text="")
+        self.target_label.grid(row=2, column=0, padx=5, pady=5, sticky='e')
+        self.target_entry = ttk.Entry(input_frame, width=25)
+        self.target_entry.grid(row=2, column=1, padx=5, pady=5)
+
+        # Goal Seek Buttons
+        button_frame = ttk.Frame(self.parent)
+        button_frame.pack(pady=10)
+        ttk.Button(button_frame, text="Solve Current Inputs", command=self.solve_current).grid(row=0, column=0, padx=10)
+        ttk.Button(button_frame, text="Apply to Tab", command=self.apply_to_tab).grid(row=0, column=1, padx=10)
+        ttk.Button(button_frame, text="Solve All Scenarios", command=self.solve_scenarios).grid(row=0, column=2, padx=10)
+        ttk.Button(button_frame, text="Download to Excel", command=self.download_to_excel).grid(row=0, column=3, padx=10)
+
+        # Result Label
+        self.result_label = ttk.Label(self.parent, text="", font=("Helvetica", 12), justify="center")
+        self.result_label.pack(pady=5)
+
+        # Table Frame
+        self.table_frame = ttk.Frame(self.parent)
+        self.table_frame.pack(pady=10, padx=20)
+
+        # Set up Treeview (Table) with Scrollbar for the scenario results
+        columns = ("Scenario", "Current Value", "Solved Value")
+        self.tree = ttk.Treeview(self.table_frame, columns=columns, show="headings", height=10)
+        for column in columns:
+            self.tree.heading(column, text=column)
+            self.tree.column(column, anchor="center", width=180)
+
+        scrollbar = ttk.Scrollbar(self.table_frame, orient="vertical", command=self.tree.yview)
+        self.tree.configure(yscroll=scrollbar.set)
+        self.tree.grid(row=0, column=0)
+        scrollbar.grid(row=0, column=1, sticky="ns")
+
+        # Last solution for the current inputs, (calculator, input, value), used by 'Apply to Tab'
+        self.solution = None
+        # Scenario results of the last 'Solve All Scenarios', used by the Excel export
+        self.table = None
+
+        self.calculator_combo.set("Break-Even")
+        self.select_calculator()
+
+    def calculator(self):
+        return self.calculators[self.calculator_combo.get()]
+
+    def select_calculator(self):
+        """Offer the selected calculator's inputs and target."""
+        calculator = self.calculator()
+        labels = list(self.solve_for_inputs[calculator])
+        self.solve_for_combo.configure(values=labels)
+        self.solve_for_combo.set(labels[0])
+        metric, units, default = self.targets[calculator]
+        self.target_label.config(text=f"Target {metric} ({units}): ")
+        set_entry(self.target_entry, default)
+        self.solution = None
+
+    def read_target(self):
+        """Return (calculator, input to solve for, target) (raises ValueError on invalid input)."""
+        calculator = self.calculator()
+        return calculator, self.solve_for_inputs[calculator][self.solve_for_combo.get()], float(self.target_entry.get())
+
+    def solve_npv_tab(self, solve_for, target):
+        """Solve the NPV tab's inputs, including its adjustments; returns the value to enter on the tab."""
+        npv_app = self.app.npv_app
+        if solve_for == "discount_rate":
+            # The adjustments do not depend on the rate, so solve on the adjusted schedule and convert back to the entered basis
+            schedule = npv_app.build_schedule()
+            rate = seek_npv(schedule.rate, schedule.initial_investment, schedule.cash_flows, target, solve_for,
+                            periods_per_year=schedule.periods_per_year, periods=schedule.periods)[0]
+            if npv_app.rate_basis_combo.get() == "Real":
+                rate = (1 + rate) / (1 + float(npv_app.inflation_entry.get() or 0) / 100) - 1
+            return rate * 100
+
+        # NPV is affine in the investment and in a common scale of the cash flows, tax and depreciation included,
+        # so secant steps through the tab's own schedule land on the answer straight away
+        if solve_for == "initial_investment":
+            current = float(npv_app.initial_investment_entry.get())
+            npv_of = lambda values: np.array([npv_app.build_schedule(initial_investment=value).npv for value in np.atleast_1d(values)])
+            return float(secant_solve(npv_of, current, current + max(abs(current), 1.0), target)[0])
+        npv_of = lambda values: np.array([npv_app.build_schedule(cash_flow_scale=value).npv for value in np.atleast_1d(values)])
+        return float(secant_solve(npv_of, 1.0, 2.0, target)[0])
+
+    @audited("goal_seek.solve", inputs=lambda self: tab_inputs(self, self.app.npv_app, self.app.payback_app, self.app.break_even_app))
+    def solve_current(self):
+        """Solve for the selected input using the inputs currently entered on the calculator's tab."""
+        try:
+            calculator, solve_for, target = self.read_target()
+            with stage("compute"):
+                if calculator == "npv":
+                    value = self.solve_npv_tab(solve_for, target)
+                elif calculator == "payback":
+                    value = seek_payback(float(self.app.payback_app.initial_investment_entry.get()),
+                                         float(self.app.payback_app.annual_cash_flow_entry.get()), target, solve_for)
+                else:
+                    value = seek_break_even(*self.app.break_even_app.read_inputs(), target, solve_for)
+                value = float(value)
+        except ValueError as e:
+            show_error("Input Error", f"Please enter a valid target here and valid numerical values on the {self.calculator_combo.get()} tab.\n\n{e}")
+            return
+
+        self.solution = None
+        if np.isnan(value):
+            self.result_label.config(text=f"No {self.solve_for_combo.get()} reaches that target with the other inputs as entered.")
+            return
+        self.solution = (calculator, solve_for, value)
+        metric, units, _ = self.targets[calculator]
+        self.result_label.config(text=f"{self.solve_for_combo.get()}: {value:,.4f}\n"
+                                      f"hits the target {metric} of {target:,.2f} ({units}). Click 'Apply to Tab' to use it.")
+
+    def apply_to_tab(self):
+        """Enter the last solution on the calculator's tab, recalculate it and switch to that tab."""
+        if self.solution is None:
+            show_error("Error", "Please click 'Solve Current Inputs' first.")
+            return
+
+        calculator, solve_for, value = self.solution
+        if calculator == "npv":
+            tab = self.app.npv_app
+            if solve_for == "cash_flow_scale":
+                text = tab.cash_flows_entry.get()
+                if is_sparse_entry(text):
+                    periods, cash_flows = parse_sparse_cash_flows(text)
+                    entry = ", ".join(f"{period}: {cf * value:.10g}" for period, cf in zip(periods.tolist(), cash_flows))
+                else:
+                    entry = ", ".join(f"{cf:.10g}" for cf in parse_cash_flows(text) * value)
+                set_entry(tab.cash_flows_entry, entry)
+            else:
+                set_entry(getattr(tab, f"{solve_for}_entry"), f"{value:.10g}")
+            tab.calculate_npv()
+        elif calculator == "payback":
+            tab = self.app.payback_app
+            set_entry(getattr(tab, f"{solve_for}_entry"), f"{value:.10g}")
+            tab.calculate_payback_period()
+        else:
+            tab = self.app.break_even_app
+            set_entry(getattr(tab, f"{solve_for}_entry"), f"{value:.10g}")
+            tab.calculate_break_even()
+        self.solution = None
+        self.app.notebook.select(tab.parent)
+
+    @audited("goal_seek.solve_scenarios", inputs=lambda self: [self.calculator(), self.solve_for_combo.get(), self.target_entry.get(),
+                                                                 *scenario_inputs(self.app.scenario_app, self.calculator())])
+    def solve_scenarios(self):
+        """Solve for the selected input in every saved scenario of the calculator, in one batch."""
+        try:
+            calculator, solve_for, target = self.read_target()
+        except ValueError:
+            show_error("Input Error", "Please enter a valid numerical target.")
+            return
+        scenario_set = self.app.scenario_app.scenario_sets[calculator]
+        if not scenario_set.scenarios:
+            show_error("Error", f"Please add {self.calculator_combo.get()} scenarios on the Scenarios tab or import projects from the File menu first.")
+            return
+
+        with stage("compute"):
+            solved = goal_seek_scenarios(scenario_set, solve_for, target)
+        current = [1.0 if solve_for == "cash_flow_scale" else inputs[solve_for] for inputs in scenario_set.scenarios.values()]
+        self.table = pd.DataFrame({
+            "Scenario": list(solved),
+            f"Current {self.solve_for_combo.get()}": current,
+            f"Solved {self.solve_for_combo.get()}": list(solved.values())
+        })
+
+        self.tree.delete(*self.tree.get_children())
+        for name, current_value, value in self.table.itertuples(index=False):
+            self.tree.insert("", "end", values=(name, f"{current_value:,.4f}", "-" if np.isnan(value) else f"{value:,.4f}"))
+        reached = int(self.table.iloc[:, 2].notna().sum())
+        self.result_label.config(text=f"Solved {reached:,} of {len(self.table):,} {self.calculator_combo.get()} scenarios "
+                                      f"for a target of {target:,.2f}")
+
+    @audited("goal_seek.download_excel", "export", inputs=lambda self: [] if self.table is None else [self.table.to_numpy(dtype=str)])
+    def download_to_excel(self):
+        """Download the scenario goal seek results to an Excel file."""
+        try:
+            if self.table is None:
+                show_error("Error", "Please click 'Solve All Scenarios' first.")
+                return
+
+            desktop_path = os.path.join(os.path.expanduser("~"), "Desktop")
+            file_path = os.path.join(desktop_path, "goal_seek.xlsx")
+            with stage("write"):
+                self.table.to_excel(file_path, index=False)
+            record_file(file_path)
+
+            # Confirmation message
+            messagebox.showinfo("Download Complete", f"Goal seek results have been saved to {file_path}")
+
+        except Exception as e:
+            show_error("Error", f"Failed to save Excel file: {e}")
+
+
+# ----------------------------------------
+# Project Menu: Save / Open Project Files
+# ----------------------------------------
+
+@audited("project.save", "export", inputs=lambda app: tab_inputs(*app.project_apps.values()))
+def save_project_file(app):
+    """Save all calculator inputs and computed schedules as a project in a workspace file."""
+    try:
+        file_path = filedialog.asksaveasfilename(
+            defaultextension=PROJECT_FILE_EXTENSION,
+            filetypes=[("CBA Project files", f"*{PROJECT_FILE_EXTENSION}"), ("All files", "*.*")],
+            initialfile=os.path.basename(app.current_project["path"] or ""),
+            confirmoverwrite=False,  # Saving adds to an existing workspace rather than replacing it
+            title="Save Project As"
+        )
+        if not file_path:
+            return
+        name = simpledialog.askstring("Project Name", "Project name:", initialvalue=app.current_project["name"], parent=app.root)
+        if not name:
+            return
+
+        project = {
+            "inputs": {key: tab.get_inputs() for key, tab in app.project_apps.items()},
+            "schedules": {"payback": app.payback_app.schedule, "npv": app.npv_app.schedule}
+        }
+        with stage("write"):
+            save_project(file_path, name, project)
+        record_file(file_path)
+        app.current_project.update(path=file_path, name=name)
+        messagebox.showinfo("Save Successful", f"Project '{name}' has been saved to {file_path}")
+    except Exception as e:
+        show_error("Error", f"Failed to save project: {e}")
+
+@audited("project.open", "import", inputs=lambda app: [])
+def open_project_file(app):
+    """Open a workspace file and load one of its projects into the calculators."""
+    try:
+        file_path = filedialog.askopenfilename(
+            filetypes=[("CBA Project files", f"*{PROJECT_FILE_EXTENSION}"), ("All files", "*.*")],
+            title="Open Project"
+        )
+        if not file_path:
+            return
+
+        workspace = Workspace(file_path)
+        names = workspace.names()
+        name = names[0] if names else None
+        if len(names) > 1:
+            name = simpledialog.askstring("Open Project", "Projects in this file:\n" + "\n".join(names) + "\n\nProject to open:",
+                                          initialvalue=names[0], parent=app.root)
+            if not name:
+                return
+        if name not in names:
+            show_error("Error", f"No project named '{name}' in {file_path}")
+            return
+
+        # Only the chosen project's schedules are read; the tabs get copies, so the file can be saved to again
+        project = in_memory(workspace.load(name))
+        for key, tab in app.project_apps.items():
+            tab.load_project(project["inputs"].get(key, {}), project["schedules"].get(key))
+        app.current_project.update(path=file_path, name=name)
+    except Exception as e:
+        show_error("Error", f"Failed to open project: {e}")
+
+@audited("project.import", "import", inputs=lambda app: [])
+def import_projects_file(app):
+    """Import NPV project inputs from an Excel workbook or CSV file as scenarios."""
+    try:
+        file_path = filedialog.askopenfilename(
+            filetypes=IMPORT_FILE_TYPES + [("All files", "*.*")],
+            title="Import Projects"
+        )
+        if not file_path:
+            return
+
+        app.root.config(cursor="watch")
+        app.root.update_idletasks()
+        try:
+            with stage("compute"):
+                imported = import_projects(file_path)
+        finally:
+            app.root.config(cursor="")
+
+        # Every project becomes an NPV scenario, evaluated together; the first is also loaded into the NPV tab
+        if len(imported):
+            app.scenario_app.add_scenarios("npv", ((name, imported.inputs(i)) for i, name in enumerate(imported.names)))
+            app.npv_app.load_project(imported.entry_values(0))
+            app.npv_app.calculate_npv()
+
+        message = f"Imported {len(imported)} project(s) from {file_path} into the Scenarios tab."
+        if imported.errors:
+            shown = "\n".join(f"Row {row}: {error}" for row, error in imported.errors[:10])
+            more = f"\n... and {len(imported.errors) - 10} more" if len(imported.errors) > 10 else ""
+            message += f"\n\n{len(imported.errors)} problem(s) were skipped:\n{shown}{more}"
+        messagebox.showinfo("Import Complete", message)
+    except Exception as e:
+        show_error("Error", f"Failed to import projects: {e}")
+
+# ----------------------------------------
+# Options Menu: Audit Log Summary
+# ----------------------------------------
+
+def show_audit_summary(app):
+    """Open a window summarising the audit log per operation: runs, errors, timings, bytes and chart cache hits."""
+    window = tk.Toplevel(app.root)
+    window.title("Audit Log Summary")
+
+    path_label = ttk.Label(window, text=f"Log: {audit_log.path}")
+    path_label.pack(pady=5, padx=10, anchor='w')
+
+    table_frame = ttk.Frame(window)
+    table_frame.pack(pady=5, padx=10, fill='both', expand=True)
+    tree = ttk.Treeview(table_frame, show="headings", height=15)
+    x_scrollbar = ttk.Scrollbar(table_frame, orient="horizontal", command=tree.xview)
+    tree.configure(xscroll=x_scrollbar.set)
+    tree.pack(fill='both', expand=True)
+    x_scrollbar.pack(fill='x')
+
+    def refresh():
+        # Records still queued for the writer are included
+        audit_log.flush()
+        try:
+            summary = summarize(read_log(audit_log.path))
+        except Exception as e:
+            show_error("Error", f"Failed to read the audit log: {e}")
+            return
+
+        columns = list(summary.columns)
+        tree.delete(*tree.get_children())
+        tree.configure(columns=columns)
+        for column in columns:
+            tree.heading(column, text=column)
+            tree.column(column, anchor="center", width=150 if column == "operation" else 110)
+        for row in summary.itertuples(index=False):
+            tree.insert("", "end", values=[
+                "-" if isinstance(value, float) and np.isnan(value) else f"{value:,.1f}" if isinstance(value, float) else value
+                for value in row
+            ])
+        path_label.config(text=f"Log: {audit_log.path}  ({summary['Runs'].sum() if not summary.empty else 0:,} operations)")
+
+    ttk.Button(window, text="Refresh", command=refresh).pack(pady=5)
+    refresh()
+
+# ----------------------------------------
+# Application Factory
+# ----------------------------------------
+
+class CostBenefitApp:
+    """The main window with every tab and menu; each instance is independent of the others."""
+
+    def __init__(self, master=None):
+        # Create the main application window
+        self.root = master or tk.Tk()
+        self.root.title('Cost-Benefit Analysis Toolkit')
+        self.root.geometry('900x700')  # Increased window size to accommodate charts
+
+        # Recalculate the calculators as their entries are edited (toggled from the Options menu)
+        self.live_recalculation = tk.BooleanVar(self.root, value=True)
+
+        # Initialize ttk.Style and set the 'clam' theme
+        style = ttk.Style(self.root)
+        style.theme_use('clam')
+
+        # Configure the 'TButton' style
+        style.configure('TButton',
+                        background='#d0e8f1',
+                        foreground='black',
+                        padding=6)
+        style.map('TButton',
+                  background=[('active', '#87CEFA')],
+                  foreground=[('active', 'black')])
+
+        # Create a Scrollable Frame to hold the Notebook
+        scrollable_container = ScrollableFrame(self.root)
+        scrollable_container.pack(fill='both', expand=True)
+
+        # Create a Notebook widget to hold tabs within the scrollable frame
+        self.notebook = ttk.Notebook(scrollable_container.scrollable_frame)
+        self.notebook.pack(expand=1, fill='both')
+
+        # Create a frame for the 'About CBA' tab
+        build_about_tab(self.add_tab('About CBA'))
+
+        # The calculator tabs reach each other through this app
+        self.bcr_app = BCRComparisonApp(self.add_tab('BCR vs. Net Profit'), self)
+        self.payback_app = PaybackPeriodApp(self.add_tab('Payback Period'), self)
+        self.npv_app = NPVCalculatorApp(self.add_tab('NPV Calculator'), self)
+        self.break_even_app = BreakEvenAnalysisApp(self.add_tab('Break-Even Analysis'), self)
+        self.dated_cash_flows_app = DatedCashFlowsApp(self.add_tab('Dated Cash Flows'), self)
+        self.sensitivity_app = SensitivityAnalysisApp(self.add_tab('Sensitivity'), self)
+        self.scenario_app = ScenarioComparisonApp(self.add_tab('Scenarios'), self)
+        self.real_options_app = RealOptionsApp(self.add_tab('Real Options'), self)
+        self.goal_seek_app = GoalSeekApp(self.add_tab('Goal Seek'), self)
+
+        # Calculators whose inputs and schedules are stored in a project file
+        self.project_apps = dict(payback=self.payback_app, npv=self.npv_app, break_even=self.break_even_app,
+                                 dated_cash_flows=self.dated_cash_flows_app)
+
+        # The project file and name last saved or opened
+        self.current_project = {"path": None, "name": "Project 1"}
+
+        # Add the 'File' menu to the main window
+        menu_bar = tk.Menu(self.root)
+        file_menu = tk.Menu(menu_bar, tearoff=0)
+        file_menu.add_command(label="Open Project...", command=functools.partial(open_project_file, self))
+        file_menu.add_command(label="Save Project...", command=functools.partial(save_project_file, self))
+        file_menu.add_separator()
+        file_menu.add_command(label="Import Projects from Excel/CSV...", command=functools.partial(import_projects_file, self))
+        menu_bar.add_cascade(label="File", menu=file_menu)
+
+        # Add the 'Options' menu to the main window
+        options_menu = tk.Menu(menu_bar, tearoff=0)
+        options_menu.add_checkbutton(label="Live Recalculation", variable=self.live_recalculation)
+        options_menu.add_separator()
+        options_menu.add_command(label="Audit Log Summary...", command=functools.partial(show_audit_summary, self))
+        menu_bar.add_cascade(label="Options", menu=options_menu)
+        self.root.config(menu=menu_bar)
+
+    def add_tab(self, text):
+        """Add a notebook tab and return its frame."""
+        frame = ttk.Frame(self.notebook)
+        self.notebook.add(frame, text=text)
+        return frame
+
+def create_app(master=None):
+    """Build the main window with every tab and menu and return the app, without starting the event loop.
+
+    Nothing is created at import time, so the calculators can be driven
+    programmatically (see gui_harness.py).
+    """
+    return CostBenefitApp(master)
 
 # ----------------------------------------
 # Start the Tkinter event loop
 # ----------------------------------------
 
-root.mainloop()
+def main():
+    create_app().root.mainloop()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,124 @@
+import numpy as np
+
+# ----------------------------------------
+# Dated Cash Flows (XNPV / XIRR)
+# ----------------------------------------
+
+# Cash flows on arbitrary dates are discounted by the year fraction between the
+# valuation date and each payment date. Dates are held as datetime64[D] arrays
+# and every convention below is computed with whole-array arithmetic, so a
+# schedule of hundreds of thousands of payments discounts in milliseconds.
+
+DAY_COUNT_CONVENTIONS = ("ACT/365F", "ACT/360", "ACT/ACT", "30/360", "30E/360")
+
+
+def to_dates(dates):
+    """Convert strings, datetimes or datetime64 values to a datetime64[D] array."""
+    return np.asarray(dates, dtype="datetime64[D]")
+
+
+def _date_parts(dates):
+    years = dates.astype("datetime64[Y]").astype(np.int64) + 1970
+    months = dates.astype("datetime64[M]").astype(np.int64) % 12 + 1
+    days = (dates - dates.astype("datetime64[M]")).astype(np.int64) + 1
+    return years, months, days
+
+
+def _actual_actual_position(dates):
+    """Return each date as year + elapsed fraction of that calendar year."""
+    year_start = dates.astype("datetime64[Y]")
+    days_in_year = ((year_start + 1).astype("datetime64[D]") - year_start.astype("datetime64[D]")).astype(np.float64)
+    elapsed = (dates - year_start.astype("datetime64[D]")).astype(np.float64)
+    return year_start.astype(np.float64) + elapsed / days_in_year
+
+
+def year_fractions(dates, start=None, convention="ACT/365F"):
+    """Return the year fraction from start (default: the earliest date) to each date."""
+    dates = to_dates(dates)
+    start = dates.min() if start is None else np.datetime64(start, "D")
+
+    if convention == "ACT/365F":
+        return (dates - start).astype(np.float64) / 365.0
+    if convention == "ACT/360":
+        return (dates - start).astype(np.float64) / 360.0
+    if convention == "ACT/ACT":
+        # ISDA: days falling in each calendar year are divided by that year's length
+        return _actual_actual_position(dates) - _actual_actual_position(start)
+    if convention in ("30/360", "30E/360"):
+        y1, m1, d1 = _date_parts(start)
+        y2, m2, d2 = _date_parts(dates)
+        d1 = min(d1, 30)
+        if convention == "30E/360":
+            d2 = np.minimum(d2, 30)
+        else:
+            # US bond basis: a 31st end date only rolls back when the start is the 30th/31st
+            d2 = np.where((d2 == 31) & (d1 == 30), 30, d2)
+        return (360 * (y2 - y1) + 30 * (m2 - m1) + (d2 - d1)).astype(np.float64) / 360.0
+    raise ValueError(f"Unknown day-count convention: {convention}")
+
+
+def xnpv(rate, amounts, dates=None, start=None, convention="ACT/365F", fractions=None):
+    """Return the net present value of dated cash flows at an annual rate (as a fraction)."""
+    if fractions is None:
+        fractions = year_fractions(dates, start, convention)
+    return float(np.dot(np.asarray(amounts, dtype=np.float64), np.exp(-fractions * np.log1p(rate))))
+
+
+def xirr(amounts, dates=None, start=None, convention="ACT/365F", guess=0.1, tolerance=1e-10, max_iterations=100):
+    """Return the annual rate at which the dated cash flows have zero NPV."""
+    amounts = np.asarray(amounts, dtype=np.float64)
+    fractions = year_fractions(dates, start, convention)
+    if not (amounts > 0).any() or not (amounts < 0).any():
+        raise ValueError("XIRR needs at least one positive and one negative cash flow.")
+
+    # Newton's method with the analytic derivative of XNPV with respect to the rate
+    rate = guess
+    for _ in range(max_iterations):
+        if rate <= -1:
+            break
+        discount = np.exp(-fractions * np.log1p(rate))
+        value = np.dot(amounts, discount)
+        slope = -np.dot(amounts * fractions, discount) / (1 + rate)
+        if slope == 0 or not np.isfinite(slope):
+            break
+        step = value / slope
+        rate -= step
+        if abs(step) < tolerance:
+            return float(rate)
+
+    # Fall back to bisection on a bracket that changes sign
+    low, high = -0.9999, 1.0
+    low_value = xnpv(low, amounts, fractions=fractions)
+    while np.sign(xnpv(high, amounts, fractions=fractions)) == np.sign(low_value):
+        high *= 2
+        if high > 1e6:
+            raise ValueError("XIRR did not converge.")
+    for _ in range(200):
+        mid = (low + high) / 2
+        mid_value = xnpv(mid, amounts, fractions=fractions)
+        if np.sign(mid_value) == np.sign(low_value):
+            low, low_value = mid, mid_value
+        else:
+            high = mid
+        if high - low < tolerance:
+            break
+    return float((low + high) / 2)
+
+
+def parse_dated_cash_flows(text):
+    """Parse 'YYYY-MM-DD, amount' lines into (dates, amounts) arrays, sorted by date."""
+    dates = []
+    amounts = []
+    for line in text.splitlines():
+        if not line.strip():
+            continue
+        date_text, _, amount_text = line.partition(",")
+        dates.append(date_text.strip())
+        amounts.append(float(amount_text.strip()))
+    if not dates:
+        raise ValueError("Enter at least one dated cash flow.")
+
+    dates = to_dates(dates)
+    amounts = np.array(amounts, dtype=np.float64)
+    order = np.argsort(dates, kind="stable")
+    return dates[order], amounts[order]
@@ -0,0 +1,187 @@
+import numpy as np
+
+from batch_engine import npv_batch
+from sparse_cash_flows import sparse_npv_batch, stack_events
+
+# ----------------------------------------
+# Goal Seek
+# ----------------------------------------
+
+# Solves for the one input that makes a metric hit a target, for many
+# projects at once. Where the metric can be inverted it is:
+#
+#   Break-even   Q = F / (p - v)    p = v + F / Q    v = p - F / Q    F = Q (p - v)
+#   Payback      T = I / A          A = I / T        I = A T
+#   NPV          NPV = k PV - I     I = k PV - NPV   k = (NPV + I) / PV
+#
+# (k scales every cash flow). The discount rate has no closed form, so it is
+# found by bracketed root-finding: false position with the Illinois
+# modification, run on all projects together with one batch NPV evaluation
+# per iteration. Projects without a solution get NaN.
+
+# Inputs each calculator can solve for
+GOAL_SEEK_INPUTS = {
+    "npv": ("discount_rate", "initial_investment", "cash_flow_scale"),
+    "payback": ("initial_investment", "annual_cash_flow"),
+    "break-even": ("fixed_costs", "variable_cost", "sales_price")
+}
+
+# Discount rates searched for an NPV target, as fractions
+DEFAULT_RATE_BRACKET = (-0.95, 10.0)
+
+
+def bracketed_root(function, low, high, xtol=1e-12, max_iterations=200):
+    """Return a root of function in [low, high] for each element, NaN where the bracket has no sign change.
+
+    function maps an array of x values (one per element) to an array of
+    results; low and high hold one bound per element.
+    """
+    a, b = np.broadcast_arrays(np.asarray(low, dtype=np.float64), np.asarray(high, dtype=np.float64))
+    a, b = a.astype(np.float64), b.astype(np.float64)
+    with np.errstate(all="ignore"):
+        fa, fb = function(a), function(b)
+        found = np.where(fa == 0, a, np.where(fb == 0, b, np.nan))
+        active = np.isnan(found) & (np.sign(fa) * np.sign(fb) < 0)
+
+        for _ in range(max_iterations):
+            if not active.any():
+                break
+            # False position, falling back to bisection where it leaves the bracket or meets an overflow
+            c = b - fb * (b - a) / (fb - fa)
+            midpoint = (a + b) / 2
+            c = np.where(np.isfinite(c) & (c > np.minimum(a, b)) & (c < np.maximum(a, b)), c, midpoint)
+            c = np.where(active, c, a)
+            fc = function(c)
+
+            # Keep the sign change between b and c; halve the stale end's value (Illinois) so it keeps moving
+            crossed = np.sign(fc) * np.sign(fb) < 0
+            a, fa = np.where(crossed, b, a), np.where(crossed, fb, fa / 2)
+            b, fb = c, fc
+
+            converged = active & ((fc == 0) | (np.abs(b - a) <= xtol * np.maximum(1.0, np.abs(b))))
+            found = np.where(converged, b, found)
+            active &= ~converged
+
+    # Elements still searching after max_iterations are within the last bracket
+    return np.where(active, b, found)
+
+
+def secant_solve(function, x0, x1, target, tolerance=1e-6, max_iterations=50):
+    """Return x with function(x) = target for each element by secant steps from x0 and x1, NaN if they stall.
+
+    Exact after one step when function is affine in x, as NPV is in the
+    investment and in a common scale of the cash flows.
+    """
+    x0, x1 = (np.asarray(x, dtype=np.float64) for x in (x0, x1))
+    f0, f1 = function(x0) - target, function(x1) - target
+    with np.errstate(divide="ignore", invalid="ignore"):
+        for _ in range(max_iterations):
+            if np.all(np.abs(f1) <= tolerance * np.maximum(1.0, np.abs(target))):
+                break
+            x0, x1 = x1, x1 - f1 * (x1 - x0) / (f1 - f0)
+            f0, f1 = f1, function(x1) - target
+    return np.where(np.abs(f1) <= tolerance * np.maximum(1.0, np.abs(target)), x1, np.nan)
+
+
+def seek_break_even(fixed_costs, variable_costs, sales_prices, target_units, solve_for):
+    """Return the fixed costs, variable cost or sales price that gives each target break-even volume."""
+    fixed_costs, variable_costs, sales_prices, target_units = np.broadcast_arrays(
+        *(np.asarray(value, dtype=np.float64) for value in (fixed_costs, variable_costs, sales_prices, target_units)))
+    with np.errstate(divide="ignore", invalid="ignore"):
+        if solve_for == "fixed_costs":
+            margins = sales_prices - variable_costs
+            value = np.where(margins > 0, target_units * margins, np.nan)
+        elif solve_for == "sales_price":
+            value = variable_costs + fixed_costs / target_units
+        elif solve_for == "variable_cost":
+            value = sales_prices - fixed_costs / target_units
+        else:
+            raise ValueError(f"Break-even cannot solve for: {solve_for}")
+    return np.where(target_units > 0, value, np.nan)
+
+
+def seek_payback(initial_investments, annual_cash_flows, target_years, solve_for):
+    """Return the initial investment or annual benefit that gives each target payback period."""
+    initial_investments, annual_cash_flows, target_years = np.broadcast_arrays(
+        *(np.asarray(value, dtype=np.float64) for value in (initial_investments, annual_cash_flows, target_years)))
+    with np.errstate(divide="ignore", invalid="ignore"):
+        if solve_for == "annual_cash_flow":
+            value = np.where(initial_investments > 0, initial_investments / target_years, np.nan)
+        elif solve_for == "initial_investment":
+            value = np.where(annual_cash_flows > 0, annual_cash_flows * target_years, np.nan)
+        else:
+            raise ValueError(f"Payback cannot solve for: {solve_for}")
+    return np.where(target_years > 0, value, np.nan)
+
+
+def seek_npv(discount_rates, initial_investments, cash_flows, target_npv, solve_for, rate_bracket=DEFAULT_RATE_BRACKET,
+             periods_per_year=1, periods=None):
+    """Return the annual discount rate (fraction), initial investment or cash flow scale that gives each target NPV.
+
+    cash_flows is a projects x periods matrix starting in period 1, as in the
+    batch engine (or numbered by periods), with periods_per_year for every
+    project or one per project. With target_npv = 0 the discount rate is the
+    IRR.
+    """
+    cash_flows = np.atleast_2d(np.asarray(cash_flows, dtype=np.float64))
+    return _seek_npv(lambda rates, investments: npv_batch(rates, investments, cash_flows, periods_per_year, periods),
+                     cash_flows.shape[0], discount_rates, initial_investments, target_npv, solve_for, rate_bracket)
+
+
+def seek_sparse_npv(discount_rates, initial_investments, projects, periods, amounts, target_npv, solve_for,
+                    rate_bracket=DEFAULT_RATE_BRACKET, periods_per_year=1):
+    """Return the same solutions as seek_npv for projects given as events (project index, period, amount).
+
+    There is one discount rate per project, as in sparse_npv_batch.
+    """
+    return _seek_npv(lambda rates, investments: sparse_npv_batch(rates, investments, projects, periods, amounts, periods_per_year),
+                     np.size(discount_rates), discount_rates, initial_investments, target_npv, solve_for, rate_bracket)
+
+
+def _seek_npv(evaluate, projects, discount_rates, initial_investments, target_npv, solve_for, rate_bracket):
+    """Solve for one NPV input given evaluate(rates, investments), returning a batch NPV result."""
+    discount_rates, initial_investments, target_npv = (
+        np.broadcast_to(np.asarray(value, dtype=np.float64), (projects,))
+        for value in (discount_rates, initial_investments, target_npv)
+    )
+
+    if solve_for == "discount_rate":
+        low, high = (np.full(projects, bound, dtype=np.float64) for bound in rate_bracket)
+        return bracketed_root(lambda rates: evaluate(rates, initial_investments)["npv"] - target_npv, low, high)
+
+    total_pv = evaluate(discount_rates, initial_investments)["total_pv"]
+    if solve_for == "initial_investment":
+        return total_pv - target_npv
+    if solve_for == "cash_flow_scale":
+        with np.errstate(divide="ignore", invalid="ignore"):
+            return np.where(total_pv != 0, (target_npv + initial_investments) / total_pv, np.nan)
+    raise ValueError(f"NPV cannot solve for: {solve_for}")
+
+
+def goal_seek(calculator, inputs, solve_for, target):
+    """Solve for one input of every input set (scenario-style dicts) and return the solved values.
+
+    Inputs use the scenario conventions: discount rates in %, cash flows as
+    1-D sequences numbered by periods (default 1, 2, ...) with
+    periods_per_year of them a year (default 1). target is a scalar or one
+    value per input set, in the units of the calculator's headline metric.
+    """
+    if solve_for not in GOAL_SEEK_INPUTS.get(calculator, ()):
+        raise ValueError(f"Cannot solve {calculator} for: {solve_for}")
+    inputs = list(inputs)
+    column = lambda key: np.array([i[key] for i in inputs], dtype=np.float64)
+
+    if calculator == "npv":
+        projects, periods, amounts, periods_per_year = stack_events(inputs)
+        value = seek_sparse_npv(column("discount_rate") / 100, column("initial_investment"), projects, periods, amounts,
+                                target, solve_for, periods_per_year=periods_per_year)
+        return value * 100 if solve_for == "discount_rate" else value
+    if calculator == "payback":
+        return seek_payback(column("initial_investment"), column("annual_cash_flow"), target, solve_for)
+    return seek_break_even(column("fixed_costs"), column("variable_cost"), column("sales_price"), target, solve_for)
+
+
+def goal_seek_scenarios(scenario_set, solve_for, target):
+    """Solve every scenario of a set and return {scenario name: solved value}."""
+    values = goal_seek(scenario_set.calculator, scenario_set.scenarios.values(), solve_for, target)
+    return dict(zip(scenario_set.scenarios, values.tolist()))
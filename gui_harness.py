@@ -0,0 +1,558 @@
+import argparse
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+import tkinter as tk
+
+import numpy as np
+
+import tk_stub
+from audit_log import read_log
+from cash_flow_schedule import CashFlowSchedule
+
+# ----------------------------------------
+# Headless GUI Harness
+# ----------------------------------------
+
+# Builds the app with create_app() and drives the calculators the way a user
+# would: filling entries and pressing buttons by calling their handlers. Each
+# check asserts on what the tab shows and on a latency budget measured end to
+# end, including the pending redraws. Checks start cold: live recalculation is
+# off (except in its own check) and no chart has been rendered, so the timed
+# handler pays for its chart in full. Message boxes and file / text dialogs
+# are intercepted and recorded instead of blocking. Without a display the
+# harness starts Xvfb, if it is installed. Failing that it runs the app on the
+# Tk stand-in in tk_stub.py, which checks the results only: with no Tk layout
+# or painting to pay for, its timings say nothing about the budgets.
+#
+#   python gui_harness.py                   run every check
+#   python gui_harness.py -k npv            run the checks with 'npv' in their name
+#   python gui_harness.py --budget-scale 2  allow twice the time on a slow machine
+#   python gui_harness.py --stub-tk         use the Tk stand-in even with a display
+
+CHECKS = []
+
+
+def check(budget_ms):
+    """Register a check function(harness) whose timed part must finish within budget_ms."""
+    def register(function):
+        CHECKS.append((function.__name__, budget_ms, function))
+        return function
+    return register
+
+
+class CheckFailed(AssertionError):
+    pass
+
+
+def expect(condition, message):
+    if not condition:
+        raise CheckFailed(message)
+
+
+# ----------------------------------------
+# Virtual Display
+# ----------------------------------------
+
+def needs_stub_tk():
+    """Return True when there is no display and none can be started, so only the Tk stand-in can run the app."""
+    return not (os.environ.get("DISPLAY") or sys.platform in ("win32", "darwin") or shutil.which("Xvfb"))
+
+
+def start_virtual_display():
+    """Start Xvfb and point DISPLAY at it when there is no display; returns the process or None."""
+    if os.environ.get("DISPLAY") or sys.platform in ("win32", "darwin") or not shutil.which("Xvfb"):
+        return None
+    for number in range(99, 120):
+        if os.path.exists(f"/tmp/.X11-unix/X{number}") or os.path.exists(f"/tmp/.X{number}-lock"):
+            continue
+        process = subprocess.Popen(["Xvfb", f":{number}", "-screen", "0", "1280x1024x24", "-nolisten", "tcp"],
+                                   stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        for _ in range(100):
+            if os.path.exists(f"/tmp/.X11-unix/X{number}"):
+                os.environ["DISPLAY"] = f":{number}"
+                return process
+            if process.poll() is not None:
+                break
+            time.sleep(0.05)
+        process.kill()
+    return None
+
+
+# ----------------------------------------
+# Dialog Interception
+# ----------------------------------------
+
+class DialogRecorder:
+    """Replace the app's message boxes and dialogs with recorders returning scripted answers."""
+
+    patched = {
+        "messagebox": ("showinfo", "showwarning", "showerror", "askyesno", "askokcancel"),
+        "filedialog": ("askopenfilename", "asksaveasfilename"),
+        "simpledialog": ("askstring",)
+    }
+
+    def __init__(self, gui):
+        self.gui = gui
+        self.calls = []
+        self.answers = {}
+        self._originals = []
+
+    def __enter__(self):
+        for module_name, names in self.patched.items():
+            module = getattr(self.gui, module_name)
+            for name in names:
+                self._originals.append((module, name, getattr(module, name)))
+                setattr(module, name, self._recorder(name))
+        return self
+
+    def __exit__(self, *exc_info):
+        for module, name, original in reversed(self._originals):
+            setattr(module, name, original)
+        self._originals = []
+
+    def _recorder(self, name):
+        def record(*args, **kwargs):
+            self.calls.append((name, args[:2], kwargs))
+            answers = self.answers.get(name)
+            if answers:
+                return answers.pop(0)
+            return "" if name.startswith("ask") and name not in ("askyesno", "askokcancel") else None
+        return record
+
+    def answer(self, name, *values):
+        """Queue the values the next calls to dialog name return."""
+        self.answers.setdefault(name, []).extend(values)
+
+    def titles(self, name=None):
+        return [args[0] if args else kwargs.get("title") for called, args, kwargs in self.calls if name in (None, called)]
+
+    def errors(self):
+        return self.titles("showerror")
+
+    def clear(self):
+        self.calls = []
+
+
+# ----------------------------------------
+# Harness
+# ----------------------------------------
+
+class Harness:
+    def __init__(self, gui, dialogs):
+        self.gui = gui
+        self.dialogs = dialogs
+        # Keep the checks out of the user's audit log
+        gui.audit_log.path = os.path.join(tempfile.mkdtemp(prefix="cba-harness-"), "audit_log.jsonl")
+        self.app = gui.create_app()
+        self.root = self.app.root
+        self.root.update()
+
+    def reset(self):
+        """Start the next check cold: no live recalculation running ahead of it and no chart already rendered."""
+        self.app.live_recalculation.set(False)
+        self.gui.chart_service.clear()
+        self.dialogs.clear()
+
+    def fill(self, entry, value):
+        self.gui.set_entry(entry, value)
+
+    def run(self, handler, *args):
+        """Call a handler and process the redraws it queued; returns (result, elapsed seconds)."""
+        start = time.perf_counter()
+        result = handler(*args)
+        self.root.update()
+        return result, time.perf_counter() - start
+
+    def settle(self, seconds):
+        """Keep the event loop running for a while, e.g. for debounced live recalculation."""
+        end = time.perf_counter() + seconds
+        while time.perf_counter() < end:
+            self.root.update()
+            time.sleep(0.005)
+
+    def close(self):
+        self.root.destroy()
+
+
+def label_text(label):
+    return str(label.cget("text"))
+
+
+# ----------------------------------------
+# Checks
+# ----------------------------------------
+
+@check(budget_ms=100)
+def npv_10k_periods(harness):
+    app = harness.app.npv_app
+    cash_flows = np.round(np.linspace(1000, 5000, 10000), 2)
+    harness.fill(app.discount_rate_entry, "8")
+    harness.fill(app.initial_investment_entry, "1000000")
+    harness.fill(app.cash_flows_entry, ", ".join(f"{value:g}" for value in cash_flows))
+
+    _, elapsed = harness.run(app.calculate_npv)
+    expected = CashFlowSchedule(cash_flows, 0.08, 1000000).npv
+    expect(label_text(app.npv_label) == f"NPV (£): £{expected:,.2f}", f"unexpected NPV label: {label_text(app.npv_label)}")
+    return elapsed
+
+
+@check(budget_ms=400)
+def npv_600_months_by_year(harness):
+    app = harness.app.npv_app
+    cash_flows = np.round(np.linspace(100, 500, 600), 2)
+    harness.fill(app.discount_rate_entry, "8")
+    harness.fill(app.initial_investment_entry, "50000")
+    harness.fill(app.cash_flows_entry, ", ".join(f"{value:g}" for value in cash_flows))
+    app.periods_combo.set("Monthly")
+    app.show_by_combo.set("Annual")
+
+    try:
+        _, elapsed = harness.run(app.calculate_npv)
+        expected = CashFlowSchedule(cash_flows, 0.08, 50000, periods_per_year=12).npv
+        expect(label_text(app.npv_label) == f"NPV (£): £{expected:,.2f}", f"unexpected NPV label: {label_text(app.npv_label)}")
+        expect(len(app.schedule_table.rows) == 50, f"expected 50 yearly rows, got {len(app.schedule_table.rows)}")
+    finally:
+        # Later checks expect annual cash flows
+        app.periods_combo.set("Annual")
+    return elapsed
+
+
+@check(budget_ms=200)
+def sparse_npv_over_1000_years(harness):
+    app = harness.app.npv_app
+    harness.fill(app.discount_rate_entry, "3")
+    harness.fill(app.initial_investment_entry, "100000")
+    harness.fill(app.cash_flows_entry, "1: -5000, 50: 40000, 100: 250000, 1000: 1000000")
+
+    _, elapsed = harness.run(app.calculate_npv)
+    dense = np.zeros(1000)
+    dense[[0, 49, 99, 999]] = [-5000, 40000, 250000, 1000000]
+    expected = CashFlowSchedule(dense, 0.03, 100000).npv
+    expect(label_text(app.npv_label) == f"NPV (£): £{expected:,.2f}", f"unexpected NPV label: {label_text(app.npv_label)}")
+    expect(len(app.schedule_table.rows) == 4, f"expected 4 rows (one per cash flow), got {len(app.schedule_table.rows)}")
+    return elapsed
+
+
+@check(budget_ms=200)
+def npv_without_cash_flows(harness):
+    app = harness.app.npv_app
+    harness.fill(app.discount_rate_entry, "5")
+    harness.fill(app.initial_investment_entry, "1000")
+    harness.fill(app.cash_flows_entry, "5: 0")
+    harness.fill(app.working_capital_entry, "10")
+
+    try:
+        _, elapsed = harness.run(app.calculate_npv)
+    finally:
+        harness.fill(app.working_capital_entry, "0")
+    expect(not harness.dialogs.errors(), f"unexpected error dialogs: {harness.dialogs.errors()}")
+    expect(label_text(app.npv_label) == "NPV (£): £-1,000.00", f"unexpected NPV label: {label_text(app.npv_label)}")
+    expect(not app.schedule_table.rows, "the table shows rows for an empty schedule")
+    return elapsed
+
+
+@check(budget_ms=200)
+def payback_default_inputs(harness):
+    app = harness.app.payback_app
+    harness.fill(app.initial_investment_entry, "10000")
+    harness.fill(app.annual_cash_flow_entry, "2500")
+
+    _, elapsed = harness.run(app.calculate_payback_period)
+    expect(label_text(app.result_label) == "Payback Period: 4 years and 0 months",
+           f"unexpected payback label: {label_text(app.result_label)}")
+    return elapsed
+
+
+@check(budget_ms=200)
+def break_even_default_inputs(harness):
+    app = harness.app.break_even_app
+    harness.fill(app.fixed_costs_entry, "10000")
+    harness.fill(app.variable_cost_entry, "20")
+    harness.fill(app.sales_price_entry, "50")
+
+    _, elapsed = harness.run(app.calculate_break_even)
+    expect(label_text(app.breakeven_units_label) == "Break-Even Point: 333.33 units",
+           f"unexpected break-even label: {label_text(app.breakeven_units_label)}")
+    return elapsed
+
+
+@check(budget_ms=50)
+def invalid_npv_input_shows_error(harness):
+    app = harness.app.npv_app
+    harness.fill(app.cash_flows_entry, "1000, abc")
+
+    _, elapsed = harness.run(app.calculate_npv)
+    expect(harness.dialogs.errors() == ["Input Error"], f"expected one 'Input Error' dialog, got {harness.dialogs.errors()}")
+    harness.dialogs.clear()
+    return elapsed
+
+
+@check(budget_ms=200)
+def live_recalculation_updates_npv(harness):
+    app = harness.app.npv_app
+    harness.app.live_recalculation.set(True)
+    harness.fill(app.discount_rate_entry, "10")
+    harness.fill(app.initial_investment_entry, "1000")
+    harness.fill(app.cash_flows_entry, "1100")
+
+    start = time.perf_counter()
+    harness.settle(0.15)
+    expected = CashFlowSchedule([1100], 0.10, 1000).npv
+    expect(label_text(app.npv_label) == f"NPV (£): £{expected:,.2f}", f"live recalculation did not update: {label_text(app.npv_label)}")
+    return time.perf_counter() - start
+
+
+@check(budget_ms=1000)
+def xnpv_200k_dated_flows(harness):
+    app = harness.app.dated_cash_flows_app
+    dates = np.datetime64("2024-01-01") + np.arange(200000) // 20
+    amounts = np.where(np.arange(200000) == 0, -1000000.0, 10.0)
+    harness.fill(app.discount_rate_entry, "6")
+    app.cash_flows_text.delete("1.0", "end")
+    app.cash_flows_text.insert("1.0", "\n".join(f"{date}, {amount:g}" for date, amount in zip(dates.astype(str), amounts)))
+
+    _, elapsed = harness.run(app.calculate_xnpv)
+    expect(not harness.dialogs.errors(), f"unexpected error dialogs: {harness.dialogs.errors()}")
+    expect(label_text(app.rows_label) == "Showing 500 of 200,000 cash flows", f"unexpected rows label: {label_text(app.rows_label)}")
+    expect(len(app.ax.collections[0].get_segments()) == app.max_chart_points, "the chart does not total the cash flows")
+    return elapsed
+
+
+@check(budget_ms=5000)
+def payback_distribution_1m_paths(harness):
+    app = harness.app.payback_app
+    harness.fill(app.initial_investment_entry, "10000")
+    harness.fill(app.annual_cash_flow_entry, "2500")
+    harness.fill(app.growth_entry, "2")
+    harness.fill(app.volatility_entry, "20")
+    harness.fill(app.paths_entry, "1000000")
+    harness.fill(app.horizon_entry, "50")
+
+    _, elapsed = harness.run(app.simulate_distribution)
+    expect(app.distribution is not None and app.distribution.paths == 1000000, "simulation did not run")
+    expect("P50" in label_text(app.simulation_label) and "P90" in label_text(app.simulation_label),
+           f"unexpected simulation label: {label_text(app.simulation_label)}")
+    return elapsed
+
+
+@check(budget_ms=1000)
+def scenario_501_evaluates_only_itself(harness):
+    app = harness.app.scenario_app
+    app.calculator_combo.set("NPV")
+    scenario_set = app.scenario_sets["npv"]
+    for i in range(500):
+        scenario_set.add(f"Scenario {i + 1}", {"discount_rate": 5 + i % 10, "initial_investment": 1000,
+                                               "cash_flows": np.full(10, 150.0 + i)})
+    app.refresh()
+
+    npv_app = harness.app.npv_app
+    harness.fill(npv_app.discount_rate_entry, "8")
+    harness.fill(npv_app.initial_investment_entry, "1000")
+    harness.fill(npv_app.cash_flows_entry, "300, 300, 300, 300, 300")
+    harness.fill(app.name_entry, "Scenario 501")
+
+    _, elapsed = harness.run(app.add_scenario)
+    expect(len(scenario_set.scenarios) == 501, f"expected 501 scenarios, got {len(scenario_set.scenarios)}")
+    # The overlay chart reads the results back through evaluate(), so the count to check is the one the tab reported
+    expect("(last update evaluated 1)" in label_text(app.status_label), f"unexpected status: {label_text(app.status_label)}")
+    expect(len(app.tree.get_children()) == 501, "diff table does not show every scenario")
+    return elapsed
+
+
+@check(budget_ms=500)
+def bcr_of_2000_scenarios(harness):
+    scenario_set = harness.app.scenario_app.scenario_sets["npv"]
+    for i in range(2000 - len(scenario_set.scenarios)):
+        scenario_set.add(f"Project {i + 1}", {"discount_rate": 8, "initial_investment": 1000 + i,
+                                              "cash_flows": np.full(10, 150.0)})
+
+    app = harness.app.bcr_app
+    _, elapsed = harness.run(app.calculate_project_bcrs)
+    expect(len(app.results) == 2000, f"expected 2000 BCR results, got {len(app.results)}")
+    expect(len(app.project_table.rows) == 2000, "project table does not hold every result")
+    return elapsed
+
+
+@check(budget_ms=500)
+def sensitivity_of_npv(harness):
+    npv_app = harness.app.npv_app
+    harness.fill(npv_app.discount_rate_entry, "5")
+    harness.fill(npv_app.initial_investment_entry, "10000")
+    harness.fill(npv_app.cash_flows_entry, "3000, 4000, 5000, 6000")
+
+    app = harness.app.sensitivity_app
+    app.metric_combo.set("NPV")
+    _, elapsed = harness.run(app.run_sensitivity)
+    expect(len(app.tree.get_children()) == 6, f"expected 6 sensitivity rows, got {len(app.tree.get_children())}")
+    expect(not harness.dialogs.errors(), f"unexpected error dialogs: {harness.dialogs.errors()}")
+    return elapsed
+
+
+@check(budget_ms=500)
+def real_options_of_npv_project(harness):
+    npv_app = harness.app.npv_app
+    harness.fill(npv_app.discount_rate_entry, "10")
+    harness.fill(npv_app.initial_investment_entry, "10000")
+    harness.fill(npv_app.cash_flows_entry, "3000, 3500, 4000, 4500, 5000")
+
+    app = harness.app.real_options_app
+    harness.fill(app.entries["steps"], "500")
+    _, elapsed = harness.run(app.value_options)
+    expect(not harness.dialogs.errors(), f"unexpected error dialogs: {harness.dialogs.errors()}")
+    expect(list(app.table["Options"]) == ["None (Static NPV)", "Expand", "Contract", "Abandon", "Defer", "All Options"],
+           f"unexpected options table: {list(app.table['Options'])}")
+    expect((app.table["Option Value (£)"] >= 0).all(), "an option has a negative value")
+    return elapsed
+
+
+@check(budget_ms=50)
+def goal_seek_break_even_price(harness):
+    break_even_app = harness.app.break_even_app
+    harness.fill(break_even_app.fixed_costs_entry, "5000")
+    harness.fill(break_even_app.variable_cost_entry, "20")
+    harness.fill(break_even_app.sales_price_entry, "30")
+
+    app = harness.app.goal_seek_app
+    app.calculator_combo.set("Break-Even")
+    app.select_calculator()
+    app.solve_for_combo.set("Sales Price per Unit (£)")
+    harness.fill(app.target_entry, "1000")
+    _, elapsed = harness.run(app.solve_current)
+    expect(not harness.dialogs.errors(), f"unexpected error dialogs: {harness.dialogs.errors()}")
+    expect(app.solution == ("break-even", "sales_price", 25.0), f"unexpected goal seek solution: {app.solution}")
+    return elapsed
+
+
+@check(budget_ms=300)
+def goal_seek_scales_sparse_cash_flows(harness):
+    npv_app = harness.app.npv_app
+    harness.fill(npv_app.discount_rate_entry, "8")
+    harness.fill(npv_app.initial_investment_entry, "1000")
+    harness.fill(npv_app.cash_flows_entry, "1: 500, 10: 2000")
+
+    app = harness.app.goal_seek_app
+    app.calculator_combo.set("NPV")
+    app.select_calculator()
+    app.solve_for_combo.set("Cash Flow Scale (×)")
+    harness.fill(app.target_entry, "0")
+    harness.run(app.solve_current)
+    _, elapsed = harness.run(app.apply_to_tab)
+    expect(not harness.dialogs.errors(), f"unexpected error dialogs: {harness.dialogs.errors()}")
+    expect(npv_app.cash_flows_entry.get().startswith("1: "), f"sparse cash flows were not kept: {npv_app.cash_flows_entry.get()}")
+    expect(label_text(npv_app.npv_label) == "NPV (£): £0.00", f"unexpected NPV label: {label_text(npv_app.npv_label)}")
+    return elapsed
+
+
+@check(budget_ms=500)
+def project_save_open_save(harness):
+    app = harness.app.npv_app
+    harness.fill(app.discount_rate_entry, "7")
+    harness.fill(app.initial_investment_entry, "20000")
+    harness.fill(app.cash_flows_entry, "6000, 6500, 7000, 7500")
+    harness.run(app.calculate_npv)
+    expected = label_text(app.npv_label)
+    path = os.path.join(os.path.dirname(harness.gui.audit_log.path), "harness" + harness.gui.PROJECT_FILE_EXTENSION)
+
+    start = time.perf_counter()
+    harness.dialogs.answer("asksaveasfilename", path, path)
+    harness.dialogs.answer("askstring", "Harness Project", "Harness Project")
+    harness.dialogs.answer("askopenfilename", path)
+    harness.run(harness.gui.save_project_file, harness.app)
+    harness.run(harness.gui.open_project_file, harness.app)
+    expect(not isinstance(app.schedule.data, np.memmap), "the opened project still maps the project file")
+    # Saving the open project back to its own file replaces the file it was read from
+    harness.run(harness.gui.save_project_file, harness.app)
+    elapsed = time.perf_counter() - start
+
+    expect(not harness.dialogs.errors(), f"unexpected error dialogs: {harness.dialogs.errors()}")
+    expect(harness.gui.Workspace(path).names() == ["Harness Project"], "the project file does not hold the saved project")
+    expect(label_text(app.npv_label) == expected, f"the opened project shows {label_text(app.npv_label)}, expected {expected}")
+    return elapsed
+
+
+@check(budget_ms=400)
+def audit_log_records_calculations(harness):
+    app = harness.app.npv_app
+    harness.fill(app.discount_rate_entry, "10")
+    harness.fill(app.initial_investment_entry, "10000")
+    harness.fill(app.cash_flows_entry, "3000, 3500, 4000, 4500, 5000")
+
+    _, elapsed = harness.run(app.calculate_npv)
+    expect(harness.gui.audit_log.flush(), "the audit log writer did not catch up")
+    log = read_log(harness.gui.audit_log.path)
+    expect(not log.empty and log["operation"].iloc[-1] == "npv.calculate" and log["status"].iloc[-1] == "ok",
+           "the last NPV calculation was not logged")
+    failed = log[(log["operation"] == "npv.calculate") & (log["status"] == "error")]
+    expect(not failed.empty, "the invalid NPV input was not logged as an error")
+    return elapsed
+
+
+# ----------------------------------------
+# Runner
+# ----------------------------------------
+
+def run_checks(selected=None, budget_scale=1.0, stub_tk=False):
+    """Run the checks and return a list of (name, passed, elapsed ms, budget ms, message).
+
+    On the Tk stand-in only the results are checked: the budgets are for real
+    Tk, so the budget is None and the elapsed time is for information only.
+    """
+    display = None if stub_tk else start_virtual_display()
+    if stub_tk:
+        tk_stub.install()
+    try:
+        import cost_benefit_analyis as gui
+        results = []
+        with DialogRecorder(gui) as dialogs:
+            harness = Harness(gui, dialogs)
+            try:
+                for name, budget_ms, function in CHECKS:
+                    if selected and not any(pattern in name for pattern in selected):
+                        continue
+                    budget_ms = None if stub_tk else budget_ms * budget_scale
+                    harness.reset()
+                    try:
+                        elapsed_ms = function(harness) * 1000
+                        passed = budget_ms is None or elapsed_ms <= budget_ms
+                        message = "" if passed else f"took {elapsed_ms:,.1f} ms, budget {budget_ms:,.0f} ms"
+                    except Exception as e:
+                        elapsed_ms, passed, message = float("nan"), False, f"{type(e).__name__}: {e}"
+                    results.append((name, passed, elapsed_ms, budget_ms, message))
+            finally:
+                harness.close()
+        return results
+    finally:
+        if display is not None:
+            display.terminate()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Drive the Cost-Benefit Analysis Toolkit without a user and check results and latency.")
+    parser.add_argument("-k", dest="selected", action="append", help="only run checks whose name contains this text")
+    parser.add_argument("--budget-scale", type=float, default=1.0, help="multiply every latency budget, e.g. 2 on a slow machine")
+    parser.add_argument("--stub-tk", action="store_true", help="run on the Tk stand-in even if a display is available")
+    args = parser.parse_args(argv)
+
+    stub_tk = args.stub_tk or needs_stub_tk()
+    if stub_tk:
+        print("Running on the Tk stand-in (tk_stub.py): results are checked, latency budgets are not.")
+    try:
+        results = run_checks(args.selected, args.budget_scale, stub_tk)
+    except tk.TclError as e:
+        print(f"Could not start the application ({e}); set DISPLAY or install Xvfb.")
+        return 2
+    width = max((len(name) for name, *_ in results), default=0)
+    for name, passed, elapsed_ms, budget_ms, message in results:
+        budget = "untimed" if budget_ms is None else f"{budget_ms:,.0f} ms"
+        print(f"{'PASS' if passed else 'FAIL'}  {name:<{width}}  {elapsed_ms:9.1f} ms / {budget}  {message}")
+    failed = sum(1 for _, passed, *_ in results if not passed)
+    print(f"{len(results) - failed} passed, {failed} failed" + (" (results only, on the Tk stand-in)" if stub_tk else ""))
+    return 1 if failed or not results else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
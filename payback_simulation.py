@@ -0,0 +1,80 @@
+import numpy as np
+
+from batch_engine import payback_periods
+
+# ----------------------------------------
+# Probabilistic Payback (Monte Carlo)
+# ----------------------------------------
+
+# Annual benefits follow a geometric random walk around the entered benefit:
+#
+#   B_t = A * (1 + g) ** (t - 1) * exp(sum_{s <= t} (sigma * Z_s - sigma ** 2 / 2))
+#
+# so the expected benefit in year t is A * (1 + g) ** (t - 1) and volatility
+# compounds from year to year. Paths are simulated in chunks of a (paths x
+# years) matrix, and each chunk's payback crossing is found with the batch
+# engine's cumulative-sum / argmax, so memory is bounded by the chunk size and
+# only one payback period per path is kept.
+
+SIMULATION_CHUNK_PATHS = 20000
+DEFAULT_PERCENTILES = (10, 50, 90)
+
+
+def simulate_benefits(annual_cash_flow, growth, volatility, paths, years, rng):
+    """Return a (paths x years) matrix of simulated annual benefits."""
+    log_levels = rng.standard_normal((paths, years))
+    log_levels *= volatility
+    log_levels -= volatility ** 2 / 2
+    np.cumsum(log_levels, axis=1, out=log_levels)
+    log_levels += np.arange(years) * np.log1p(growth)
+    np.exp(log_levels, out=log_levels)
+    log_levels *= annual_cash_flow
+    return log_levels
+
+
+class PaybackDistribution:
+    """Simulated payback periods, NaN for paths that do not pay back within the horizon."""
+
+    def __init__(self, periods, max_years):
+        self.periods = periods
+        self.max_years = max_years
+
+    @property
+    def paths(self):
+        return self.periods.size
+
+    @property
+    def recovered(self):
+        """Share of paths that pay back within the horizon."""
+        return float(np.count_nonzero(~np.isnan(self.periods))) / max(self.paths, 1)
+
+    def percentile(self, q):
+        """Return the q-th percentile payback period (inf if more than 100 - q % of paths never pay back)."""
+        return float(np.percentile(np.nan_to_num(self.periods, nan=np.inf), q, method="inverted_cdf"))
+
+    def percentiles(self, qs=DEFAULT_PERCENTILES):
+        return {q: self.percentile(q) for q in qs}
+
+    def histogram(self, bins=50):
+        """Return (counts, edges) of the paths that pay back within the horizon."""
+        return np.histogram(self.periods[~np.isnan(self.periods)], bins=bins, range=(0, self.max_years))
+
+
+def simulate_payback(initial_investment, annual_cash_flow, growth=0.0, volatility=0.0, paths=100000,
+                     max_years=50, seed=None, chunk_paths=SIMULATION_CHUNK_PATHS):
+    """Simulate benefit paths and return the distribution of payback periods (rates as fractions)."""
+    if initial_investment <= 0:
+        raise ValueError("Initial Investment must be a positive number.")
+    if paths <= 0 or max_years <= 0:
+        raise ValueError("The number of paths and years must be positive.")
+    if volatility < 0 or growth <= -1:
+        raise ValueError("Volatility cannot be negative and growth must be above -100%.")
+
+    rng = np.random.default_rng(seed)
+    periods = np.empty(paths)
+    investments = np.full(min(chunk_paths, paths), float(initial_investment))
+    for start in range(0, paths, chunk_paths):
+        count = min(chunk_paths, paths - start)
+        benefits = simulate_benefits(annual_cash_flow, growth, volatility, count, max_years, rng)
+        periods[start:start + count] = payback_periods(investments[:count], benefits)
+    return PaybackDistribution(periods, max_years)
@@ -0,0 +1,132 @@
+import json
+import os
+import struct
+import zipfile
+
+import numpy as np
+from numpy.lib import format as npy_format
+
+from cash_flow_schedule import CashFlowSchedule
+
+# ----------------------------------------
+# Project Files
+# ----------------------------------------
+
+# A workspace file is an uncompressed NPZ archive: one JSON manifest plus one
+# .npy member per computed schedule. Members are stored (not deflated), so a
+# schedule can be memory-mapped straight out of the archive when its project
+# is opened, and untouched projects are never read.
+
+PROJECT_FILE_EXTENSION = ".cbaproj"
+PROJECT_FILE_VERSION = 1
+MANIFEST_KEY = "manifest"
+
+# Size of the fixed part of a zip local file header
+_LOCAL_HEADER_SIZE = 30
+
+_HEADER_READERS = {
+    (1, 0): npy_format.read_array_header_1_0,
+    (2, 0): npy_format.read_array_header_2_0,
+}
+
+
+def save_workspace(path, projects):
+    """Write every project (name -> {"inputs": ..., "schedules": ...}) to a workspace file."""
+    arrays = {}
+    manifest = {"version": PROJECT_FILE_VERSION, "projects": {}}
+
+    for project_index, (name, project) in enumerate(projects.items()):
+        entry = {"inputs": project.get("inputs", {}), "schedules": {}}
+        for kind, schedule in project.get("schedules", {}).items():
+            if schedule is None:
+                continue
+            key = f"p{project_index}_{kind}"
+            arrays[key] = np.ascontiguousarray(schedule.data, dtype=np.float64)
+            entry["schedules"][kind] = {
+                "key": key,
+                "rate": schedule.rate,
+                "initial_investment": schedule.initial_investment,
+                "periods_per_year": schedule.periods_per_year
+            }
+        manifest["projects"][name] = entry
+
+    arrays[MANIFEST_KEY] = np.frombuffer(json.dumps(manifest).encode("utf-8"), dtype=np.uint8)
+
+    # Write alongside and swap in, so a failed save never truncates an existing workspace
+    temp_path = path + ".tmp"
+    with open(temp_path, "wb") as f:
+        np.savez(f, **arrays)
+    os.replace(temp_path, path)
+
+
+def in_memory(project):
+    """Copy a loaded project's memory-mapped schedules into memory, so no mapping keeps its file open."""
+    for schedule in project["schedules"].values():
+        if schedule is not None and isinstance(schedule.data, np.memmap):
+            schedule.data = np.array(schedule.data)
+    return project
+
+
+def save_project(path, name, project):
+    """Add or replace one project in a workspace file, keeping the others as they are."""
+    # The file cannot be replaced while any of it is mapped (on Windows), including the project being saved
+    projects = {}
+    if os.path.exists(path):
+        workspace = Workspace(path)
+        for other in workspace.names():
+            if other != name:
+                projects[other] = in_memory(workspace.load(other))
+    projects[name] = in_memory(project)
+    save_workspace(path, projects)
+
+
+class Workspace:
+    """Read-only view of a workspace file that deserializes a project only when it is loaded."""
+
+    def __init__(self, path):
+        self.path = path
+        with zipfile.ZipFile(path) as archive:
+            self._members = {info.filename[:-len(".npy")]: info for info in archive.infolist()}
+            with archive.open(MANIFEST_KEY + ".npy") as f:
+                manifest = json.loads(npy_format.read_array(f).tobytes().decode("utf-8"))
+
+        if manifest.get("version") != PROJECT_FILE_VERSION:
+            raise ValueError(f"Unsupported project file version: {manifest.get('version')}")
+        self._projects = manifest["projects"]
+
+    def names(self):
+        """Return the project names in the order they were saved."""
+        return list(self._projects)
+
+    def load(self, name):
+        """Return {"inputs": ..., "schedules": ...} for one project, memory-mapping its schedules."""
+        entry = self._projects[name]
+        schedules = {
+            kind: CashFlowSchedule.from_array(self._map_array(meta["key"]), meta["rate"], meta["initial_investment"],
+                                              meta.get("periods_per_year", 1))
+            for kind, meta in entry["schedules"].items()
+        }
+        return {"inputs": entry["inputs"], "schedules": schedules}
+
+    def _map_array(self, key):
+        """Memory-map a stored .npy member in place, falling back to a normal read if it is compressed."""
+        info = self._members[key]
+        if info.compress_type != zipfile.ZIP_STORED:
+            with zipfile.ZipFile(self.path) as archive, archive.open(info) as f:
+                return npy_format.read_array(f)
+
+        with open(self.path, "rb") as f:
+            # The local header's extra field may differ from the central directory, so read its lengths
+            f.seek(info.header_offset)
+            local_header = f.read(_LOCAL_HEADER_SIZE)
+            name_length, extra_length = struct.unpack("<HH", local_header[26:30])
+            f.seek(info.header_offset + _LOCAL_HEADER_SIZE + name_length + extra_length)
+
+            version = npy_format.read_magic(f)
+            shape, fortran_order, dtype = _HEADER_READERS[version](f)
+            offset = f.tell()
+
+        if 0 in shape:
+            return np.empty(shape, dtype=dtype)
+        return np.memmap(self.path, dtype=dtype, mode="r", shape=shape,
+                         order="F" if fortran_order else "C", offset=offset)
@@ -0,0 +1,453 @@
+import codecs
+import csv
+import os
+import re
+import zipfile
+from html import unescape
+from itertools import islice
+from xml.etree.ElementTree import iterparse
+
+import numpy as np
+
+from sparse_cash_flows import sparse_npv_batch
+
+# ----------------------------------------
+# Bulk Import of Project Inputs
+# ----------------------------------------
+
+# Reads NPV project inputs from .xlsx or .csv files. The first row holds the
+# column headings; either layout below is accepted (headings are matched
+# without regard to case, spacing or punctuation):
+#
+#   long  - one row per project and year:
+#           Project | Year | Cash Flow | Initial Investment | Discount Rate (%)
+#           (Year is optional, without it a project's rows are years 1, 2, ...
+#           in file order; investment and rate may be given on any row of the
+#           project, the first non-blank value is used)
+#
+#   wide  - one row per project:
+#           Project | Initial Investment | Discount Rate (%) | Year 1 | Year 2 | ...
+#
+# Cash flows are kept as (year, amount) events: years missing from a project,
+# or left blank, have no cash flow, so sparse projects stay small.
+#
+# Workbooks are streamed straight out of the .xlsx zip a block at a time and
+# never loaded as a whole, and rows are converted to float64 in chunks, so
+# memory is bounded by the chunk size plus the imported numbers themselves.
+
+IMPORT_FILE_TYPES = [("Excel Workbooks", "*.xlsx"), ("CSV Files", "*.csv")]
+
+# Rows converted to numbers at a time
+IMPORT_CHUNK_ROWS = 50000
+
+# Recognised headings (normalised) for each field
+_FIELD_ALIASES = {
+    "project": ("project", "projectname", "name", "scenario"),
+    "year": ("year", "period"),
+    "cash_flow": ("cashflow", "netcashflow", "netbenefit", "netbenefits", "amount"),
+    "initial_investment": ("initialinvestment", "investment", "capex"),
+    "discount_rate": ("discountrate", "rate")
+}
+
+# Wide-layout cash flow headings, e.g. "Year 3" or "Cash Flow 3"
+_WIDE_HEADING = re.compile(r"^(?:year|cashflow|period)(\d+)$")
+
+# Matches each row start (with its row number) and each cell inside a
+# worksheet's <sheetData> with its column letters, attributes, stored value
+# and inline string, so the XML text is scanned without building elements.
+_XLSX_CELL = re.compile(
+    r'<(?:(row)(?: r="(\d+)")?[ >]|c(?: r="([A-Z]+)\d+")?([^>]*)>'
+    r'(?:<f[^>]*(?:/>|>[^<]*</f>))?(?:<v>([^<]*)|<is>(.*?)</is>)?)'
+)
+
+# The text runs of an inline string; rich text has one <r><t> run per format
+_XLSX_TEXT = re.compile(r'<t(?: [^>]*)?>([^<]*)</t>')
+
+# Compressed bytes of a worksheet read at a time
+_XLSX_BLOCK_SIZE = 1 << 20
+
+_XLSX_NS = "{http://schemas.openxmlformats.org/spreadsheetml/2006/main}"
+_REL_NS = "{http://schemas.openxmlformats.org/officeDocument/2006/relationships}"
+_PACKAGE_REL_NS = "{http://schemas.openxmlformats.org/package/2006/relationships}"
+
+
+def _normalise_heading(heading):
+    return re.sub(r"[^a-z0-9]", "", str(heading or "").lower())
+
+
+# ----------------------------------------
+# Row Readers
+# ----------------------------------------
+
+# Zero-based column index of each cell reference's letters, e.g. "AB" -> 27
+_column_indexes = {}
+
+
+def _column_index(letters):
+    index = _column_indexes.get(letters)
+    if index is None:
+        index = 0
+        for letter in letters:
+            index = index * 26 + ord(letter) - 64
+        index = _column_indexes[letters] = index - 1
+    return index
+
+
+def _shared_strings(archive):
+    if "xl/sharedStrings.xml" not in archive.namelist():
+        return []
+    strings = []
+    with archive.open("xl/sharedStrings.xml") as f:
+        for _, element in iterparse(f):
+            if element.tag == _XLSX_NS + "si":
+                strings.append("".join(text.text or "" for text in element.iter(_XLSX_NS + "t")))
+                element.clear()
+    return strings
+
+
+def _sheet_path(archive, sheet=None):
+    """Return the zip member of the named sheet (default: the first one)."""
+    with archive.open("xl/workbook.xml") as f:
+        sheets = [(element.get("name"), element.get(_REL_NS + "id"))
+                  for _, element in iterparse(f) if element.tag == _XLSX_NS + "sheet"]
+    if not sheets:
+        raise ValueError("The workbook has no sheets.")
+    matches = [rel_id for name, rel_id in sheets if sheet is None or name == sheet]
+    if not matches:
+        raise ValueError(f"The workbook has no sheet named '{sheet}'.")
+
+    with archive.open("xl/_rels/workbook.xml.rels") as f:
+        targets = {element.get("Id"): element.get("Target")
+                   for _, element in iterparse(f) if element.tag == _PACKAGE_REL_NS + "Relationship"}
+    target = targets[matches[0]]
+    return target.lstrip("/") if target.startswith("/") else "xl/" + target
+
+
+def iter_xlsx_rows(path, sheet=None):
+    """Yield (row number, cell values) for each row of a worksheet, streaming the sheet XML.
+
+    Numbers are yielded as their stored text and converted in bulk later;
+    blank cells are None. Blank rows are not stored in the sheet, so the row
+    numbers are read from it rather than counted.
+    """
+    with zipfile.ZipFile(path) as archive:
+        strings = _shared_strings(archive)
+        with archive.open(_sheet_path(archive, sheet)) as f:
+            decoder = codecs.getincrementaldecoder("utf-8")()
+            buffer = ""
+            row = None
+            row_number = 0
+            column_indexes = _column_indexes
+            while True:
+                block = f.read(_XLSX_BLOCK_SIZE)
+                buffer += decoder.decode(block, final=not block)
+                # Nothing after the sheet data is a cell
+                data_end = buffer.find("</sheetData>")
+                if data_end >= 0:
+                    buffer = buffer[:data_end]
+                    block = b""
+                # Scan whole rows only; a row cut off at the end of the block waits for the next one
+                end = buffer.rfind("</row>") + len("</row>") if block else len(buffer)
+                if end < len("</row>"):
+                    continue
+                text, buffer = buffer[:end], buffer[end:]
+
+                for row_start, row_reference, letters, attributes, value, inline in _XLSX_CELL.findall(text):
+                    if row_start:
+                        if row is not None:
+                            yield row_number, row
+                        row = []
+                        row_number = int(row_reference) if row_reference else row_number + 1
+                        continue
+                    if row is None:
+                        continue
+                    if letters:
+                        column = column_indexes.get(letters)
+                        if column is None:
+                            column = _column_index(letters)
+                        if column > len(row):
+                            row.extend([None] * (column - len(row)))
+                    if 't="' in attributes:
+                        if 't="s"' in attributes:
+                            value = strings[int(value)]
+                        elif 't="inlineStr"' in attributes:
+                            inline = "".join(_XLSX_TEXT.findall(inline))
+                            value = unescape(inline) if "&" in inline else inline
+                        elif 't="e"' in attributes:
+                            value = None
+                        elif 't="str"' in attributes and "&" in value:
+                            value = unescape(value)
+                    row.append(value or None)
+
+                if not block:
+                    break
+            if row is not None:
+                yield row_number, row
+
+
+def iter_csv_rows(path):
+    """Yield (line number, values) for each row of a CSV file; a quoted value may span lines."""
+    with open(path, newline="", encoding="utf-8-sig") as f:
+        reader = csv.reader(f)
+        for row in reader:
+            yield reader.line_num, row
+
+
+def iter_rows(path, sheet=None):
+    """Yield (row number, values) for the rows of an .xlsx or .csv file."""
+    extension = os.path.splitext(path)[1].lower()
+    if extension == ".xlsx":
+        return iter_xlsx_rows(path, sheet)
+    if extension == ".csv":
+        return iter_csv_rows(path)
+    raise ValueError(f"Unsupported file type: {extension} (expected .xlsx or .csv)")
+
+
+# ----------------------------------------
+# Bulk Numeric Conversion
+# ----------------------------------------
+
+def _clean_number(value):
+    if value is None:
+        return np.nan
+    if isinstance(value, (int, float)):
+        return float(value)
+    text = value.strip().replace(",", "").replace("£", "").rstrip("%").strip()
+    if not text:
+        return np.nan
+    if text.startswith("(") and text.endswith(")"):
+        text = "-" + text[1:-1]  # Accounting-style negatives
+    return float(text)
+
+
+def to_numbers(values, row_numbers, column_name, errors):
+    """Convert a chunk of cell values to float64 (blank -> NaN), recording unreadable cells in errors."""
+    try:
+        return np.array(values, dtype=np.float64)
+    except (TypeError, ValueError):
+        pass
+
+    # Only chunks with blanks or formatted text fall back to converting cell by cell
+    numbers = np.empty(len(values), dtype=np.float64)
+    for i, value in enumerate(values):
+        try:
+            numbers[i] = _clean_number(value)
+        except ValueError:
+            numbers[i] = np.nan
+            errors.append((int(row_numbers[i]), f"{column_name}: '{value}' is not a number"))
+    return numbers
+
+
+# ----------------------------------------
+# Imported Projects
+# ----------------------------------------
+
+class ImportedProjects:
+    """NPV inputs of many projects, with every project's cash flows held in one flat array."""
+
+    def __init__(self, names, initial_investments, discount_rates, flow_offsets, flows, errors=None, flow_periods=None):
+        self.names = list(names)
+        self.initial_investments = np.asarray(initial_investments, dtype=np.float64)
+        self.discount_rates = np.asarray(discount_rates, dtype=np.float64)
+        # Project i's cash flows are flows[flow_offsets[i]:flow_offsets[i + 1]]
+        self.flow_offsets = np.asarray(flow_offsets, dtype=np.int64)
+        self.flows = np.asarray(flows, dtype=np.float64)
+        # The year of each cash flow; by default each project's are years 1, 2, ...
+        if flow_periods is None:
+            flow_periods = np.arange(self.flows.size) - np.repeat(self.flow_offsets[:-1], np.diff(self.flow_offsets)) + 1
+        self.flow_periods = np.asarray(flow_periods, dtype=np.int64)
+        # (row number, message) for every cell or project that could not be imported
+        self.errors = list(errors or [])
+
+    def __len__(self):
+        return len(self.names)
+
+    def cash_flows(self, i):
+        return self.flows[self.flow_offsets[i]:self.flow_offsets[i + 1]]
+
+    def periods(self, i):
+        return self.flow_periods[self.flow_offsets[i]:self.flow_offsets[i + 1]]
+
+    def consecutive(self, i):
+        """Whether project i has one cash flow a year from year 1, with none missing."""
+        periods = self.periods(i)
+        return np.array_equal(periods, np.arange(1, periods.size + 1))
+
+    def inputs(self, i):
+        """Return project i as scenario inputs (discount rate as a percentage)."""
+        return {
+            "discount_rate": float(self.discount_rates[i]),
+            "initial_investment": float(self.initial_investments[i]),
+            "cash_flows": self.cash_flows(i),
+            "periods": None if self.consecutive(i) else self.periods(i)
+        }
+
+    def entry_values(self, i):
+        """Return project i as the strings entered in the NPV Calculator tab."""
+        if self.consecutive(i):
+            cash_flows = ", ".join(f"{value:g}" for value in self.cash_flows(i))
+        else:
+            cash_flows = ", ".join(f"{period}: {value:g}" for period, value in zip(self.periods(i).tolist(), self.cash_flows(i)))
+        return {
+            "discount_rate": f"{self.discount_rates[i]:g}",
+            "initial_investment": f"{self.initial_investments[i]:g}",
+            "cash_flows": cash_flows
+        }
+
+    def npv(self):
+        """Evaluate every project at once from its (year, amount) events."""
+        projects = np.repeat(np.arange(len(self)), np.diff(self.flow_offsets))
+        return sparse_npv_batch(self.discount_rates / 100, self.initial_investments, projects, self.flow_periods, self.flows)
+
+
+def _find_columns(header):
+    normalised = [_normalise_heading(heading) for heading in header]
+    columns = {}
+    for field, aliases in _FIELD_ALIASES.items():
+        for index, heading in enumerate(normalised):
+            if heading in aliases:
+                columns[field] = index
+                break
+    wide = sorted((int(match.group(1)), index) for index, match in
+                  ((index, _WIDE_HEADING.match(heading)) for index, heading in enumerate(normalised)) if match)
+    if wide and wide[0][0] < 1:
+        raise ValueError("Cash flow columns are numbered from Year 1.")
+    return columns, wide
+
+
+def _first_per_group(codes, values, count):
+    """Return the first non-NaN value for each code 0..count-1 (NaN where there is none)."""
+    result = np.full(count, np.nan)
+    present = ~np.isnan(values)
+    group_codes, first = np.unique(codes[present], return_index=True)
+    result[group_codes] = values[present][first]
+    return result
+
+
+def import_projects(path, sheet=None, chunk_size=IMPORT_CHUNK_ROWS):
+    """Read the NPV inputs of every project in an .xlsx or .csv file."""
+    rows = iter_rows(path, sheet)
+    _, header = next(rows, (None, None))
+    if header is None:
+        raise ValueError("The file is empty.")
+    columns, wide_years = _find_columns(header)
+    wide_columns = [index for _, index in wide_years]
+    if "project" not in columns:
+        raise ValueError("No 'Project' column found in the first row.")
+    if "cash_flow" not in columns and not wide_columns:
+        raise ValueError("No 'Cash Flow' column (or 'Year 1', 'Year 2', ... columns) found in the first row.")
+
+    wide = "cash_flow" not in columns
+    numeric_fields = [field for field in ("year", "cash_flow", "initial_investment", "discount_rate") if field in columns]
+    numeric_columns = [columns[field] for field in numeric_fields] + (wide_columns if wide else [])
+    project_column = columns["project"]
+
+    # Project code of each name, and of each raw cell value so names are only cleaned once
+    codes_by_name = {}
+    codes_by_value = {}
+    errors = []
+    code_chunks = []
+    number_chunks = []
+    row_chunks = []
+
+    while True:
+        chunk = list(islice(rows, chunk_size))
+        if not chunk:
+            break
+        chunk_rows = np.array([row_number for row_number, _ in chunk], dtype=np.int64)
+        chunk = [row for _, row in chunk]
+
+        # Look up every row's project at once; only new and blank names need a closer look
+        values = [row[project_column] if len(row) > project_column else None for row in chunk]
+        chunk_codes = np.array([codes_by_value.get(value, -1) for value in values], dtype=np.int64)
+        for i in np.flatnonzero(chunk_codes < 0):
+            value = values[i]
+            code = codes_by_value.get(value)
+            if code is None:
+                name = "" if value is None else str(value).strip()
+                if not name:
+                    if any(len(chunk[i]) > column and chunk[i][column] not in (None, "") for column in numeric_columns):
+                        errors.append((int(chunk_rows[i]), "Project name is blank"))
+                    continue
+                code = codes_by_value[value] = codes_by_name.setdefault(name, len(codes_by_name))
+            chunk_codes[i] = code
+
+        named = chunk_codes >= 0
+        if not named.all():
+            chunk = [row for row, keep in zip(chunk, named) if keep]
+            chunk_rows = chunk_rows[named]
+            chunk_codes = chunk_codes[named]
+
+        # Columns of the chunk as float64 arrays, one conversion per column
+        number_chunks.append(np.column_stack([
+            to_numbers([row[column] if len(row) > column else None for row in chunk], chunk_rows, header[column], errors)
+            for column in numeric_columns
+        ]) if chunk else np.empty((0, len(numeric_columns))))
+        code_chunks.append(chunk_codes)
+        row_chunks.append(chunk_rows)
+
+    names = list(codes_by_name)
+    count = len(names)
+    if not count:
+        raise ValueError("No projects found in the file.")
+    codes = np.concatenate(code_chunks)
+    numbers = np.concatenate(number_chunks)
+    row_numbers = np.concatenate(row_chunks)
+    field = {name: numbers[:, i] for i, name in enumerate(numeric_fields)}
+
+    zeros = np.zeros(codes.size)
+    initial_investments = _first_per_group(codes, field.get("initial_investment", zeros), count)
+    discount_rates = _first_per_group(codes, field.get("discount_rate", zeros), count)
+
+    if wide:
+        # One row per project: blank year cells are years without a cash flow
+        flow_matrix = numbers[:, len(numeric_fields):]
+        present = ~np.isnan(flow_matrix)
+        flow_codes = np.repeat(codes, present.sum(axis=1))
+        flow_values = flow_matrix[present]
+        flow_periods = np.broadcast_to(np.array([year for year, _ in wide_years], dtype=np.float64), flow_matrix.shape)[present]
+        order = np.argsort(flow_codes, kind="stable")
+    else:
+        present = ~np.isnan(field["cash_flow"])
+        if "year" in field:
+            # Cash flows need a whole year from 1 to be placed
+            years = field["year"]
+            placed = present & (years >= 1) & (years == np.floor(years))
+            for i in np.flatnonzero(present & ~placed):
+                errors.append((int(row_numbers[i]), "Year is blank" if np.isnan(years[i]) else f"Year: '{years[i]:g}' is not a whole number from 1"))
+            present = placed
+        flow_codes = codes[present]
+        flow_values = field["cash_flow"][present]
+        if "year" in field:
+            flow_periods = field["year"][present]
+            order = np.lexsort((flow_periods, flow_codes))
+        else:
+            order = np.argsort(flow_codes, kind="stable")
+    flow_codes = flow_codes[order]
+    flow_values = flow_values[order]
+
+    # Projects with no cash flows or no investment / rate cannot be evaluated
+    flow_counts = np.bincount(flow_codes, minlength=count)
+    valid = (flow_counts > 0) & ~np.isnan(initial_investments) & ~np.isnan(discount_rates)
+    for code in np.flatnonzero(~valid):
+        missing = [label for label, ok in (("cash flows", flow_counts[code] > 0),
+                                           ("initial investment", not np.isnan(initial_investments[code])),
+                                           ("discount rate", not np.isnan(discount_rates[code]))) if not ok]
+        errors.append((int(row_numbers[np.argmax(codes == code)]), f"Project '{names[code]}' has no {', '.join(missing)}"))
+
+    keep = valid[flow_codes]
+    flow_offsets = np.concatenate(([0], np.cumsum(flow_counts[valid])))
+    if wide or "year" in field:
+        flow_periods = flow_periods[order][keep]
+    else:
+        # Each project's rows in file order are years 1, 2, ...
+        flow_periods = None
+    return ImportedProjects(
+        [name for name, ok in zip(names, valid) if ok],
+        initial_investments[valid],
+        discount_rates[valid],
+        flow_offsets,
+        flow_values[keep],
+        sorted(errors),
+        flow_periods
+    )
@@ -0,0 +1,223 @@
+import numpy as np
+
+# ----------------------------------------
+# Real Options (Binomial Lattice)
+# ----------------------------------------
+
+# The static NPV assumes the project is run as planned whatever happens. Real
+# options value the choices management keeps - expand, contract or abandon the
+# project, or defer the investment - on a recombining Cox-Ross-Rubinstein
+# lattice of the project's value V, which starts at the total PV of benefits
+# from the NPV discounting:
+#
+#   u = exp(sigma * sqrt(dt))    d = 1 / u
+#   p = ((1 + r) ** dt * (1 - q) ** dt - d) / (u - d)
+#
+# where r is the discount rate and q the share of the project's value paid out
+# as cash each year. Step i of the lattice has i + 1 nodes, node k (k up
+# moves) holding V * u ** (2k - i), so a step is one contiguous float64 row
+# and backward induction is a handful of array operations per step:
+#
+#   W_i = max(payout + (1 + r) ** -dt * (p * W_i+1[1:] + (1 - p) * W_i+1[:-1]),
+#             exercise value of each option open at step i)
+#
+# Only the current row is kept, so memory is O(steps). Batches of projects are
+# (projects x nodes) rows; every input may be given per project. Options are
+# treated as mutually exclusive at a node, and their windows are measured from
+# today even when the investment is deferred.
+
+DEFAULT_LATTICE_STEPS = 500
+
+
+def _column(values):
+    """Shape per-project parameters as a column so they broadcast over lattice rows; scalars stay scalars."""
+    values = np.asarray(values, dtype=np.float64)
+    return values[:, None] if values.ndim else values
+
+
+class RealOption:
+    """A choice that can be taken at any lattice node between start and end years (end defaults to the horizon)."""
+
+    name = "Option"
+
+    def __init__(self, start=0.0, end=None):
+        self.start = start
+        self.end = end
+
+    def exercise(self, values):
+        """Return the project value if the option is taken at nodes with the given project values."""
+        raise NotImplementedError
+
+    def open_steps(self, times, horizon):
+        """Return a (steps x projects) mask of where the option can be taken, from each step's time in years."""
+        end = horizon if self.end is None else np.asarray(self.end, dtype=np.float64)
+        # Allow for rounding in time = step * dt
+        return (times >= np.asarray(self.start, dtype=np.float64) - 1e-9) & (times <= end + 1e-9)
+
+
+class Expand(RealOption):
+    """Scale the project up by factor (e.g. 1.3 for 30% more) for an investment of cost."""
+
+    name = "Expand"
+
+    def __init__(self, factor, cost, start=0.0, end=None):
+        super().__init__(start, end)
+        self.factor = _column(factor)
+        self.cost = _column(cost)
+
+    def exercise(self, values):
+        exercised = values * self.factor
+        exercised -= self.cost
+        return exercised
+
+
+class Contract(RealOption):
+    """Scale the project down to factor (e.g. 0.7 for 30% less) and save savings."""
+
+    name = "Contract"
+
+    def __init__(self, factor, savings, start=0.0, end=None):
+        super().__init__(start, end)
+        self.factor = _column(factor)
+        self.savings = _column(savings)
+
+    def exercise(self, values):
+        exercised = values * self.factor
+        exercised += self.savings
+        return exercised
+
+
+class Abandon(RealOption):
+    """Stop the project and recover salvage."""
+
+    name = "Abandon"
+
+    def __init__(self, salvage, start=0.0, end=None):
+        super().__init__(start, end)
+        self.salvage = _column(salvage)
+
+    def exercise(self, values):
+        return self.salvage
+
+
+def lattice_parameters(volatility, rate, years, steps, payout_rate=0.0):
+    """Return (up factor, risk-neutral up probability, discount factor per step); rates are annual fractions."""
+    dt = np.asarray(years, dtype=np.float64) / steps
+    up = np.exp(np.asarray(volatility, dtype=np.float64) * np.sqrt(dt))
+    growth = np.exp((np.log1p(rate) + np.log1p(-np.asarray(payout_rate, dtype=np.float64))) * dt)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        probability = (growth - 1 / up) / (up - 1 / up)
+    if not np.all((probability >= 0) & (probability <= 1)):
+        raise ValueError("Volatility is too low for the discount and payout rates; increase the volatility or the number of steps.")
+    return up, probability, np.exp(-np.log1p(rate) * dt)
+
+
+def value_real_options(project_values, initial_investments, volatility, rate, years, options=(),
+                       defer_years=0.0, payout_rate=0.0, steps=DEFAULT_LATTICE_STEPS):
+    """Return static NPV, expanded NPV (with the options) and option value for each project.
+
+    project_values are the PVs of the projects' benefits, years the horizon of
+    the lattice and defer_years how long the investment may be put off (0 for
+    a committed project). Rates are annual fractions.
+    """
+    project_values = np.atleast_1d(np.asarray(project_values, dtype=np.float64))
+    shape = project_values.shape
+    investments, volatility, rate, years, defer_years, payout_rate = (
+        np.broadcast_to(np.asarray(value, dtype=np.float64), shape)
+        for value in (initial_investments, volatility, rate, years, defer_years, payout_rate)
+    )
+    if steps < 1:
+        raise ValueError("The lattice needs at least one step.")
+    if np.any(years <= 0) or np.any(volatility < 0) or np.any(defer_years < 0):
+        raise ValueError("The horizon must be positive and volatility and deferral cannot be negative.")
+    if np.any(defer_years > years + 1e-9):
+        raise ValueError("The investment cannot be deferred beyond the horizon of the lattice.")
+
+    up, probability, discount = lattice_parameters(volatility, rate, years, steps, payout_rate)
+    up_weight = _column(discount * probability)
+    down_weight = _column(discount * (1 - probability))
+    payout = _column(-np.expm1(np.log1p(-payout_rate) * years / steps))
+    has_payout = bool(np.any(payout_rate > 0))
+
+    # Exercise windows of every option and the deferral deadline, per step and project
+    times = np.arange(steps + 1)[:, None] * (years / steps)
+    open_steps = [option.open_steps(times, years) for option in options]
+    can_defer = times <= defer_years + 1e-9
+    # Per step: which options are open for every project, and whether any window differs between projects
+    open_keys = list(zip(*(mask.all(axis=1).tolist() for mask in open_steps))) or [()] * (steps + 1)
+    mixed_steps = np.zeros(steps + 1, dtype=bool)
+    for mask in open_steps + [can_defer]:
+        mixed_steps |= mask.any(axis=1) & ~mask.all(axis=1)
+    mixed_steps = mixed_steps.tolist()
+    defer_steps = can_defer.all(axis=1).tolist()
+    deferrable = bool(np.any(defer_years > 0))
+    investment_column = investments[:, None]
+
+    # Project values at step i are V * u ** (2k - i), a stride-2 slice of one row of powers
+    powers = np.exp(_column(np.log(up)) * np.arange(-steps, steps + 1))
+    powers *= project_values[:, None]
+    payouts = powers * payout if has_payout else None
+
+    # The best exercise value only depends on the project value, so while the same options
+    # are open for every project it is read from one precomputed row, like the powers
+    exercise_rows = {}
+
+    # Rows of the lattice, overwritten in place step by step: flexible holds the project
+    # value with its options, deferred the value of holding off the investment
+    flexible = powers[:, ::2].copy()
+    deferred = np.zeros_like(flexible)
+    for i in range(steps, -1, -1):
+        nodes = slice(steps - i, steps + i + 1, 2)
+        row = flexible[:, :i + 1]
+        if i < steps:
+            continuation = flexible[:, 1:i + 2] * up_weight
+            row *= down_weight
+            row += continuation
+            if has_payout:
+                row += payouts[:, nodes]
+
+        if mixed_steps[i]:
+            # Windows differ between projects at this step
+            for option, mask in zip(options, open_steps):
+                np.maximum(row, option.exercise(powers[:, nodes]), out=row, where=mask[i][:, None])
+        elif any(open_keys[i]):
+            key = open_keys[i]
+            if key not in exercise_rows:
+                exercise_rows[key] = np.full_like(powers, -np.inf)
+                for option, is_open in zip(options, key):
+                    if is_open:
+                        np.maximum(exercise_rows[key], option.exercise(powers), out=exercise_rows[key])
+            np.maximum(row, exercise_rows[key][:, nodes], out=row)
+
+        if deferrable:
+            # Not yet invested: wait (nothing is paid out) or invest now; worthless after the deadline
+            waiting = deferred[:, :i + 1]
+            if i < steps:
+                continuation = deferred[:, 1:i + 2] * up_weight
+                waiting *= down_weight
+                waiting += continuation
+            if mixed_steps[i]:
+                np.maximum(waiting, row - investment_column, out=waiting, where=can_defer[i][:, None])
+            elif defer_steps[i]:
+                np.maximum(waiting, row - investment_column, out=waiting)
+
+    static_npv = project_values - investments
+    expanded_npv = flexible[:, 0] - investments
+    if deferrable:
+        expanded_npv = np.where(defer_years > 0, deferred[:, 0], expanded_npv)
+    return {
+        "static_npv": static_npv,
+        "expanded_npv": expanded_npv,
+        # Flexibility is never worth less than nothing; clip rounding noise when no option is exercised
+        "option_value": np.maximum(expanded_npv - static_npv, 0.0),
+        "up": up,
+        "probability": probability
+    }
+
+
+def value_schedule_options(schedule, volatility, years, options=(), defer_years=0.0, payout_rate=0.0,
+                           steps=DEFAULT_LATTICE_STEPS):
+    """Value the options of one project from its NPV schedule, using its total PV and discount rate; returns floats."""
+    results = value_real_options(schedule.total_pv, schedule.initial_investment, volatility, schedule.rate, years,
+                                 options, defer_years, payout_rate, steps)
+    return {key: float(value[0]) for key, value in results.items()}
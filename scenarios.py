@@ -0,0 +1,154 @@
+import numpy as np
+import pandas as pd
+
+from batch_engine import break_even_batch, payback_batch
+from sparse_cash_flows import sparse_npv_batch, sparse_payback_periods, stack_events
+
+# ----------------------------------------
+# Scenario Sets
+# ----------------------------------------
+
+# Named input sets for one calculator, evaluated together through the batch
+# engine. Results are kept per scenario alongside the inputs they came from,
+# so evaluating after adding or editing scenarios only runs the new or
+# changed ones. NPV scenarios are evaluated from their (period, amount)
+# events, so a sparse scenario costs only as much as its cash flows.
+
+# Inputs each calculator's scenarios take, all numeric
+SCENARIO_INPUTS = {
+    "npv": ("discount_rate", "initial_investment", "cash_flows"),
+    "payback": ("initial_investment", "annual_cash_flow"),
+    "break-even": ("fixed_costs", "variable_cost", "sales_price")
+}
+
+# Inputs a scenario may leave out, with the value they then take
+SCENARIO_DEFAULTS = {
+    # periods numbers sparse cash flows (None: one per period from period 1); monthly or quarterly cash flows
+    # are kept as entered and discounted at their own granularity
+    "npv": {"periods": None, "periods_per_year": 1}
+}
+
+# Headline metric of each calculator, used for differences against the base scenario
+SCENARIO_METRICS = {
+    "npv": "NPV (£)",
+    "payback": "Payback Period (years)",
+    "break-even": "Break-Even Units"
+}
+
+
+def _evaluate_npv(inputs):
+    projects, periods, amounts, periods_per_year = stack_events(inputs)
+    initial_investments = np.array([i["initial_investment"] for i in inputs], dtype=np.float64)
+    results = sparse_npv_batch(np.array([i["discount_rate"] for i in inputs], dtype=np.float64) / 100, initial_investments,
+                               projects, periods, amounts, periods_per_year)
+    paybacks = sparse_payback_periods(initial_investments, projects, periods, amounts, periods_per_year)
+
+    # Cumulative discounted cash flow after each event against time in years, for the overlay chart
+    bounds = np.searchsorted(projects, np.arange(len(inputs) + 1))
+    present_values = results["present_values"]
+    years = periods / periods_per_year[projects]
+    return [
+        {
+            "NPV (£)": npv,
+            "Total PV of Benefits (£)": total_pv,
+            "Payback Period (years)": payback,
+            "series": np.concatenate(([-investment], np.cumsum(present_values[start:end]) - investment)),
+            "series_years": np.concatenate(([0.0], years[start:end]))
+        }
+        for investment, npv, total_pv, payback, start, end in zip(initial_investments, results["npv"], results["total_pv"], paybacks,
+                                                                  bounds[:-1], bounds[1:])
+    ]
+
+
+def _evaluate_payback(inputs):
+    results = payback_batch([i["initial_investment"] for i in inputs], [i["annual_cash_flow"] for i in inputs])
+    return [
+        {
+            "Payback Period (years)": period,
+            "series": np.concatenate(([-i["initial_investment"]], cumulative)),
+            "series_years": np.arange(cumulative.size + 1)
+        }
+        for i, period, cumulative in zip(inputs, results["payback_period"], results["cumulative_cash_flow"])
+    ]
+
+
+def _evaluate_break_even(inputs):
+    results = break_even_batch([i["fixed_costs"] for i in inputs], [i["variable_cost"] for i in inputs],
+                               [i["sales_price"] for i in inputs])
+    return [
+        {
+            "Break-Even Units": units,
+            "Break-Even Revenue (£)": revenue
+        }
+        for units, revenue in zip(results["units"], results["revenue"])
+    ]
+
+
+_EVALUATORS = {
+    "npv": _evaluate_npv,
+    "payback": _evaluate_payback,
+    "break-even": _evaluate_break_even
+}
+
+
+class ScenarioSet:
+    """Named scenarios for one calculator with incrementally evaluated results."""
+
+    def __init__(self, calculator):
+        if calculator not in SCENARIO_INPUTS:
+            raise ValueError(f"Unknown calculator: {calculator}")
+        self.calculator = calculator
+        self.scenarios = {}
+        self.base = None
+        self._results = {}
+        # Bumped on every change, so charts of the set can be cached by version
+        self.version = 0
+        # Number of scenarios evaluated by the last evaluate() call
+        self.last_evaluated = 0
+
+    def add(self, name, inputs):
+        """Add or replace a scenario; its result is recomputed on the next evaluate()."""
+        missing = [key for key in SCENARIO_INPUTS[self.calculator] if key not in inputs]
+        if missing:
+            raise ValueError(f"Scenario '{name}' is missing: {', '.join(missing)}")
+        self.scenarios[name] = {key: inputs[key] for key in SCENARIO_INPUTS[self.calculator]}
+        self.scenarios[name].update((key, inputs.get(key, default)) for key, default in SCENARIO_DEFAULTS.get(self.calculator, {}).items())
+        self._results.pop(name, None)
+        if self.base is None:
+            self.base = name
+        self.version += 1
+
+    def remove(self, name):
+        del self.scenarios[name]
+        self._results.pop(name, None)
+        if self.base == name:
+            self.base = next(iter(self.scenarios), None)
+        self.version += 1
+
+    def set_base(self, name):
+        """Make name the scenario the others are compared against."""
+        if name not in self.scenarios:
+            raise ValueError(f"No scenario named '{name}'")
+        self.base = name
+        self.version += 1
+
+    def evaluate(self):
+        """Evaluate every scenario without a current result in one batch and return all results by name."""
+        stale = [name for name in self.scenarios if name not in self._results]
+        self.last_evaluated = len(stale)
+        if stale:
+            results = _EVALUATORS[self.calculator]([self.scenarios[name] for name in stale])
+            self._results.update(zip(stale, results))
+        return {name: self._results[name] for name in self.scenarios}
+
+    def diff_table(self):
+        """Return a DataFrame of each scenario's metrics and the headline metric's difference from the base."""
+        results = self.evaluate()
+        table = pd.DataFrame(
+            [{key: value for key, value in result.items() if not key.startswith("series")} for result in results.values()],
+            index=pd.Index(list(results), name="Scenario")
+        )
+        metric = SCENARIO_METRICS[self.calculator]
+        if self.base is not None and not table.empty:
+            table[f"Δ {metric} vs {self.base}"] = table[metric] - table.loc[self.base, metric]
+        return table
@@ -0,0 +1,81 @@
+import numpy as np
+
+# ----------------------------------------
+# One-at-a-Time Sensitivity Analysis
+# ----------------------------------------
+
+# Swings are computed from analytic first and second derivatives of the metric
+# with respect to every input, instead of re-evaluating the metric once per
+# input and direction. For NPV the derivatives with respect to each cash flow
+# are just the discount factors, so a 1000-period schedule needs one pass.
+#
+#   NPV = -I + sum CF_t (1 + r)^-t        (t in years)
+#       dNPV/dCF_t = (1 + r)^-t      dNPV/dI = -1
+#       dNPV/dr    = -sum t CF_t (1 + r)^-(t+1)
+#       d2NPV/dr2  =  sum t (t+1) CF_t (1 + r)^-(t+2)
+#
+#   Q = F / (p - v)
+#       dQ/dF = 1 / (p - v)    dQ/dp = -F / (p - v)^2    dQ/dv = F / (p - v)^2
+#       d2Q/dp2 = d2Q/dv2 = 2F / (p - v)^3
+#
+# NPV is linear in the cash flows and the investment, so those swings are
+# exact; rate and break-even swings use the second-order Taylor expansion.
+
+
+class Sensitivities:
+    """First and second derivatives of one metric with respect to each named input."""
+
+    def __init__(self, metric, base, names, values, gradient, curvature):
+        self.metric = metric
+        self.base = float(base)
+        self.names = list(names)
+        self.values = np.asarray(values, dtype=np.float64)
+        self.gradient = np.asarray(gradient, dtype=np.float64)
+        self.curvature = np.asarray(curvature, dtype=np.float64)
+
+    def spider(self, changes):
+        """Return the metric for every input (rows) at each relative change (columns), e.g. -0.2 .. 0.2."""
+        deltas = np.outer(self.values, np.asarray(changes, dtype=np.float64))
+        return self.base + self.gradient[:, None] * deltas + 0.5 * self.curvature[:, None] * deltas ** 2
+
+    def swings(self, relative_change=0.1):
+        """Return (low, high) metric values when each input moves down / up by relative_change."""
+        low, high = self.spider([-relative_change, relative_change]).T
+        return low, high
+
+    def tornado(self, relative_change=0.1, top=None):
+        """Return (names, low, high) ordered from the largest swing down, optionally keeping the top entries."""
+        low, high = self.swings(relative_change)
+        order = np.argsort(-np.abs(high - low), kind="stable")
+        if top is not None:
+            order = order[:top]
+        return [self.names[i] for i in order], low[order], high[order]
+
+
+def npv_sensitivities(schedule):
+    """Return NPV sensitivities to the discount rate, initial investment and each period's cash flow."""
+    t = schedule.years
+    rate = schedule.rate
+    weighted = t * schedule.present_values  # t * CF_t * (1 + r)^-t
+
+    names = ["Discount Rate", "Initial Investment"] + [f"Cash Flow {schedule.period_name} {int(period)}" for period in schedule.periods]
+    values = np.concatenate(([rate, schedule.initial_investment], schedule.cash_flows))
+    gradient = np.concatenate(([-weighted.sum() / (1 + rate), -1.0], schedule.discount_factors))
+    curvature = np.zeros_like(values)
+    curvature[0] = ((t + 1) * weighted).sum() / (1 + rate) ** 2
+    return Sensitivities("NPV (£)", schedule.npv, names, values, gradient, curvature)
+
+
+def break_even_sensitivities(fixed_costs, variable_cost, sales_price):
+    """Return break-even unit sensitivities to fixed costs, variable cost and sales price."""
+    margin = sales_price - variable_cost
+    if margin <= 0:
+        raise ValueError("Sales Price per Unit must be greater than Variable Cost per Unit.")
+    units = fixed_costs / margin
+    return Sensitivities(
+        "Break-Even Point (Units)", units,
+        ["Fixed Costs", "Variable Cost per Unit", "Sales Price per Unit"],
+        [fixed_costs, variable_cost, sales_price],
+        [1 / margin, fixed_costs / margin ** 2, -fixed_costs / margin ** 2],
+        [0.0, 2 * fixed_costs / margin ** 3, 2 * fixed_costs / margin ** 3]
+    )
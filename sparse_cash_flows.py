@@ -0,0 +1,162 @@
+import numpy as np
+
+# ----------------------------------------
+# Sparse Cash Flows
+# ----------------------------------------
+
+# Long-lived assets often have cash flows in only a handful of periods over a
+# horizon of a century or more. Held as (period, amount) events instead of one
+# value per period, memory and time scale with the number of events: only the
+# events are discounted, and as the cumulative cash flow only changes at an
+# event, payback is found from the cumulative sum over the events alone:
+#
+#   NPV      = -I + sum amount_e (1 + r) ** -(period_e / periods per year)
+#   Payback  = period_e - 1 + (I - cumulative before e) / amount_e
+#              for the first event e whose cumulative cash flow reaches I
+#
+# A single project's events become a sparse CashFlowSchedule; many projects
+# are evaluated together from events in coordinate form (project, period,
+# amount), like a sparse matrix with one row per project.
+
+
+def is_sparse_entry(text):
+    """Whether a Cash Flows entry holds 'period: amount' pairs rather than one value per period."""
+    return ":" in text
+
+
+def sparse_events(periods, amounts):
+    """Return (periods, amounts) sorted by period, with amounts in the same period added and zero events dropped."""
+    periods = np.asarray(periods, dtype=np.int64).ravel()
+    amounts = np.asarray(amounts, dtype=np.float64).ravel()
+    if periods.size != amounts.size:
+        raise ValueError("Every cash flow needs a period.")
+    if periods.size and periods.min() < 1:
+        raise ValueError("Periods start at 1.")
+    periods, index = np.unique(periods, return_inverse=True)
+    amounts = np.bincount(index, weights=amounts, minlength=periods.size)
+    keep = amounts != 0
+    return periods[keep], amounts[keep]
+
+
+def parse_sparse_cash_flows(text):
+    """Parse 'period: amount' pairs, e.g. '1: -500, 40: 2000, 100: 80000', into sorted (periods, amounts) arrays."""
+    pairs = [pair.split(":") for pair in text.split(",") if pair.strip()]
+    if any(len(pair) != 2 for pair in pairs):
+        raise ValueError("Enter sparse cash flows as 'period: amount' pairs separated by commas.")
+    periods = [float(period) for period, _ in pairs]
+    if any(period != int(period) for period in periods):
+        raise ValueError("Periods must be whole numbers.")
+    return sparse_events(periods, [float(amount) for _, amount in pairs])
+
+
+def stack_events(inputs):
+    """Return events (projects, periods, amounts) and each project's periods per year from NPV input sets.
+
+    Input sets follow the scenario conventions: "cash_flows", numbered by
+    "periods" or else from period 1, and "periods_per_year" (default 1).
+    Events come sorted by project and period, with amounts in the same period
+    added.
+    """
+    inputs = list(inputs)
+    amounts = [np.asarray(i["cash_flows"], dtype=np.float64).ravel() for i in inputs]
+    periods = [np.arange(1, flows.size + 1) if i.get("periods") is None else np.asarray(i["periods"], dtype=np.float64).ravel()
+               for i, flows in zip(inputs, amounts)]
+    if any(numbers.size != flows.size for numbers, flows in zip(periods, amounts)):
+        raise ValueError("Every cash flow needs a period.")
+    projects = np.repeat(np.arange(len(inputs)), [flows.size for flows in amounts])
+    periods = np.concatenate(periods) if inputs else np.empty(0)
+    if periods.size and periods.min() < 1:
+        raise ValueError("Periods start at 1.")
+    periods_per_year = np.array([i.get("periods_per_year", 1) for i in inputs], dtype=np.float64)
+    return (*_sorted_events(projects, periods, np.concatenate(amounts) if inputs else np.empty(0)), periods_per_year)
+
+
+def _sorted_events(projects, periods, amounts):
+    """Sort events by project and period, adding together events of a project in the same period."""
+    projects = np.asarray(projects, dtype=np.int64).ravel()
+    periods = np.asarray(periods, dtype=np.float64).ravel()
+    amounts = np.asarray(amounts, dtype=np.float64).ravel()
+    order = np.lexsort((periods, projects))
+    projects, periods, amounts = projects[order], periods[order], amounts[order]
+    starts = np.flatnonzero((np.diff(projects, prepend=-1) != 0) | (np.diff(periods, prepend=-1) != 0))
+    if starts.size < projects.size:
+        amounts = np.add.reduceat(amounts, starts)
+        projects, periods = projects[starts], periods[starts]
+    return projects, periods, amounts
+
+
+def sparse_npv_batch(discount_rates, initial_investments, projects, periods, amounts, periods_per_year=1):
+    """Return total PV and NPV for each project, and discount factors and present values for each event.
+
+    Events are (project index, period, amount); rates are annual fractions,
+    one per project, and periods_per_year is one value or one per project.
+    """
+    discount_rates = np.atleast_1d(np.asarray(discount_rates, dtype=np.float64))
+    initial_investments = np.broadcast_to(np.asarray(initial_investments, dtype=np.float64), discount_rates.shape)
+    periods_per_year = np.broadcast_to(np.asarray(periods_per_year, dtype=np.float64), discount_rates.shape)
+    projects = np.asarray(projects, dtype=np.int64).ravel()
+    years = np.asarray(periods, dtype=np.float64).ravel() / periods_per_year[projects]
+    discount_factors = np.exp(-np.log1p(discount_rates)[projects] * years)
+    present_values = np.asarray(amounts, dtype=np.float64).ravel() * discount_factors
+    total_pv = np.bincount(projects, weights=present_values, minlength=discount_rates.size)
+    return {
+        "total_pv": total_pv,
+        "npv": total_pv - initial_investments,
+        "discount_factors": discount_factors,
+        "present_values": present_values
+    }
+
+
+def sparse_bcr_batch(discount_rates, initial_investments, projects, periods, amounts, periods_per_year=1):
+    """Return PV of benefits, PV of costs, benefit-cost ratio and net profit for each project from its events.
+
+    Positive cash flows are benefits; the initial investment and any negative
+    cash flows are costs. The BCR is NaN when a project has no costs, and net
+    profit is the undiscounted sum of its cash flows less the investment.
+    """
+    discount_rates = np.atleast_1d(np.asarray(discount_rates, dtype=np.float64))
+    initial_investments = np.broadcast_to(np.asarray(initial_investments, dtype=np.float64), discount_rates.shape)
+    projects = np.asarray(projects, dtype=np.int64).ravel()
+    present_values = sparse_npv_batch(discount_rates, initial_investments, projects, periods, amounts,
+                                      periods_per_year)["present_values"]
+
+    pv_benefits = np.bincount(projects, weights=np.maximum(present_values, 0.0), minlength=discount_rates.size)
+    pv_costs = initial_investments - np.bincount(projects, weights=np.minimum(present_values, 0.0), minlength=discount_rates.size)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        bcr = np.where(pv_costs > 0, pv_benefits / pv_costs, np.nan)
+    return {
+        "pv_benefits": pv_benefits,
+        "pv_costs": pv_costs,
+        "bcr": bcr,
+        "net_profit": np.bincount(projects, weights=np.asarray(amounts, dtype=np.float64).ravel(),
+                                  minlength=discount_rates.size) - initial_investments
+    }
+
+
+def sparse_payback_periods(initial_investments, projects, periods, amounts, periods_per_year=1):
+    """Return the payback period of each project in years from its events.
+
+    NaN where nothing is invested or the investment is never recovered, as in
+    batch_engine.payback_periods. periods_per_year is one value or one per
+    project.
+    """
+    initial_investments = np.atleast_1d(np.asarray(initial_investments, dtype=np.float64))
+    periods_per_year = np.broadcast_to(np.asarray(periods_per_year, dtype=np.float64), initial_investments.shape)
+    projects, periods, amounts = _sorted_events(projects, periods, amounts)
+
+    # Cumulative cash flow at each event, restarting at -I for every project
+    cumulative = np.cumsum(amounts)
+    first_event = np.searchsorted(projects, np.arange(initial_investments.size))
+    before_project = np.concatenate(([0.0], cumulative))[first_event]
+    cumulative -= before_project[projects] + initial_investments[projects]
+
+    # First recovering event of each project; the cumulative before it is the previous event's, or -I
+    recovered = np.flatnonzero(cumulative >= 0)
+    recovering_projects, first = np.unique(projects[recovered], return_index=True)
+    events = recovered[first]
+    previous = np.where(events > first_event[recovering_projects], cumulative[events - 1], -initial_investments[recovering_projects])
+
+    paybacks = np.full(initial_investments.size, np.nan)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        paybacks[recovering_projects] = (periods[events] - 1 + (-previous) / amounts[events]) / periods_per_year[recovering_projects]
+    return np.where(initial_investments > 0, paybacks, np.nan)
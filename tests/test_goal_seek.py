@@ -0,0 +1,100 @@
+import numpy as np
+import pytest
+
+from batch_engine import break_even_batch, npv_batch, payback_batch
+from goal_seek import goal_seek, seek_break_even, seek_npv, seek_payback, seek_sparse_npv
+
+
+# ----------------------------------------
+# Break-Even
+# ----------------------------------------
+
+@pytest.mark.parametrize("solve_for", ["fixed_costs", "variable_cost", "sales_price"])
+def test_break_even_solution_gives_target_units(solve_for):
+    inputs = {"fixed_costs": np.array([10000.0, 2500.0]), "variable_cost": np.array([20.0, 4.0]),
+              "sales_price": np.array([50.0, 9.0])}
+    target = np.array([400.0, 1250.0])
+    inputs[solve_for] = seek_break_even(inputs["fixed_costs"], inputs["variable_cost"], inputs["sales_price"], target, solve_for)
+
+    units = break_even_batch(inputs["fixed_costs"], inputs["variable_cost"], inputs["sales_price"])["units"]
+    np.testing.assert_allclose(units, target)
+
+
+def test_break_even_without_a_solution_is_nan():
+    # No positive margin to solve fixed costs from, and no volume to reach
+    assert np.isnan(seek_break_even(1000.0, 50.0, 40.0, 100.0, "fixed_costs"))
+    assert np.isnan(seek_break_even(1000.0, 20.0, 40.0, 0.0, "sales_price"))
+
+
+# ----------------------------------------
+# Payback
+# ----------------------------------------
+
+@pytest.mark.parametrize("solve_for", ["initial_investment", "annual_cash_flow"])
+def test_payback_solution_gives_target_years(solve_for):
+    inputs = {"initial_investment": np.array([10000.0, 4000.0]), "annual_cash_flow": np.array([2500.0, 1500.0])}
+    target = np.array([3.5, 2.25])
+    inputs[solve_for] = seek_payback(inputs["initial_investment"], inputs["annual_cash_flow"], target, solve_for)
+
+    periods = payback_batch(inputs["initial_investment"], inputs["annual_cash_flow"])["payback_period"]
+    np.testing.assert_allclose(periods, target)
+
+
+def test_payback_without_a_solution_is_nan():
+    assert np.isnan(seek_payback(0.0, 2500.0, 3.0, "annual_cash_flow"))
+    assert np.isnan(seek_payback(10000.0, -100.0, 3.0, "initial_investment"))
+    assert np.isnan(seek_payback(10000.0, 2500.0, 0.0, "annual_cash_flow"))
+
+
+# ----------------------------------------
+# NPV
+# ----------------------------------------
+
+CASH_FLOWS = np.array([[3000.0, 4000.0, 5000.0, 6000.0], [1000.0, 0.0, 0.0, 9000.0]])
+RATES = np.array([0.08, 0.05])
+INVESTMENTS = np.array([12000.0, 6000.0])
+
+
+def test_npv_investment_gives_target_npv():
+    target = np.array([500.0, -250.0])
+    investments = seek_npv(RATES, INVESTMENTS, CASH_FLOWS, target, "initial_investment")
+    np.testing.assert_allclose(npv_batch(RATES, investments, CASH_FLOWS)["npv"], target)
+
+
+def test_npv_cash_flow_scale_gives_target_npv():
+    target = np.array([1000.0, 0.0])
+    scales = seek_npv(RATES, INVESTMENTS, CASH_FLOWS, target, "cash_flow_scale")
+    np.testing.assert_allclose(npv_batch(RATES, INVESTMENTS, CASH_FLOWS * scales[:, None])["npv"], target, atol=1e-9)
+
+
+def test_npv_cash_flow_scale_without_cash_flows_is_nan():
+    assert np.isnan(seek_npv(0.1, 1000.0, np.zeros((1, 3)), 0.0, "cash_flow_scale")).all()
+
+
+def test_npv_discount_rate_is_the_irr_at_zero_target():
+    rates = seek_npv(RATES, INVESTMENTS, CASH_FLOWS, 0.0, "discount_rate")
+    np.testing.assert_allclose(npv_batch(rates, INVESTMENTS, CASH_FLOWS)["npv"], 0.0, atol=1e-6)
+
+
+def test_sparse_npv_matches_dense():
+    projects, periods = np.array([0, 0, 0, 0, 1, 1]), np.array([1, 2, 3, 4, 1, 4])
+    amounts = np.array([3000.0, 4000.0, 5000.0, 6000.0, 1000.0, 9000.0])
+    for solve_for in ("initial_investment", "cash_flow_scale", "discount_rate"):
+        np.testing.assert_allclose(seek_sparse_npv(RATES, INVESTMENTS, projects, periods, amounts, 100.0, solve_for),
+                                   seek_npv(RATES, INVESTMENTS, CASH_FLOWS, 100.0, solve_for))
+
+
+# ----------------------------------------
+# Scenario Inputs
+# ----------------------------------------
+
+def test_goal_seek_takes_rates_in_percent():
+    inputs = [{"discount_rate": 8.0, "initial_investment": 12000.0, "cash_flows": CASH_FLOWS[0]},
+              {"discount_rate": 5.0, "initial_investment": 6000.0, "cash_flows": [1000.0, 9000.0], "periods": [1, 4]}]
+    np.testing.assert_allclose(goal_seek("npv", inputs, "discount_rate", 0.0),
+                               seek_npv(RATES, INVESTMENTS, CASH_FLOWS, 0.0, "discount_rate") * 100)
+
+
+def test_goal_seek_rejects_unknown_inputs():
+    with pytest.raises(ValueError):
+        goal_seek("payback", [{"initial_investment": 1.0, "annual_cash_flow": 1.0}], "discount_rate", 1.0)
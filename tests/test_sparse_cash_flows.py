@@ -0,0 +1,105 @@
+import numpy as np
+import pytest
+
+from batch_engine import npv_batch, payback_periods
+from cash_flow_adjustments import AdjustmentPipeline
+from cash_flow_schedule import CashFlowSchedule
+from sparse_cash_flows import parse_sparse_cash_flows, sparse_npv_batch, sparse_payback_periods, stack_events
+
+# Projects as events, with the dense rows (zeros between events) they stand for
+EVENTS = [
+    {"periods": [1, 5, 12], "cash_flows": [400.0, 2500.0, 9000.0]},
+    {"periods": [2, 3], "cash_flows": [-300.0, 1200.0], "periods_per_year": 4},
+    {"periods": [6], "cash_flows": [500.0]}
+]
+INVESTMENTS = np.array([2000.0, 600.0, 1000.0])
+RATES = np.array([0.07, 0.12, 0.03])
+
+
+def dense(inputs):
+    """Return the projects x periods matrix holding each project's events, zero elsewhere."""
+    rows = np.zeros((len(inputs), max(max(i["periods"]) for i in inputs)))
+    for row, i in zip(rows, inputs):
+        row[np.asarray(i["periods"]) - 1] = i["cash_flows"]
+    return rows
+
+
+# ----------------------------------------
+# Parsing
+# ----------------------------------------
+
+def test_parse_adds_repeated_periods_and_drops_zeros():
+    periods, amounts = parse_sparse_cash_flows("40: 2000, 1: -500, 40: 500, 7: 0")
+    assert periods.tolist() == [1, 40]
+    assert amounts.tolist() == [-500.0, 2500.0]
+
+
+@pytest.mark.parametrize("text", ["0: 100", "1.5: 100", "1: 100, 2"])
+def test_parse_rejects_invalid_pairs(text):
+    with pytest.raises(ValueError):
+        parse_sparse_cash_flows(text)
+
+
+# ----------------------------------------
+# Sparse and Dense Agreement
+# ----------------------------------------
+
+def test_npv_matches_dense():
+    projects, periods, amounts, periods_per_year = stack_events(EVENTS)
+    sparse = sparse_npv_batch(RATES, INVESTMENTS, projects, periods, amounts, periods_per_year)
+    expected = npv_batch(RATES, INVESTMENTS, dense(EVENTS), periods_per_year)
+    np.testing.assert_allclose(sparse["npv"], expected["npv"])
+    np.testing.assert_allclose(sparse["total_pv"], expected["total_pv"])
+
+
+def test_payback_matches_dense_and_schedule():
+    projects, periods, amounts, periods_per_year = stack_events(EVENTS)
+    sparse = sparse_payback_periods(INVESTMENTS, projects, periods, amounts, periods_per_year)
+    np.testing.assert_allclose(sparse, payback_periods(INVESTMENTS, dense(EVENTS), periods_per_year))
+
+    for payback, i, investment in zip(sparse, EVENTS, INVESTMENTS):
+        schedule = CashFlowSchedule(i["cash_flows"], initial_investment=investment, periods=i["periods"],
+                                    periods_per_year=i.get("periods_per_year", 1))
+        expected = schedule.payback_period()
+        assert np.isnan(payback) if expected is None else payback == pytest.approx(expected)
+    # The last project is never recovered
+    assert np.isnan(sparse[2])
+
+
+def test_payback_without_investment_is_not_defined_in_any_path():
+    cash_flows = np.array([[100.0, 200.0]])
+    assert np.isnan(payback_periods([0.0], cash_flows)).all()
+    assert np.isnan(sparse_payback_periods([0.0], [0, 0], [1, 2], cash_flows.ravel())).all()
+    assert CashFlowSchedule(cash_flows.ravel()).payback_period() is None
+
+
+# ----------------------------------------
+# Adjustments
+# ----------------------------------------
+
+SETTINGS = [
+    {"inflation": 0.03},
+    {"tax_rate": 0.25, "depreciation_method": "Straight-Line", "useful_life": 8},
+    {"tax_rate": 0.2, "depreciation_method": "Declining Balance", "useful_life": 5, "salvage_value": 200.0},
+    {"working_capital": 0.1},
+    {"inflation": 0.02, "tax_rate": 0.3, "depreciation_method": "Straight-Line", "useful_life": 10, "working_capital": 0.15}
+]
+
+
+@pytest.mark.parametrize("settings", SETTINGS)
+def test_adjusted_events_match_adjusted_dense_cash_flows(settings):
+    periods, cash_flows = np.array([1, 5, 12]), np.array([400.0, 2500.0, 9000.0])
+    pipeline = AdjustmentPipeline().configure(initial_investment=2000.0, **settings)
+    adjusted_periods, adjusted = pipeline.adjusted_events(periods, cash_flows)
+
+    expected = AdjustmentPipeline().configure(initial_investment=2000.0, **settings).adjusted(dense([
+        {"periods": periods, "cash_flows": cash_flows}])[0])
+    spread = np.zeros(expected.size)
+    spread[adjusted_periods.astype(int) - 1] = adjusted
+    np.testing.assert_allclose(spread, expected, atol=1e-9)
+
+
+@pytest.mark.parametrize("settings", SETTINGS)
+def test_adjusting_no_cash_flows_leaves_none(settings):
+    periods, adjusted = AdjustmentPipeline().configure(initial_investment=2000.0, **settings).adjusted_events([], [])
+    assert periods.size == 0 and adjusted.size == 0
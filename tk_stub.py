@@ -0,0 +1,460 @@
+import itertools
+import sys
+import time
+import types
+
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+
+# ----------------------------------------
+# Tk Stand-in
+# ----------------------------------------
+
+# A pure-Python replacement for the tkinter calls the toolkit makes, so that
+# gui_harness.py can check the calculators' results on machines with neither
+# a display nor Xvfb (e.g. CI images without X packages). Widgets keep their
+# options and contents in Python, update() runs the after / after_idle
+# callbacks, and charts are rendered with Agg when the canvas is next idle, as
+# FigureCanvasTkAgg does. Nothing is laid out or painted, so the harness does
+# not hold runs on the stand-in to its latency budgets.
+#
+#   import tk_stub
+#   tk_stub.install()              # before the GUI module is imported
+#   import cost_benefit_analyis
+
+END = "end"
+
+_ids = itertools.count(1)
+_default_root = None
+
+
+# ----------------------------------------
+# Variables
+# ----------------------------------------
+
+class Variable:
+    _default = ""
+
+    def __init__(self, master=None, value=None):
+        self._value = self._default if value is None else value
+        self._traces = []
+
+    def get(self):
+        return self._value
+
+    def set(self, value):
+        self._value = value
+        for callback in list(self._traces):
+            callback("", "", "write")
+
+    def trace_add(self, mode, callback):
+        self._traces.append(callback)
+
+
+class StringVar(Variable):
+    def get(self):
+        return str(self._value)
+
+
+class BooleanVar(Variable):
+    _default = False
+
+    def get(self):
+        return bool(self._value)
+
+
+# ----------------------------------------
+# Widgets
+# ----------------------------------------
+
+class Misc:
+    """Options, geometry, bindings and the event loop shared by every widget."""
+
+    def __init__(self, master=None, cnf=None, **kw):
+        self.master = master or _get_default_root()
+        self._options = dict(cnf or {}, **kw)
+        self._bindings = {}
+
+    def __getitem__(self, key):
+        return self.cget(key)
+
+    def _root(self):
+        widget = self
+        while widget.master is not None:
+            widget = widget.master
+        return widget
+
+    def configure(self, cnf=None, **kw):
+        self._options.update(cnf or {}, **kw)
+
+    config = configure
+
+    def cget(self, key):
+        return self._options.get(key, "")
+
+    def pack(self, **kw):
+        pass
+
+    grid = pack
+
+    def grid_columnconfigure(self, index, **kw):
+        pass
+
+    grid_rowconfigure = grid_columnconfigure
+
+    def bind(self, sequence, func=None, add=None):
+        self._bindings.setdefault(sequence, []).append(func)
+
+    def after(self, ms, func, *args):
+        return self._root()._schedule(time.perf_counter() + ms / 1000, func, args)
+
+    def after_idle(self, func, *args):
+        return self._root()._schedule(None, func, args)
+
+    def after_cancel(self, job):
+        self._root()._jobs.pop(job, None)
+
+    def update(self):
+        self._root()._process(timers=True)
+
+    def update_idletasks(self):
+        self._root()._process(timers=False)
+
+    def winfo_height(self):
+        return int(self._options.get("height") or 1)
+
+    def clipboard_clear(self):
+        self._root()._clipboard = ""
+
+    def clipboard_append(self, text):
+        self._root()._clipboard += str(text)
+
+    def destroy(self):
+        pass
+
+
+class Tk(Misc):
+    def __init__(self):
+        global _default_root
+        # The root has no master, so it is not resolved to the default root as other widgets are
+        self.master = None
+        self._options = {}
+        self._bindings = {}
+        self._jobs = {}
+        self._clipboard = ""
+        self._destroyed = False
+        if _default_root is None:
+            _default_root = self
+
+    def _schedule(self, due, func, args):
+        job = f"after#{next(_ids)}"
+        self._jobs[job] = (due, func, args)
+        return job
+
+    def _process(self, timers):
+        """Run the idle callbacks and, with timers, every timer that is due; callbacks may queue more."""
+        while not self._destroyed:
+            now = time.perf_counter()
+            runnable = [job for job, (due, _, _) in self._jobs.items() if due is None or (timers and due <= now)]
+            if not runnable:
+                return
+            for job in runnable:
+                entry = self._jobs.pop(job, None)
+                if entry is not None:
+                    entry[1](*entry[2])
+
+    def title(self, text):
+        pass
+
+    geometry = title
+
+    def mainloop(self):
+        while not self._destroyed:
+            self.update()
+            time.sleep(0.005)
+
+    def destroy(self):
+        global _default_root
+        self._destroyed = True
+        self._jobs.clear()
+        if _default_root is self:
+            _default_root = None
+
+
+class Toplevel(Misc):
+    title = Tk.title
+
+
+class Frame(Misc):
+    pass
+
+
+class LabelFrame(Frame):
+    pass
+
+
+class Label(Misc):
+    pass
+
+
+class Button(Misc):
+    pass
+
+
+class Scrollbar(Misc):
+    def set(self, first, last):
+        pass
+
+
+class Menu(Misc):
+    def add_command(self, **kw):
+        pass
+
+    add_checkbutton = add_cascade = add_separator = add_command
+
+
+class Entry(Misc):
+    """An entry whose text lives in its textvariable when it has one, so edits fire the variable's traces."""
+
+    def __init__(self, master=None, cnf=None, **kw):
+        super().__init__(master, cnf, **kw)
+        self._text = ""
+
+    def get(self):
+        variable = self._options.get("textvariable")
+        return variable.get() if variable is not None else self._text
+
+    def _set_text(self, text):
+        variable = self._options.get("textvariable")
+        if variable is not None:
+            variable.set(text)
+        else:
+            self._text = text
+
+    def _index(self, index, text):
+        return len(text) if index == END else min(int(index), len(text))
+
+    def insert(self, index, string):
+        text = self.get()
+        position = self._index(index, text)
+        self._set_text(text[:position] + str(string) + text[position:])
+
+    def delete(self, first, last=None):
+        text = self.get()
+        start = self._index(first, text)
+        end = start + 1 if last is None else self._index(last, text)
+        self._set_text(text[:start] + text[end:])
+
+
+class Combobox(Entry):
+    def set(self, value):
+        self._set_text(str(value))
+
+
+class Text(Misc):
+    """A text box holding one string; the only indexes understood are '1.0', 'end' and 'end-1c'."""
+
+    def __init__(self, master=None, cnf=None, **kw):
+        super().__init__(master, cnf, **kw)
+        self._text = ""
+
+    def _index(self, index):
+        # Like Tk, the text always ends in a newline that get() returns up to 'end'
+        if str(index).startswith(END):
+            return len(self._text) + (0 if str(index) == "end-1c" else 1)
+        return 0
+
+    def get(self, index1, index2):
+        return (self._text + "\n")[self._index(index1):self._index(index2)]
+
+    def insert(self, index, chars):
+        position = min(self._index(index), len(self._text))
+        self._text = self._text[:position] + str(chars) + self._text[position:]
+
+    def delete(self, index1, index2):
+        self._text = self._text[:self._index(index1)] + self._text[self._index(index2):]
+
+    def tag_configure(self, tag, **kw):
+        pass
+
+    def tag_add(self, tag, index1, index2):
+        pass
+
+
+class ScrolledText(Text):
+    pass
+
+
+class Canvas(Misc):
+    """A canvas counting its items, with a vertical scroll offset."""
+
+    def __init__(self, master=None, cnf=None, **kw):
+        super().__init__(master, cnf, **kw)
+        self._items = set()
+        self._top = 0.0
+
+    def _create(self, *coords, **kw):
+        item = next(_ids)
+        self._items.add(item)
+        return item
+
+    create_rectangle = create_text = create_window = _create
+
+    def delete(self, *items):
+        self._items = set() if "all" in items else self._items.difference(items)
+
+    def bbox(self, *items):
+        return (0, 0, 1, self.winfo_height()) if self._items else None
+
+    def canvasy(self, y):
+        return self._top + float(y)
+
+    def xview(self, *args):
+        pass
+
+    yview = xview
+
+    def yview_scroll(self, number, what):
+        self._top = max(self._top + number * float(self._options.get("yscrollincrement") or 1), 0.0)
+        command = self._options.get("yscrollcommand")
+        if command:
+            command("0.0", "1.0")
+
+
+class Notebook(Misc):
+    def add(self, child, **kw):
+        pass
+
+    def select(self, tab_id):
+        self._selected = tab_id
+
+
+class Treeview(Misc):
+    """Rows kept in insertion order, each with its values and tags."""
+
+    def __init__(self, master=None, cnf=None, **kw):
+        super().__init__(master, cnf, **kw)
+        self._rows = {}
+
+    def insert(self, parent, index, **kw):
+        iid = f"I{next(_ids):03X}"
+        self._rows[iid] = {"values": tuple(kw.get("values", ())), "tags": kw.get("tags", ())}
+        return iid
+
+    def get_children(self):
+        return tuple(self._rows)
+
+    def delete(self, *items):
+        for item in items:
+            del self._rows[item]
+
+    def item(self, item, option):
+        return self._rows[item][option]
+
+    def selection(self):
+        return ()
+
+    def heading(self, column, **kw):
+        pass
+
+    column = tag_configure = heading
+
+    def xview(self, *args):
+        pass
+
+    yview = xview
+
+
+class Style:
+    def __init__(self, master=None):
+        pass
+
+    def theme_use(self, name):
+        pass
+
+    def configure(self, style, **kw):
+        pass
+
+    map = configure
+
+
+# ----------------------------------------
+# Fonts
+# ----------------------------------------
+
+class Font:
+    """Font metrics approximated from the point size: a fixed advance per character."""
+
+    def __init__(self, font):
+        self.size = abs(int(font[1]))
+
+    def metrics(self, option):
+        return {"linespace": self.size + self.size // 3 + 2}[option]
+
+    def measure(self, text):
+        return round(len(str(text)) * self.size * 0.6)
+
+
+# ----------------------------------------
+# Matplotlib Canvas
+# ----------------------------------------
+
+class FigureCanvasTkAgg(FigureCanvasAgg):
+    """Stands in for matplotlib's Tk canvas: draw_idle renders with Agg when the stub event loop is next idle."""
+
+    def __init__(self, figure, master=None):
+        super().__init__(figure)
+        self._tk_widget = Canvas(master)
+        self._idle_draw = None
+
+    def get_tk_widget(self):
+        return self._tk_widget
+
+    def draw_idle(self, *args, **kwargs):
+        if self._idle_draw is None:
+            self._idle_draw = self._tk_widget.after_idle(self._draw_now)
+
+    def _draw_now(self):
+        self._idle_draw = None
+        self.draw()
+
+
+# ----------------------------------------
+# Installation
+# ----------------------------------------
+
+def _get_default_root():
+    if _default_root is None:
+        Tk()
+    return _default_root
+
+
+def _module(name, **attributes):
+    module = types.ModuleType(name)
+    module.__dict__.update(attributes)
+    return module
+
+
+def _dialog(*args, **kwargs):
+    return None
+
+
+def install():
+    """Make tkinter, its submodules and matplotlib's Tk backend resolve to this stand-in from now on.
+
+    The dialogs return None; the harness replaces them with its recorders.
+    """
+    messagebox = _module("tkinter.messagebox", showinfo=_dialog, showwarning=_dialog, showerror=_dialog,
+                         askyesno=_dialog, askokcancel=_dialog)
+    filedialog = _module("tkinter.filedialog", askopenfilename=_dialog, asksaveasfilename=_dialog)
+    simpledialog = _module("tkinter.simpledialog", askstring=_dialog)
+    font = _module("tkinter.font", Font=Font)
+    scrolledtext = _module("tkinter.scrolledtext", ScrolledText=ScrolledText)
+    ttk = _module("tkinter.ttk", Frame=Frame, LabelFrame=LabelFrame, Label=Label, Button=Button, Entry=Entry,
+                  Combobox=Combobox, Scrollbar=Scrollbar, Notebook=Notebook, Treeview=Treeview, Style=Style)
+    tkinter = _module("tkinter", END=END, StringVar=StringVar, BooleanVar=BooleanVar, Tk=Tk, Toplevel=Toplevel,
+                      Frame=Frame, Canvas=Canvas, Text=Text, Menu=Menu, ttk=ttk, messagebox=messagebox,
+                      filedialog=filedialog, simpledialog=simpledialog, font=font, scrolledtext=scrolledtext)
+    for module in (tkinter, ttk, messagebox, filedialog, simpledialog, font, scrolledtext):
+        sys.modules[module.__name__] = module
+    sys.modules["matplotlib.backends.backend_tkagg"] = _module("matplotlib.backends.backend_tkagg",
+                                                               FigureCanvasTkAgg=FigureCanvasTkAgg)